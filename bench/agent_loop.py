@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+agent_loop — replay agent and monitor loops against a synthetic project
+
+Builds a project DB with --missions missions, each with --tasks tasks,
+--messages messages and --activity activity rows, plus --agents agents
+(common.make_project). Then it runs every agent concurrently for --duration
+seconds, each in its own mission (agent k works in mission k mod N), while
+--monitors readers poll the board the way the monitor and brain crons do.
+
+--via cli runs the `mc` script, one process per command, as agents do:
+
+  agent:   checkin → list --mine → claim-next → start <id> → done <id>
+  monitor: board
+
+With --full the agent's tick is one call instead, which also returns its
+tasks and unread messages:
+
+  agent:   checkin --full --claim → start <id> → done <id>
+
+--via http drives mobile/mc-server.py instead. It has no checkin or start
+route, and its claim-next starts the task, so the agent loop there is:
+
+  agent:   GET board → POST claim-next → POST task/<id>/complete
+  monitor: GET board
+
+or with --full:
+
+  agent:   POST checkin {"claim": true} → POST task/<id>/complete
+
+--idle-agents adds agents that only send heartbeats (`checkin`, or POST
+checkin {"full": false}) back to back, the write traffic of a large fleet
+between tasks. --heartbeat-interval sets MC_HEARTBEAT_INTERVAL (or the
+server's --heartbeat-interval); 0 writes every heartbeat, as before
+coalescing, so the two runs show what coalescing saves in busy counts.
+
+Reports throughput and p50/p99 latency per operation, errors, and how often
+SQLite was busy. For the CLI that means commands that failed with
+"database is locked". For HTTP it is the number of busy retries on the
+server (mc_db_busy_retries_total from /metrics), or null if the revision
+under test has no /metrics.
+
+Everything runs offline against a throwaway DB. With --rev the whole tree
+at that revision (mc, mc_core.py, schema.sql, mobile/) is tested instead of
+the working tree, with the DB built from that revision's schema.sql. The
+same arguments always build the same project. Revisions older than a
+command or route the loop uses report it as errors, or as agents that
+never claim anything.
+
+Usage:
+  python3 bench/agent_loop.py
+  python3 bench/agent_loop.py --via http --agents 16 --monitors 4
+  python3 bench/agent_loop.py --full
+  python3 bench/agent_loop.py --idle-agents 32 --heartbeat-interval 0
+  python3 bench/agent_loop.py --missions 10 --tasks 5000 --messages 20000 --activity 50000
+  python3 bench/agent_loop.py --via http --rev f4f4513 --out /tmp/old.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import quote
+
+from common import ROOT, checkout_tree, make_project, percentile, start_server
+
+CLAIMED_RE = re.compile(r"Claimed #(\d+)")
+BUSY_RE = re.compile(r"^mc_db_busy_retries_total(?:\{.*\})? (\S+)$", re.M)
+
+
+class Recorder:
+    """Latencies, errors and busy counts per operation, shared by all loop threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.busy = defaultdict(int)
+        self.loops = defaultdict(int)
+
+    def add(self, op: str, seconds: float, error: bool = False, busy: bool = False) -> None:
+        with self.lock:
+            self.latency[op].append(seconds)
+            self.errors[op] += error
+            self.busy[op] += busy
+
+    def summary(self, duration: float) -> dict:
+        return {op: {
+            "count": len(times),
+            "per_second": round(len(times) / duration, 1),
+            "p50_ms": round(percentile(times, 50) * 1000, 1),
+            "p99_ms": round(percentile(times, 99) * 1000, 1),
+            "errors": self.errors[op],
+            "busy": self.busy[op],
+        } for op, times in sorted(self.latency.items())}
+
+
+class Cli:
+    """Run `mc` commands with MC_DB/MC_AGENT/MC_MISSION set, as an agent's cron would."""
+
+    def __init__(self, tree: Path, db: Path, home: Path, full: bool = False):
+        self.mc, self.full = tree / "mc", full
+        self.env = {**os.environ, "HOME": str(home), "MC_DB": str(db)}
+        for key in ("MC_PROJECT", "MC_WORKSPACE"):
+            self.env.pop(key, None)
+
+    def run(self, rec: Recorder, op: str, agent: str, mission: str, *argv: str) -> subprocess.CompletedProcess:
+        env = {**self.env, "MC_AGENT": agent, "MC_MISSION": mission}
+        t0 = time.perf_counter()
+        proc = subprocess.run([str(self.mc), *argv], env=env, capture_output=True, text=True)
+        busy = "database is locked" in proc.stderr
+        # claim-next exits 1 when nothing is claimable; that is not an error
+        idle = op in ("claim-next", "checkin --full") and "No claimable tasks" in proc.stdout
+        rec.add(op, time.perf_counter() - t0, error=proc.returncode != 0 and not idle, busy=busy)
+        return proc
+
+    def agent(self, rec: Recorder, agent: str, mission: str) -> None:
+        if self.full:
+            proc = self.run(rec, "checkin --full", agent, mission, "checkin", "--full", "--claim")
+        else:
+            self.run(rec, "checkin", agent, mission, "checkin")
+            self.run(rec, "list --mine", agent, mission, "list", "--mine")
+            proc = self.run(rec, "claim-next", agent, mission, "claim-next")
+        match = CLAIMED_RE.search(proc.stdout)
+        if match:
+            self.run(rec, "start", agent, mission, "start", match.group(1))
+            self.run(rec, "done", agent, mission, "done", match.group(1))
+
+    def heartbeat(self, rec: Recorder, agent: str, mission: str) -> None:
+        self.run(rec, "heartbeat", agent, mission, "checkin")
+
+    def monitor(self, rec: Recorder, mission: str) -> None:
+        self.run(rec, "board", "monitor", mission, "board")
+
+
+class Http:
+    """Call mc-server's mission-scoped API routes."""
+
+    def __init__(self, base: str, token: str, project: str, full: bool = False):
+        self.base, self.token, self.project, self.full = base, token, quote(project), full
+
+    def call(self, rec: Recorder, op: str, mission: str, path: str, body: dict | None = None) -> dict | None:
+        url = f"{self.base}/api/p/{self.project}/m/{quote(mission)}{path}?token={self.token}"
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req) as resp:
+                payload = json.load(resp)
+            rec.add(op, time.perf_counter() - t0)
+            return payload
+        except urllib.error.HTTPError as e:
+            # 409 from claim-next: nothing claimable, or lost the race
+            rec.add(op, time.perf_counter() - t0, error=e.code != 409)
+            return None
+
+    def agent(self, rec: Recorder, agent: str, mission: str) -> None:
+        if self.full:
+            result = self.call(rec, "checkin", mission, "/checkin", {"agent": agent, "claim": True})
+            task = result and result.get("claimed")
+        else:
+            self.call(rec, "board", mission, "/board")
+            result = self.call(rec, "claim-next", mission, "/claim-next", {"agent": agent})
+            task = result and result.get("task")
+        if task:
+            self.call(rec, "complete", mission, f"/task/{task['id']}/complete", {})
+
+    def heartbeat(self, rec: Recorder, agent: str, mission: str) -> None:
+        self.call(rec, "heartbeat", mission, "/checkin", {"agent": agent, "full": False})
+
+    def monitor(self, rec: Recorder, mission: str) -> None:
+        self.call(rec, "board", mission, "/board")
+
+    def busy_retries(self) -> float | None:
+        """Busy retries so far, summed over routes; None if the server has no /metrics."""
+        try:
+            with urllib.request.urlopen(f"{self.base}/metrics?token={self.token}") as resp:
+                text = resp.read().decode()
+        except urllib.error.HTTPError:
+            return None
+        if "# TYPE mc_db_query_duration_seconds" not in text:
+            return None  # Not mc-server's metrics; the busy counter is only listed once non-zero
+        return sum(float(v) for v in BUSY_RE.findall(text))
+
+
+def revision(rev: str | None) -> str:
+    """Commit under test; `-dirty` when it is the working tree with local changes."""
+    if rev:
+        return subprocess.run(["git", "-C", str(ROOT), "rev-parse", "--short", rev],
+                              capture_output=True, text=True).stdout.strip()
+    return subprocess.run(["git", "-C", str(ROOT), "describe", "--always", "--dirty"],
+                          capture_output=True, text=True).stdout.strip()
+
+
+def drive(client, rec: Recorder, agents: list[str], idle: list[str], monitors: int, missions: list[str],
+          duration: float, interval: float) -> float:
+    """Run every agent and idle-agent loop back to back and every monitor every `interval` seconds;
+    return the elapsed time."""
+    stop = time.monotonic() + duration
+
+    def agent_loop(k: int, name: str) -> None:
+        while time.monotonic() < stop:
+            client.agent(rec, name, missions[k % len(missions)])
+            with rec.lock:
+                rec.loops["agent"] += 1
+
+    def idle_loop(k: int, name: str) -> None:
+        while time.monotonic() < stop:
+            client.heartbeat(rec, name, missions[k % len(missions)])
+            with rec.lock:
+                rec.loops["idle"] += 1
+
+    def monitor_loop(k: int) -> None:
+        while time.monotonic() < stop:
+            started = time.monotonic()
+            client.monitor(rec, missions[k % len(missions)])
+            with rec.lock:
+                rec.loops["monitor"] += 1
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    threads = [threading.Thread(target=agent_loop, args=(k, n)) for k, n in enumerate(agents)]
+    threads += [threading.Thread(target=idle_loop, args=(k, n)) for k, n in enumerate(idle)]
+    threads += [threading.Thread(target=monitor_loop, args=(k,)) for k in range(monitors)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay agent loops against the mc CLI or mc-server")
+    parser.add_argument("--via", choices=("cli", "http"), default="cli")
+    parser.add_argument("--missions", type=int, default=4)
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks per mission")
+    parser.add_argument("--agents", type=int, default=8, help="Concurrent agent loops")
+    parser.add_argument("--messages", type=int, default=2000, help="Messages per mission")
+    parser.add_argument("--activity", type=int, default=5000, help="Activity rows per mission")
+    parser.add_argument("--idle-agents", type=int, default=0, help="Extra agents that only send heartbeats")
+    parser.add_argument("--heartbeat-interval", type=int,
+                        help="MC_HEARTBEAT_INTERVAL / mc-server --heartbeat-interval (default: the tree's own)")
+    parser.add_argument("--monitors", type=int, default=2, help="Concurrent board readers")
+    parser.add_argument("--monitor-interval", type=float, default=1.0, help="Seconds between board reads")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run")
+    parser.add_argument("--full", action="store_true", help="One checkin --full call per tick instead of several")
+    parser.add_argument("--port", type=int, default=13739, help="mc-server port for --via http")
+    parser.add_argument("--rev", help="Test the tree at this git revision instead of the working tree")
+    parser.add_argument("--out", type=Path, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    tree = checkout_tree(args.rev) if args.rev else ROOT
+    tmp = Path(tempfile.mkdtemp(prefix="mc-bench-"))
+    db = tmp / "mission-control.db"
+    missions = make_project(db, args.missions, args.tasks, args.agents, args.messages, args.activity,
+                            schema=tree / "schema.sql")
+    agents = [f"agent-{k}" for k in range(args.agents)]
+    idle = [f"idle-{k}" for k in range(args.idle_agents)]
+
+    rec = Recorder()
+    busy = None
+    if args.via == "cli":
+        (tmp / "home").mkdir()
+        cli = Cli(tree, db, tmp / "home", args.full)
+        if args.heartbeat_interval is not None:
+            cli.env["MC_HEARTBEAT_INTERVAL"] = str(args.heartbeat_interval)
+        elapsed = drive(cli, rec, agents, idle, args.monitors, missions, args.duration, args.monitor_interval)
+    else:
+        extra = ["--heartbeat-interval", str(args.heartbeat_interval)] if args.heartbeat_interval is not None else []
+        proc, token = start_server(db, args.port, server=tree / "mobile" / "mc-server.py", extra=extra)
+        try:
+            client = Http(f"http://127.0.0.1:{args.port}", token, "(custom)", args.full)
+            before = client.busy_retries()
+            elapsed = drive(client, rec, agents, idle, args.monitors, missions, args.duration, args.monitor_interval)
+            after = client.busy_retries()
+            busy = int(after - before) if before is not None and after is not None else None
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    ops = rec.summary(elapsed)
+    total = sum(o["count"] for o in ops.values())
+    with contextlib.closing(sqlite3.connect(db)) as conn:
+        done = conn.execute("SELECT COUNT(*) FROM tasks WHERE status = 'done'").fetchone()[0]
+    report = {
+        "bench": "agent_loop", "via": args.via, "full": args.full, "revision": revision(args.rev),
+        "project": {"missions": args.missions, "tasks": args.tasks, "agents": args.agents,
+                    "messages": args.messages, "activity": args.activity},
+        "idle_agents": args.idle_agents, "heartbeat_interval": args.heartbeat_interval,
+        "monitors": args.monitors, "seconds": round(elapsed, 1),
+        "loops_per_second": {k: round(v / elapsed, 1) for k, v in sorted(rec.loops.items())},
+        "ops_per_second": round(total / elapsed, 1),
+        "busy": sum(o["busy"] for o in ops.values()) if args.via == "cli" else busy,
+        "busy_rate": (round(sum(o["busy"] for o in ops.values()) / total, 4) if args.via == "cli"
+                      else round(busy / total, 4) if busy is not None and total else None),
+        "errors": sum(o["errors"] for o in ops.values()),
+        "tasks_done": done, "ops": ops,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+board_sync — what the mobile client downloads to stay current: full board vs delta
+
+Runs the server against a synthetic DB of --tasks tasks and, for each
+--changes count, updates that many tasks and times the two ways a client
+can catch up:
+
+  - a full GET /api/board (what the client did on every change and open)
+  - GET /api/board?since=<seq> from the cursor it stored last sync
+
+Bytes are the response bodies as sent (no compression).
+
+Usage:
+  python3 bench/board_sync.py
+  python3 bench/board_sync.py --tasks 20000 --changes 1 10 100 1000
+"""
+
+import argparse
+import json
+import sqlite3
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from common import make_db, percentile, start_server
+
+
+def fetch(url: str, repeat: int) -> tuple[dict, int, dict]:
+    """GET `url` `repeat` times; return (last body, its size in bytes, p50/max ms)."""
+    ms = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(url) as r:
+            raw = r.read()
+        ms.append((time.perf_counter() - t0) * 1000)
+    return json.loads(raw), len(raw), {"p50": round(percentile(ms, 50), 2), "max": round(max(ms), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full-board and delta sync payloads")
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--changes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    db = Path(tempfile.mkdtemp(prefix="mc-bench-")) / "mission-control.db"
+    make_db(db, tasks=args.tasks)
+    proc, token = start_server(db, args.port)
+    base = f"http://127.0.0.1:{args.port}/api/board?token={token}"
+    results = []
+    try:
+        board, _, _ = fetch(base, 1)
+        for k in args.changes:
+            cursor = board["seq"]
+            conn = sqlite3.connect(db)
+            conn.execute("UPDATE tasks SET status = 'in_progress', owner = 'bench', updated_at = datetime('now') "
+                         "WHERE id IN (SELECT id FROM tasks ORDER BY random() LIMIT ?)", (k,))
+            conn.commit()
+            conn.close()
+            board, full_bytes, full_ms = fetch(base, args.repeat)
+            delta, delta_bytes, delta_ms = fetch(f"{base}&since={cursor}", args.repeat)
+            results.append({
+                "changed": k, "delta_tasks": len(delta["tasks"]),
+                "full": {"bytes": full_bytes, "ms": full_ms},
+                "delta": {"bytes": delta_bytes, "ms": delta_ms},
+                "bytes_ratio": round(full_bytes / delta_bytes, 1),
+            })
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print(json.dumps({"bench": "board_sync", "tasks": args.tasks, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
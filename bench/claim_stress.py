@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+claim_stress — concurrent claimers must never both win the same task
+
+Starts N claimer processes against one DB. In `claim` mode every claimer
+walks all task ids in its own random order and tries to claim each one; in
+`claim-next` mode every claimer loops on claim-next until nothing is left.
+Every successful claim is recorded, and the run fails (exit 1) if any task
+was won twice or if the owners in the DB disagree with the winners.
+
+--via cli drives `mc claim` / `mc claim-next` as separate processes instead
+of calling mc_core directly; --rev runs the `mc` script from an older
+commit, e.g. to reproduce double claims with the check-then-update version.
+
+Usage:
+  python3 bench/claim_stress.py
+  python3 bench/claim_stress.py --mode claim-next --claimers 50 --tasks 500
+  python3 bench/claim_stress.py --via cli --tasks 40 --rev f4f4513
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from common import ROOT, checkout, make_db
+
+sys.path.insert(0, str(ROOT))
+import mc_core  # noqa: E402
+
+
+def claimer_core(db: str, agent: str, mode: str, task_ids: list[int], start) -> list[int]:
+    conn = mc_core.connect(db)
+    won = []
+    start.wait()
+    if mode == "claim":
+        random.shuffle(task_ids)
+        for tid in task_ids:
+            try:
+                mc_core.claim(conn, 1, tid, agent)
+                won.append(tid)
+            except mc_core.ClaimError:
+                pass
+    else:
+        while (task := mc_core.claim_next(conn, 1, agent)) is not None:
+            won.append(task["id"])
+    conn.close()
+    return won
+
+
+def claimer_cli(mc: str, db: str, agent: str, mode: str, task_ids: list[int], start) -> list[int]:
+    env = {**os.environ, "MC_DB": db, "MC_AGENT": agent, "MC_MISSION": "default"}
+    won = []
+    start.wait()
+    if mode == "claim":
+        random.shuffle(task_ids)
+        for tid in task_ids:
+            r = subprocess.run([mc, "claim", str(tid)], env=env, capture_output=True, text=True)
+            if r.returncode == 0 and "Claimed" in r.stdout:
+                won.append(tid)
+    else:
+        while True:
+            r = subprocess.run([mc, "claim-next"], env=env, capture_output=True, text=True)
+            if r.returncode != 0:
+                break
+            won.append(int(re.search(r"#(\d+)", r.stdout).group(1)))
+    return won
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent claim stress test")
+    parser.add_argument("--claimers", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--mode", choices=["claim", "claim-next"], default="claim")
+    parser.add_argument("--via", choices=["core", "cli"], default="core")
+    parser.add_argument("--rev", help="With --via cli, run the mc script from this git revision")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="mc-bench-"))
+    db = tmp / "mission-control.db"
+    make_db(db, tasks=args.tasks)
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE tasks SET owner=''")  # as `mc add` leaves unassigned tasks
+    conn.commit()
+    conn.close()
+
+    mc = str(checkout(args.rev, "mc") if args.rev else ROOT / "mc")
+    task_ids = list(range(1, args.tasks + 1))
+    start = multiprocessing.Manager().Event()
+    jobs = []
+    with multiprocessing.Pool(args.claimers) as pool:
+        for i in range(args.claimers):
+            agent = f"agent-{i}"
+            if args.via == "core":
+                jobs.append((agent, pool.apply_async(
+                    claimer_core, (str(db), agent, args.mode, list(task_ids), start))))
+            else:
+                jobs.append((agent, pool.apply_async(
+                    claimer_cli, (mc, str(db), agent, args.mode, list(task_ids), start))))
+        time.sleep(0.5)
+        t0 = time.perf_counter()
+        start.set()
+        winners = {agent: job.get() for agent, job in jobs}
+        elapsed = time.perf_counter() - t0
+
+    wins = Counter(tid for won in winners.values() for tid in won)
+    double = sorted(tid for tid, n in wins.items() if n > 1)
+    conn = sqlite3.connect(db)
+    owners = dict(conn.execute("SELECT id, owner FROM tasks WHERE owner != ''"))
+    conn.close()
+    mismatched = sorted(tid for won_by, won in winners.items() for tid in won
+                        if owners.get(tid) != won_by and tid not in double)
+
+    result = {
+        "bench": "claim_stress", "mode": args.mode, "via": args.via,
+        "rev": args.rev or "working-tree", "claimers": args.claimers, "tasks": args.tasks,
+        "seconds": round(elapsed, 2),
+        "claimed": len(wins), "unclaimed": args.tasks - len(wins),
+        "double_claims": len(double), "double_claimed_ids": double[:20],
+        "owner_mismatches": len(mismatched),
+    }
+    print(json.dumps(result, indent=2))
+    sys.exit(1 if double or mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+cli_spawns — wall-clock time and process spawns per `mc` command
+
+Runs `board`, `done`, `checkin` and `cron-guard` repeatedly with the
+working-tree `mc` and with the script from an older revision, against
+identical DBs under a throwaway HOME (with a config.json, as after
+install.sh). Every external program `mc` can start is shadowed by a PATH
+shim that logs its name, so the process count per command is exact.
+`openclaw` is the fake from setup_provision.py, holding --jobs cron jobs
+and sleeping --latency seconds per call.
+
+Usage:
+  python3 bench/cli_spawns.py --rev f4f4513
+  python3 bench/cli_spawns.py --rev f4f4513 --runs 50 --tasks 1000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from common import ROOT, checkout, make_db
+from setup_provision import FAKE_OPENCLAW
+
+SHIMMED = ["sqlite3", "python3", "grep", "head", "cut", "sed", "date", "whoami",
+           "readlink", "realpath", "dirname", "cat", "basename", "du", "tr", "openclaw"]
+
+
+def make_shims(bin_dir: Path, log: Path) -> None:
+    bin_dir.mkdir(parents=True)
+    (bin_dir.parent / "openclaw").write_text(FAKE_OPENCLAW)
+    (bin_dir.parent / "openclaw").chmod(0o755)
+    for name in SHIMMED:
+        real = str(bin_dir.parent / "openclaw") if name == "openclaw" else shutil.which(name)
+        if real is None:
+            continue
+        shim = bin_dir / name
+        shim.write_text(f'#!/bin/sh\necho {name} >> "{log}"\nexec "{real}" "$@"\n')
+        shim.chmod(0o755)
+
+
+def make_home(home: Path, tasks: int, runs: int) -> None:
+    """Project 'bench' with `tasks` pending tasks; tasks 1..runs each block one dependent."""
+    project = home / ".openclaw" / "projects" / "bench"
+    project.mkdir(parents=True)
+    (home / ".openclaw" / "config.json").write_text(json.dumps({
+        "default_project": "bench",
+        "projects": {"bench": {"default_mission": "default"}},
+    }, separators=(",", ":")))
+    db = project / "mission-control.db"
+    make_db(db, tasks=tasks)
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE tasks SET owner=''")
+    conn.executemany("UPDATE tasks SET status='blocked', blocked_by=json_array(?) WHERE id=?",
+                     [(i, tasks - i + 1) for i in range(1, runs + 1)])
+    conn.commit()
+    conn.close()
+
+
+def make_jobs(state: Path, jobs: int) -> None:
+    """openclaw state with `jobs` cron jobs, bench-default-agent0 upwards."""
+    state.write_text(json.dumps({"agents": [], "adds": 0,
+                                 "jobs": [f"bench-default-agent{i}" for i in range(jobs)]}))
+
+
+def measure(mc: Path, home: Path, shims: Path, log: Path, args: list[list[str]], latency: float) -> dict:
+    env = {**os.environ, "HOME": str(home), "MC_AGENT": "bench",
+           "PATH": f"{shims}:{os.environ['PATH']}",
+           "FAKE_OPENCLAW_STATE": str(home / "openclaw.json"), "FAKE_OPENCLAW_LOG": os.devnull,
+           "FAKE_OPENCLAW_LATENCY": str(latency)}
+    for key in ("MC_DB", "MC_PROJECT", "MC_WORKSPACE", "MC_MISSION"):
+        env.pop(key, None)
+    log.write_text("")
+    t0 = time.perf_counter()
+    for argv in args:
+        subprocess.run([str(mc), *argv], env=env, cwd=home, check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - t0
+    spawns = Counter(log.read_text().split())
+    return {
+        "ms_per_cmd": round(1000 * elapsed / len(args), 1),
+        "spawns_per_cmd": round(sum(spawns.values()) / len(args), 1),
+        "by_program": {k: round(v / len(args), 1) for k, v in spawns.most_common()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-command time and process spawns for mc")
+    parser.add_argument("--rev", required=True, help="Compare against mc from this git revision")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=100, help="openclaw cron jobs")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per openclaw call")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="mc-bench-"))
+    log = tmp / "spawns.log"
+    make_shims(tmp / "shims", log)
+    old = checkout(args.rev, "mc")
+    shutil.copy(ROOT / "schema.sql", old.parent / "schema.sql")
+    # Modules that revision's mc execs, where it has them
+    for module in ("mc_core.py", "mc_cron.py"):
+        data = subprocess.run(["git", "-C", str(ROOT), "show", f"{args.rev}:{module}"], capture_output=True)
+        if data.returncode == 0:
+            (old.parent / module).write_bytes(data.stdout)
+
+    commands = {
+        "board": [["board"]] * args.runs,
+        "checkin": [["checkin"]] * args.runs,
+        "done": [["done", str(i)] for i in range(1, args.runs + 1)],
+        # An agent tick: disable own cron on start, enable it again at the end
+        "cron-guard": [["cron-guard", op, f"bench-default-agent{i % args.jobs}"]
+                       for i in range(args.runs // 2) for op in ("disable", "enable")],
+    }
+    results = {}
+    for label, mc in ((args.rev, old), ("working-tree", ROOT / "mc")):
+        home = tmp / f"home-{label}"
+        make_home(home, args.tasks, args.runs)
+        make_jobs(home / "openclaw.json", args.jobs)
+        results[label] = {name: measure(mc, home, tmp / "shims", log, argv, args.latency)
+                          for name, argv in commands.items()}
+
+    print(json.dumps({"bench": "cli_spawns", "runs": args.runs, "tasks": args.tasks,
+                      "jobs": args.jobs, "latency": args.latency,
+                      "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
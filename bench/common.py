@@ -0,0 +1,143 @@
+"""Shared helpers for the bench/ scripts: synthetic DBs and server processes."""
+
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+sys.path.insert(0, str(ROOT))
+import mc_core  # noqa: E402
+
+
+def create_schema(conn: sqlite3.Connection, schema: Path | None) -> None:
+    """Apply `schema` (default: the working tree's), stamped with its version as `mc init` does."""
+    conn.executescript((schema or ROOT / "schema.sql").read_text())
+    if schema is None:
+        conn.execute(f"PRAGMA user_version={mc_core.SCHEMA_VERSION}")
+    conn.execute("PRAGMA journal_mode=WAL")
+
+
+def make_db(path: Path, tasks: int = 500, messages: int = 0, schema: Path | None = None) -> None:
+    """Create a project DB with `tasks` tasks and `messages` task comments in mission 1."""
+    conn = sqlite3.connect(path)
+    create_schema(conn, schema)
+    conn.executemany(
+        "INSERT INTO tasks(mission_id, subject, priority) VALUES(1, ?, ?)",
+        [(f"task {i}", i % 3) for i in range(tasks)],
+    )
+    conn.executemany(
+        "INSERT INTO messages(mission_id, from_agent, task_id, body) VALUES(1, 'bench', ?, ?)",
+        [(i % max(tasks, 1) + 1, f"note {i}") for i in range(messages)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def make_project(path: Path, missions: int, tasks: int, agents: int, messages: int = 0,
+                 activity: int = 0, schema: Path | None = None, seed: int = 1) -> list[str]:
+    """Create a project DB with missions m1..mN, each holding `tasks` tasks, `messages`
+    messages and `activity` activity rows, and agents agent-0..agent-(K-1). Returns the
+    mission names.
+
+    Tasks are 70% pending and unowned, 20% done and 10% in progress; half of
+    the messages are unread.
+    """
+    rng = random.Random(seed)
+    names = [f"agent-{k}" for k in range(agents)]
+    conn = sqlite3.connect(path)
+    create_schema(conn, schema)
+    conn.executemany("INSERT INTO agents(name, role, status, last_seen) VALUES(?, 'dev', 'idle', datetime('now'))",
+                     [(n,) for n in names])
+    missions_out = []
+    for m in range(1, missions + 1):
+        mid = conn.execute("INSERT INTO missions(name, description) VALUES(?, 'bench')", (f"m{m}",)).lastrowid
+        missions_out.append(f"m{m}")
+        rows = []
+        for i in range(tasks):
+            roll = rng.random()
+            status, owner = ("pending", "") if roll < 0.7 else ("done", rng.choice(names)) if roll < 0.9 \
+                else ("in_progress", rng.choice(names))
+            rows.append((mid, f"task {m}.{i}", status, owner, i % 3))
+        conn.executemany("INSERT INTO tasks(mission_id, subject, status, owner, priority) VALUES(?, ?, ?, ?, ?)", rows)
+        conn.executemany(
+            "INSERT INTO messages(mission_id, from_agent, to_agent, body, read_at) VALUES(?, ?, ?, ?, ?)",
+            [(mid, rng.choice(names), rng.choice(names), f"note {m}.{i}", None if i % 2 else "2000-01-01")
+             for i in range(messages)])
+        conn.executemany(
+            "INSERT INTO activity(mission_id, agent, action, target_type, target_id, detail) VALUES(?, ?, ?, 'task', ?, '')",
+            [(mid, rng.choice(names), rng.choice(("checkin", "task_claimed", "task_done")), rng.randint(1, max(tasks, 1)))
+             for _ in range(activity)])
+    conn.commit()
+    conn.close()
+    return missions_out
+
+
+def checkout(rev: str, path: str) -> Path:
+    """Extract `path` as of git revision `rev` into a temp dir and return it."""
+    out = Path(tempfile.mkdtemp(prefix=f"mc-{rev}-")) / Path(path).name
+    data = subprocess.run(["git", "-C", str(ROOT), "show", f"{rev}:{path}"],
+                          check=True, capture_output=True).stdout
+    out.write_bytes(data)
+    out.chmod(0o755)
+    return out
+
+
+def checkout_tree(rev: str) -> Path:
+    """Extract the whole tree at git revision `rev` into a temp dir and return it."""
+    out = Path(tempfile.mkdtemp(prefix=f"mc-{rev}-"))
+    archive = subprocess.run(["git", "-C", str(ROOT), "archive", rev], check=True, capture_output=True).stdout
+    subprocess.run(["tar", "-x", "-C", str(out)], input=archive, check=True)
+    return out
+
+
+def start_server(db: Path, port: int, server: Path | None = None,
+                 extra: list[str] | None = None) -> tuple[subprocess.Popen, str]:
+    """Start mc-server.py on `port` and return (process, token)."""
+    server = server or ROOT / "mobile" / "mc-server.py"
+    proc = subprocess.Popen(
+        [sys.executable, "-u", str(server), "--db", str(db), "--port", str(port), *(extra or [])],
+        cwd=server.parent, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    for line in proc.stdout:
+        if "Token:" in line:
+            token = line.split("Token:")[1].strip()
+            break
+    else:
+        raise RuntimeError("server exited before printing its token")
+    threading.Thread(target=proc.stdout.read, daemon=True).start()
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc, token
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start listening")
+
+
+def cpu_seconds(pid: int) -> float:
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLK_TCK
+
+
+def proc_status(pid: int, key: str) -> int:
+    """Integer field from /proc/<pid>/status, e.g. Threads or VmRSS (kB)."""
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith(f"{key}:"):
+            return int(line.split()[1])
+    return 0
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+fts_search — time `mc search` (mc_core.search) on a large message history
+
+Builds a project DB with --messages messages spread over --missions
+missions, inserted through schema.sql's triggers so messages_fts is filled
+exactly as in production. Bodies are 12 words drawn from a Zipf-distributed
+vocabulary, so a few words are in most messages and most words are rare.
+Reports the insert cost of the triggers and per-query latency (p50/p95/max)
+for single words by frequency band, two-word queries, phrases and prefixes.
+
+The "stopword" band (the 10 most frequent words, in 10-70% of all
+messages) and phrases made of such words are the worst cases: their
+doclists are long, and every query also intersects the mission's own
+doclist. Prefix queries of 2 and 3 characters are served by the prefix
+index (prefix='2 3'); longer ones merge the doclists of every term that
+matches.
+
+Usage:
+  python3 bench/fts_search.py
+  python3 bench/fts_search.py --messages 200000 --queries 50
+  python3 bench/fts_search.py --db /tmp/fts-1m.db   # reuse the DB between runs
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT, percentile
+
+sys.path.insert(0, str(ROOT))
+import mc_core  # noqa: E402
+
+VOCABULARY = 20000
+BATCH = 50000
+
+
+def word(rank: int) -> str:
+    return f"w{rank}"
+
+
+def build(db: Path, messages: int, missions: int) -> dict:
+    conn = sqlite3.connect(db)
+    conn.executescript((ROOT / "schema.sql").read_text())
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executemany("INSERT OR IGNORE INTO missions(id, name) VALUES(?, ?)",
+                     [(m, f"m{m}") for m in range(2, missions + 1)])
+    rng = random.Random(1)
+    weights = list(itertools.accumulate(1 / r for r in range(1, VOCABULARY + 1)))
+    t0 = time.perf_counter()
+    for start in range(0, messages, BATCH):
+        rows = [(i % missions + 1, " ".join(word(r + 1) for r in rng.choices(range(VOCABULARY), cum_weights=weights, k=12)))
+                for i in range(start, min(start + BATCH, messages))]
+        conn.executemany("INSERT INTO messages(mission_id, from_agent, body) VALUES(?, 'bench', ?)", rows)
+        conn.commit()
+    seconds = time.perf_counter() - t0
+    conn.execute("INSERT INTO messages_fts(messages_fts) VALUES('optimize')")
+    conn.commit()
+    conn.close()
+    return {"seconds": round(seconds, 1), "rows_per_second": round(messages / seconds)}
+
+
+def trigger_cost(db: Path, rows: int = 10000) -> dict:
+    """Per-row insert time with and without the messages_fts trigger (both rolled back)."""
+    conn = sqlite3.connect(db, isolation_level=None)
+    body = " ".join(word(r) for r in range(100, 112))
+    result = {}
+    for label in ("with_fts", "without_fts"):
+        conn.execute("BEGIN IMMEDIATE")
+        if label == "without_fts":
+            conn.execute("DROP TRIGGER messages_fts_insert")
+        t0 = time.perf_counter()
+        conn.executemany("INSERT INTO messages(mission_id, from_agent, body) VALUES(1, 'bench', ?)",
+                         [(body,)] * rows)
+        result[f"{label}_us_per_row"] = round((time.perf_counter() - t0) / rows * 1e6, 1)
+        conn.execute("ROLLBACK")
+    conn.close()
+    return result
+
+
+def queries(conn: sqlite3.Connection, rng: random.Random, n: int) -> dict[str, list[str]]:
+    def band(lo, hi):
+        return [word(rng.randint(lo, hi)) for _ in range(n)]
+
+    def phrase():
+        # Two adjacent words of a stored message, so the phrase does occur
+        words = conn.execute("SELECT body FROM messages WHERE id = ?", (rng.randint(1, count),)).fetchone()[0].split()
+        i = rng.randrange(len(words) - 1)
+        return f'"{words[i]} {words[i + 1]}"'
+
+    count = conn.execute("SELECT MAX(id) FROM messages").fetchone()[0]
+    return {
+        "stopword (rank 1-10)": band(1, 10),
+        "common (rank 11-200)": band(11, 200),
+        "medium (rank 201-2000)": band(201, 2000),
+        "rare (rank 2001-20000)": band(2001, VOCABULARY),
+        "two words (rank 1-200)": [f"{a} {b}" for a, b in zip(band(1, 200), band(1, 200))],
+        "phrase (from a message)": [phrase() for _ in range(n)],
+        "prefix (w1*-w9*)": [f"{word(rng.randint(1, 9))}*" for _ in range(n)],
+        "prefix (w10*-w99*)": [f"{word(rng.randint(10, 99))}*" for _ in range(n)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time full-text search on a large message history")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--missions", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=30, help="Queries per category")
+    parser.add_argument("--db", type=Path, help="DB to reuse (built here if missing)")
+    args = parser.parse_args()
+
+    db = args.db or Path(tempfile.mkdtemp(prefix="mc-bench-")) / "mission-control.db"
+    build_stats = build(db, args.messages, args.missions) if not db.exists() else None
+
+    conn = mc_core.connect(str(db))
+    total = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    rng = random.Random(2)
+    results = {}
+    for category, texts in queries(conn, rng, args.queries).items():
+        timings, hits = [], []
+        for text in texts:
+            mid = rng.randint(1, args.missions)
+            mc_core.search(conn, mid, text, ("msg",))  # warm the page cache for this doclist
+            t0 = time.perf_counter()
+            rows = mc_core.search(conn, mid, text, ("msg",))
+            timings.append((time.perf_counter() - t0) * 1000)
+            hits.append(len(rows))
+        results[category] = {
+            "p50_ms": round(percentile(timings, 50), 1), "p95_ms": round(percentile(timings, 95), 1),
+            "max_ms": round(max(timings), 1), "avg_results": round(sum(hits) / len(hits), 1),
+        }
+    conn.close()
+
+    print(json.dumps({
+        "bench": "fts_search", "messages": total, "missions": args.missions,
+        "rank_window": mc_core.RANK_WINDOW, "db_mb": round(os.path.getsize(db) / 1e6),
+        "build": build_stats, "insert": trigger_cost(db), "queries": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+lease_reclaim — cost of claim leases: the per-command probe, the reclaim sweep and renewal
+
+Builds a one-mission project with --tasks tasks and --agents agents, then
+gives --leased of the tasks a claim with a live lease spread over the next
+two hours. It times:
+
+  - the reclaim probe when no lease has expired (what every command pays)
+  - reclaiming --expired tasks whose lease ran out, as one sweep
+  - a heartbeat checkin that renews an agent's leases, and a fresh one
+    that has nothing to renew (no write)
+
+Usage:
+  python3 bench/lease_reclaim.py
+  python3 bench/lease_reclaim.py --tasks 500000 --leased 50000 --expired 5000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT, make_project, percentile
+
+sys.path.insert(0, str(ROOT))
+import mc_core  # noqa: E402
+
+
+def timed(fn, repeat: int) -> dict:
+    ms = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        ms.append((time.perf_counter() - t0) * 1000)
+    return {"p50": round(percentile(ms, 50), 3), "max": round(max(ms), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time lease probes, reclaim sweeps and renewals")
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--leased", type=int, default=10000)
+    parser.add_argument("--expired", type=int, default=1000, help="Leased tasks whose lease runs out for the sweep")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    db = Path(tempfile.mkdtemp(prefix="mc-bench-")) / "mission-control.db"
+    make_project(db, missions=1, tasks=args.tasks, agents=args.agents)
+    rng = random.Random(1)
+    conn = mc_core.connect(db)
+    mid = conn.execute("SELECT id FROM missions WHERE name = 'm1'").fetchone()[0]
+    ids = [r[0] for r in conn.execute("SELECT id FROM tasks WHERE status = 'pending' LIMIT ?", (args.leased,))]
+    conn.executemany(
+        "UPDATE tasks SET status = 'claimed', owner = ?, lease_expires_at = datetime('now', ?) WHERE id = ?",
+        [(f"agent-{k % args.agents}", f"+{rng.randint(600, 7200)} seconds", tid) for k, tid in enumerate(ids)])
+    conn.commit()
+
+    probe = timed(lambda: mc_core.reclaim_expired(conn, mid, "bench"), args.repeat)
+
+    conn.execute("UPDATE tasks SET lease_expires_at = datetime('now', '-1 minute') WHERE id IN "
+                 "(SELECT value FROM json_each(?))", (json.dumps(ids[:args.expired]),))
+    conn.commit()
+    t0 = time.perf_counter()
+    reclaimed = mc_core.reclaim_expired(conn, mid, "bench")
+    sweep_ms = (time.perf_counter() - t0) * 1000
+
+    # agent-1's leases are all under half left: the next heartbeat renews them
+    conn.execute("UPDATE tasks SET lease_expires_at = datetime('now', '+10 minutes') "
+                 "WHERE owner = 'agent-1' AND lease_expires_at IS NOT NULL")
+    conn.commit()
+    owned = conn.execute(
+        "SELECT COUNT(*) FROM tasks WHERE owner = 'agent-1' AND lease_expires_at IS NOT NULL").fetchone()[0]
+    t0 = time.perf_counter()
+    mc_core.checkin(conn, "m1", "agent-1", interval=0)
+    renew_ms = (time.perf_counter() - t0) * 1000
+    fresh = timed(lambda: mc_core.checkin(conn, "m1", "agent-1"), args.repeat)
+    conn.close()
+
+    print(json.dumps({
+        "bench": "lease_reclaim", "tasks": args.tasks, "leased": args.leased,
+        "probe_nothing_expired_ms": probe,
+        "sweep": {"expired": args.expired, "reclaimed": len(reclaimed), "ms": round(sweep_ms, 2)},
+        "checkin_renewing_ms": {"leases": owned, "ms": round(renew_ms, 2)},
+        "checkin_fresh_ms": fresh,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
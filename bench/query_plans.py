@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+query_plans — fail if a hot query falls back to a table scan
+
+Runs the mc_core commands agents use on every tick against a seeded DB,
+records every statement they execute (with the bound values expanded), and
+adds the hot queries that still live in `mc` and mc-server.py. Each one is
+checked with EXPLAIN QUERY PLAN; a `SCAN` of a real table or index is a
+failure (exit 1), except for the small agents and missions tables. Scans of
+json_each, CTEs and subqueries are fine: they are bounded by what the
+indexed part of the query returned. Statements that still sort in a temp
+b-tree are counted, not failed.
+
+Usage:
+  python3 bench/query_plans.py
+  python3 bench/query_plans.py --tasks 20000 --verbose
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+from common import ROOT, make_db
+
+sys.path.insert(0, str(ROOT))
+import mc_core  # noqa: E402
+import mc_schedule  # noqa: E402
+
+# Commands run in this order, so the writes see a realistic DB.
+COMMANDS = [
+    ["checkin"], ["checkin", "--full"], ["checkin", "--full", "--claim"], ["board"], ["list"], ["list", "--all"], ["list", "--mine"],
+    ["list", "--status", "blocked"], ["list", "--owner", "bob"],
+    ["claim", "1"], ["claim-next"], ["start", "1"], ["block", "3", "--by", "4"],
+    ["done", "4"], ["done", "1", "-m", "shipped"], ["graph"],
+    ["inbox", "--unread"], ["inbox"], ["mission", "status"], ["search", "msg"],
+    ["fleet"], ["feed"], ["feed", "--agent", "bob"],
+    ["--json", "board"], ["--ndjson", "list", "--mine"], ["--json", "fleet"], ["--json", "feed"],
+    ["--json", "inbox"], ["inbox", "--after", "900", "--limit", "5"], ["feed", "--after", "900"],
+    ["list", "--after", "20", "--limit", "10"], ["list", "--all", "--after", "20", "--limit", "10"], ["board", "--limit", "3"],
+]
+
+# `mc schedule` subcommands (mc_schedule.py), run after COMMANDS
+SCHEDULE_COMMANDS = [["run", "--dry-run"], ["run", "--cap", "3"], ["show"], ["show", "--after", "3", "--limit", "1"]]
+
+# Hot queries that are not in mc_core.py; keep in step with the source.
+EXTRA = {
+    "mc summary": "SELECT COUNT(*) FROM tasks WHERE status='in_progress' AND mission_id=1",
+    "server tasks": "SELECT id, status FROM tasks WHERE mission_id = 1 ORDER BY "
+                    "CASE status WHEN 'in_progress' THEN 1 ELSE 2 END, priority DESC, id",
+    "server task detail": "SELECT id, from_agent, body, msg_type, created_at FROM messages "
+                          "WHERE task_id = 7 AND id < 900 ORDER BY id DESC LIMIT 51",
+    "server changelog": "SELECT row_key FROM changelog WHERE tbl = 'tasks' AND mission_id = 1 "
+                        "AND seq > 10 AND op = 'upsert'",
+    "server activity": "SELECT id, agent, action FROM activity WHERE id > 100 ORDER BY id",
+    "server next due": mc_core.NEXT_DUE_SQL,
+    "server metrics gauges": (
+        "SELECT 'tasks', m.name, t.status, COUNT(*) FROM missions m JOIN tasks t ON t.mission_id = m.id "
+        "WHERE m.status IN ('active', 'paused') GROUP BY m.id, t.status UNION ALL "
+        "SELECT 'unread', m.name, u.to_agent, u.n FROM (SELECT mission_id, to_agent, COUNT(*) AS n "
+        "FROM messages WHERE read_at IS NULL AND to_agent IS NOT NULL GROUP BY to_agent, mission_id) u "
+        "JOIN missions m ON m.id = u.mission_id WHERE m.status IN ('active', 'paused') UNION ALL "
+        "SELECT 'seen', NULL, name, last_seen FROM agents"),
+}
+
+# One row per agent or mission, and queries that scan them want all of them.
+FULL_SCAN_OK = {"agents", "missions"}
+
+# "-- ..." lines are statements FTS5 runs on its shadow tables from the triggers
+SKIP = re.compile(r"^\s*(BEGIN|COMMIT|ROLLBACK|PRAGMA|SAVEPOINT|RELEASE\b|--)", re.I)
+SOURCE = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.I)
+
+
+def seed(db: Path, tasks: int) -> None:
+    make_db(db, tasks=tasks, messages=tasks)
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE tasks SET owner = '', status = CASE id % 7 WHEN 0 THEN 'done' "
+                 "WHEN 1 THEN 'in_progress' ELSE 'pending' END WHERE id > 10")
+    # Some come due before the first command (its activation pass), some stay waiting
+    conn.execute("UPDATE tasks SET scheduled_at = CASE id % 50 WHEN 3 THEN datetime('now', '-1 hour') "
+                 "ELSE datetime('now', '+1 day') END WHERE id % 50 IN (3, 4)")
+    # bob's leases have run out (the first command reclaims them); alice's are due for renewal
+    conn.execute("UPDATE tasks SET status = 'in_progress', owner = CASE id % 50 WHEN 5 THEN 'bob' ELSE 'alice' END, "
+                 "lease_expires_at = CASE id % 50 WHEN 5 THEN datetime('now', '-1 minute') "
+                 "ELSE datetime('now', '+10 minutes') END WHERE id % 50 IN (5, 6)")
+    conn.executemany("INSERT INTO agents(name, role) VALUES(?, 'dev')", [("alice",), ("bob",)])
+    conn.executemany("INSERT INTO messages(mission_id, from_agent, to_agent, body) VALUES(1, 'bob', ?, ?)",
+                     [("alice" if i % 2 else None, f"msg {i}") for i in range(tasks)])
+    conn.executemany("INSERT INTO activity(mission_id, agent, action) VALUES(1, ?, 'checkin')",
+                     [("bob",)] * tasks)
+    conn.commit()
+    conn.close()
+
+
+def record(argv: list[str], main=mc_core.main) -> list[str]:
+    statements = []
+    connect = mc_core.connect
+
+    def traced(path):
+        conn = connect(path)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    mc_core.connect = traced
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            rc = main(argv)
+    finally:
+        mc_core.connect = connect
+    if rc:
+        raise SystemExit(f"{' '.join(argv)} exited {rc}")
+    return [s for s in statements if not SKIP.match(s)]
+
+
+def scans(conn: sqlite3.Connection, sql: str, tables: set[str]) -> tuple[list[str], list[str]]:
+    """(plan lines, lines that scan a real table) for one statement."""
+    names = {}
+    for table, alias in SOURCE.findall(sql):
+        if table.lower() in tables:
+            names[table.lower()] = table.lower()
+            if alias:
+                names[alias.lower()] = table.lower()
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    bad = [line for line in plan
+           if (m := re.match(r"SCAN (\w+)", line)) and m.group(1).lower() in names
+           and names[m.group(1).lower()] not in FULL_SCAN_OK and "VIRTUAL TABLE" not in line]
+    return plan, bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN regression check for hot queries")
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+
+    db = Path(tempfile.mkdtemp(prefix="mc-bench-")) / "mission-control.db"
+    seed(db, args.tasks)
+    os.environ.update(MC_DB=str(db), MC_AGENT="alice", MC_MISSION="default")
+
+    queries = []
+    for argv in COMMANDS:
+        queries += [(f"mc {' '.join(argv)}", sql) for sql in record(argv)]
+    for argv in SCHEDULE_COMMANDS:
+        queries += [(f"mc schedule {' '.join(argv)}", sql) for sql in record(argv, mc_schedule.main)]
+    queries += EXTRA.items()
+
+    conn = sqlite3.connect(db)
+    tables = {r[0].lower() for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    failures = sorts = 0
+    seen = set()
+    for label, sql in queries:
+        key = (label, sql)
+        if key in seen:
+            continue
+        seen.add(key)
+        plan, bad = scans(conn, sql, tables)
+        if bad or args.verbose:
+            print(f"{'FAIL' if bad else 'ok  '} {label}: {' '.join(sql.split())[:160]}")
+            for line in plan:
+                print(f"       {'!! ' if line in bad else '   '}{line}")
+        failures += bool(bad)
+        sorts += any("TEMP B-TREE" in line for line in plan)
+    conn.close()
+    print(f"{len(seen)} statements checked, {failures} with table scans, {sorts} with temp b-tree sorts")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+schedule_run — time `mc schedule run` (mc_schedule.run) on a large backlog
+
+Builds a one-mission project with --tasks tasks (70% pending) and --agents
+agents with roles backend/frontend/qa; a third of the tasks carry a
+role:<role> tag and task ages are spread over the last --days days. Then it
+runs --rounds scheduling rounds: each round assigns up to --cap tasks per
+agent in one transaction, and the agents finish everything they were given
+before the next round.
+
+Reports per-run latency (p50/max), tasks assigned, how evenly they were
+spread over the agents, and the priority mix of what was assigned, which
+shows aging letting old low-priority tasks through.
+
+Usage:
+  python3 bench/schedule_run.py
+  python3 bench/schedule_run.py --tasks 100000 --agents 50 --rounds 20
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT, make_project, percentile
+
+sys.path.insert(0, str(ROOT))
+import mc_schedule  # noqa: E402
+
+ROLES = ("backend", "frontend", "qa")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time mc schedule run")
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--agents", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--cap", type=int, default=2)
+    parser.add_argument("--days", type=float, default=7, help="Spread task ages over this many days")
+    args = parser.parse_args()
+
+    db = Path(tempfile.mkdtemp(prefix="mc-bench-")) / "mission-control.db"
+    make_project(db, missions=1, tasks=args.tasks, agents=args.agents)
+    rng = random.Random(1)
+    conn = sqlite3.connect(db)
+    conn.executemany("UPDATE agents SET role = ? WHERE name = ?",
+                     [(ROLES[k % len(ROLES)], f"agent-{k}") for k in range(args.agents)])
+    conn.executemany(
+        "UPDATE tasks SET tags = ?, created_at = datetime('now', ?) WHERE id = ?",
+        [(json.dumps([f"role:{rng.choice(ROLES)}"] if i % 3 == 0 else []),
+          f"-{rng.uniform(0, args.days * 24):.3f} hours", i) for i in range(1, args.tasks + 1)])
+    # Whatever make_project left in progress would hold the agents' capacity
+    conn.execute("UPDATE tasks SET status = 'done' WHERE status = 'in_progress'")
+    conn.commit()
+    conn.close()
+
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    mid = conn.execute("SELECT id FROM missions WHERE name = 'm1'").fetchone()[0]
+    seconds, per_agent, by_priority = [], {}, {}
+    for _ in range(args.rounds):
+        t0 = time.perf_counter()
+        assigned, _skipped = mc_schedule.run(conn, mid, "bench", cap=args.cap)
+        seconds.append(time.perf_counter() - t0)
+        for a in assigned:
+            per_agent[a["agent"]] = per_agent.get(a["agent"], 0) + 1
+            by_priority[a["priority"]] = by_priority.get(a["priority"], 0) + 1
+        conn.execute("UPDATE tasks SET status = 'done' WHERE status = 'claimed'")
+        conn.commit()
+    pending = conn.execute("SELECT COUNT(*) FROM tasks WHERE status = 'pending'").fetchone()[0]
+    conn.close()
+
+    counts = sorted(per_agent.values()) or [0]
+    ms = [s * 1000 for s in seconds]
+    print(json.dumps({
+        "bench": "schedule_run", "tasks": args.tasks, "pending_left": pending, "agents": args.agents,
+        "rounds": args.rounds, "cap": args.cap,
+        "run_ms": {"p50": round(percentile(ms, 50), 2), "max": round(max(ms), 2)},
+        "assigned": sum(counts), "per_agent": {"min": counts[0], "max": counts[-1]},
+        "assigned_by_priority": {str(p): n for p, n in sorted(by_priority.items(), reverse=True)},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
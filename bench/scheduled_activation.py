@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+scheduled_activation — reads and activation with a large backlog of future-scheduled tasks
+
+Builds a one-mission project with --tasks ordinary tasks (70% pending) and
+--scheduled pending tasks scheduled days ahead at a higher priority than
+any of them, the worst case for a priority-ordered claim. It then times:
+
+  - claim-next's pick (CLAIM_NEXT_SQL, rolled back) against the same
+    query with the pre-v10 clock predicate, which has to step over every
+    waiting task ahead of the first claimable one
+  - the activation probe when nothing is due (what every command pays)
+  - activating --due tasks that have come due, as one pass
+
+Usage:
+  python3 bench/scheduled_activation.py
+  python3 bench/scheduled_activation.py --scheduled 500000 --due 5000
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT, make_project, percentile
+
+sys.path.insert(0, str(ROOT))
+import mc_core  # noqa: E402
+
+# claim-next as it was before activated_at: due-ness compared with the clock on every row
+CLOCK_CLAIM_NEXT_SQL = """
+    SELECT id FROM tasks
+    WHERE mission_id = :mid AND status = 'pending' AND COALESCE(owner, '') IN ('', :agent)
+      AND (scheduled_at IS NULL OR scheduled_at <= datetime('now'))
+    ORDER BY priority DESC, id LIMIT 1
+"""
+
+
+def timed(conn, fn, repeat: int) -> dict:
+    """Run fn(conn) `repeat` times inside a rolled-back transaction; return p50/max ms."""
+    ms = []
+    for _ in range(repeat):
+        conn.execute("BEGIN")
+        t0 = time.perf_counter()
+        fn(conn)
+        ms.append((time.perf_counter() - t0) * 1000)
+        conn.rollback()
+    return {"p50": round(percentile(ms, 50), 3), "max": round(max(ms), 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time reads and activation with many future-scheduled tasks")
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--scheduled", type=int, default=100000)
+    parser.add_argument("--due", type=int, default=1000, help="Scheduled tasks that come due for the activation pass")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    db = Path(tempfile.mkdtemp(prefix="mc-bench-")) / "mission-control.db"
+    make_project(db, missions=1, tasks=args.tasks, agents=5)
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    mid = conn.execute("SELECT id FROM missions WHERE name = 'm1'").fetchone()[0]
+    conn.executemany(
+        "INSERT INTO tasks(mission_id, subject, priority, owner, scheduled_at) "
+        "VALUES(?, ?, 3, ?, datetime('now', ?))",
+        [(mid, f"later {i}", f"agent-{i % 5}", f"+{1 + i % 7} days") for i in range(args.scheduled)])
+    conn.commit()
+    params = {"mid": mid, "agent": "agent-0", "status": "claimed", "lease": mc_core.lease()}
+
+    claim = timed(conn, lambda c: c.execute(mc_core.CLAIM_NEXT_SQL, params).fetchall(), args.repeat)
+    clock = timed(conn, lambda c: c.execute(CLOCK_CLAIM_NEXT_SQL, params).fetchall(), args.repeat)
+    probe = timed(conn, lambda c: mc_core.activate_due(c, mid, "bench"), args.repeat)
+
+    conn.execute("UPDATE tasks SET scheduled_at = datetime('now', '-1 minute') WHERE id IN "
+                 "(SELECT id FROM tasks WHERE scheduled_at IS NOT NULL ORDER BY id LIMIT ?)", (args.due,))
+    conn.commit()
+    t0 = time.perf_counter()
+    activated = mc_core.activate_due(conn, mid, "bench")
+    activate_ms = (time.perf_counter() - t0) * 1000
+    after = timed(conn, lambda c: mc_core.activate_due(c, mid, "bench"), args.repeat)
+    conn.close()
+
+    print(json.dumps({
+        "bench": "scheduled_activation", "tasks": args.tasks, "scheduled": args.scheduled,
+        "claim_next_ms": {"activated_at": claim, "clock_predicate": clock,
+                          "speedup": round(clock["p50"] / max(claim["p50"], 1e-6), 1)},
+        "probe_nothing_due_ms": probe,
+        "activate": {"due": args.due, "activated": len(activated), "ms": round(activate_ms, 2)},
+        "probe_after_activation_ms": after,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+server_rps — requests/sec micro-benchmark for mc-server.py read routes
+
+Runs the server (Werkzeug, threaded) against a synthetic DB and hammers
+/api/board and /api/task/<id> from concurrent client threads. Pass
+--rev to benchmark the server as of an older commit for a before/after
+comparison on the same machine and data.
+
+Usage:
+  python3 bench/server_rps.py
+  python3 bench/server_rps.py --rev f4f4513 --tasks 5000 --threads 16
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from common import checkout, make_db, percentile, start_server
+
+
+def hammer(url_for, duration: float, threads: int) -> dict:
+    latencies: list[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def worker():
+        mine = []
+        while time.time() < deadline:
+            t0 = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url_for()) as r:
+                    r.read()
+            except OSError:
+                with lock:
+                    errors[0] += 1
+                continue
+            mine.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(mine)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/sec for mc-server.py read routes")
+    parser.add_argument("--rev", help="Benchmark mobile/mc-server.py from this git revision")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=13738, help="Keep below the ephemeral port range")
+    args = parser.parse_args()
+
+    server = checkout(args.rev, "mobile/mc-server.py") if args.rev else None
+    tmp = Path(tempfile.mkdtemp(prefix="mc-bench-"))
+    db = tmp / "mission-control.db"
+    make_db(db, tasks=args.tasks, messages=args.messages)
+    proc, token = start_server(db, args.port, server=server)
+    base = f"http://127.0.0.1:{args.port}"
+
+    try:
+        results = {
+            "board": hammer(lambda: f"{base}/api/board?token={token}", args.duration, args.threads),
+            "task": hammer(lambda: f"{base}/api/task/{random.randint(1, args.tasks)}?token={token}",
+                           args.duration, args.threads),
+        }
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print(json.dumps({"bench": "server_rps", "rev": args.rev or "working-tree",
+                      "tasks": args.tasks, "messages": args.messages,
+                      "threads": args.threads, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+setup_provision — time tools/setup_mission.py for a large team
+
+Runs setup_mission with N worker roles (plus the 3 supervisors) under a
+throwaway HOME, against a fake `openclaw` on PATH that keeps its agents and
+cron jobs in a JSON file and sleeps --latency seconds per call, like the
+real CLI starting up. Reports wall-clock time and openclaw calls by kind,
+for the working tree and optionally for setup_mission.py at --rev.
+
+--fail-every K makes every K-th `cron add` fail once, to check that a
+second run resumes the missing pieces and nothing else.
+
+The working tree is also timed applying the same team as a --manifest, then
+re-applying it unchanged, which should make no openclaw calls beyond the two
+listings.
+
+Usage:
+  python3 bench/setup_provision.py
+  python3 bench/setup_provision.py --roles 20 --latency 0.5 --rev f4f4513
+  python3 bench/setup_provision.py --fail-every 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from common import ROOT, checkout
+
+FAKE_OPENCLAW = r'''#!/usr/bin/env python3
+import fcntl, json, os, sys, time
+state_path = os.environ["FAKE_OPENCLAW_STATE"]
+args = [a for a in sys.argv[1:] if a not in ("--profile",)]
+kind = " ".join(args[:2])
+with open(os.environ["FAKE_OPENCLAW_LOG"], "a") as log:
+    log.write(kind + "\n")
+time.sleep(float(os.environ.get("FAKE_OPENCLAW_LATENCY", "0.3")))
+with open(state_path, "a+") as f:
+    fcntl.flock(f, fcntl.LOCK_EX)
+    f.seek(0)
+    state = json.loads(f.read() or '{"agents": [], "jobs": [], "adds": 0}')
+    if kind == "agents list":
+        print(json.dumps({"agents": [{"name": n} for n in state["agents"]]}))
+    elif kind == "cron list":
+        print(json.dumps({"jobs": [{"name": n, "id": "job-" + n, "enabled": n not in state.get("disabled", [])}
+                                   for n in state["jobs"]]}))
+    elif kind in ("cron disable", "cron enable"):
+        name = args[2][len("job-"):]
+        if name not in state["jobs"]:
+            sys.exit("no such job")
+        disabled = set(state.get("disabled", [])) - {name}
+        state["disabled"] = sorted(disabled | ({name} if kind == "cron disable" else set()))
+    elif kind == "agents add":
+        if args[2] in state["agents"]:
+            sys.exit("agent exists")
+        state["agents"].append(args[2])
+    elif kind == "agents delete":
+        state["agents"].remove(args[2])
+    elif kind == "cron rm":
+        state["jobs"].remove(args[2][len("job-"):])
+    elif kind == "cron add":
+        name = args[args.index("--name") + 1]
+        state["adds"] += 1
+        every = int(os.environ.get("FAKE_OPENCLAW_FAIL_EVERY", "0"))
+        if every and state["adds"] % every == 0 and not state.get("failed_" + name):
+            state["failed_" + name] = True
+            f.seek(0); f.truncate(); f.write(json.dumps(state))
+            sys.exit("gateway timeout")
+        state["jobs"].append(name)
+    f.seek(0); f.truncate(); f.write(json.dumps(state))
+'''
+
+
+def setup(tmp: Path, latency: float, fail_every: int) -> dict:
+    home = tmp / "home"
+    bin_dir = tmp / "bin"
+    bin_dir.mkdir(parents=True)
+    (bin_dir / "openclaw").write_text(FAKE_OPENCLAW)
+    (bin_dir / "openclaw").chmod(0o755)
+    (bin_dir / "mc").symlink_to(ROOT / "mc")
+    return {
+        **os.environ, "HOME": str(home), "PATH": f"{bin_dir}:{os.environ['PATH']}",
+        "FAKE_OPENCLAW_STATE": str(tmp / "openclaw.json"), "FAKE_OPENCLAW_LOG": str(tmp / "calls.log"),
+        "FAKE_OPENCLAW_LATENCY": str(latency), "FAKE_OPENCLAW_FAIL_EVERY": str(fail_every),
+    }
+
+
+def write_manifest(tmp: Path, roles: int) -> Path:
+    path = tmp / "mission.json"
+    path.write_text(json.dumps({
+        "project": "bench", "mission": "m1", "goal": "Bench mission",
+        "slack": {"channel": "C0", "user_id": "U0"},
+        "roles": {f"role{i}": {} for i in range(roles)},
+        "tasks": [{"key": f"t{i}", "subject": f"Task {i}", "for": f"role{i}",
+                   "depends_on": [f"t{i - 1}"] if i else []} for i in range(roles)],
+    }))
+    return path
+
+
+def run_setup(script: Path, env: dict, roles: int, extra: list[str]) -> dict:
+    log = Path(env["FAKE_OPENCLAW_LOG"])
+    log.write_text("")
+    if "--manifest" in extra:
+        argv = [sys.executable, str(script), *extra]
+    else:
+        argv = [sys.executable, str(script), "bench", "m1", "Bench mission",
+                "--roles", ",".join(f"role{i}" for i in range(roles)),
+                "--slack-channel", "C0", "--slack-user-id", "U0", *extra]
+    t0 = time.perf_counter()
+    proc = subprocess.run(argv, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    state = json.loads(Path(env["FAKE_OPENCLAW_STATE"]).read_text())
+    return {
+        "seconds": round(elapsed, 2), "exit": proc.returncode,
+        "openclaw_calls": dict(Counter(log.read_text().split("\n")[:-1])),
+        "agents": len(state["agents"]), "crons": len(state["jobs"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time setup_mission.py against a fake openclaw")
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds per openclaw call")
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--fail-every", type=int, default=0, help="Fail every K-th cron add once")
+    parser.add_argument("--rev", help="Also time setup_mission.py from this git revision")
+    args = parser.parse_args()
+
+    results = {}
+    runs = [("working-tree", ROOT / "tools" / "setup_mission.py", ["--jobs", str(args.jobs)])]
+    if args.rev:
+        runs.insert(0, (args.rev, checkout(args.rev, "tools/setup_mission.py"), []))
+    for label, script, extra in runs:
+        env = setup(Path(tempfile.mkdtemp(prefix="mc-bench-")), args.latency, args.fail_every)
+        results[label] = {"first": run_setup(script, env, args.roles, extra)}
+        # Same command again: resumes anything that failed, otherwise a no-op
+        results[label]["rerun"] = run_setup(script, env, args.roles, extra)
+
+    tmp = Path(tempfile.mkdtemp(prefix="mc-bench-"))
+    env = setup(tmp, args.latency, args.fail_every)
+    extra = ["--manifest", str(write_manifest(tmp, args.roles)), "--jobs", str(args.jobs)]
+    script = ROOT / "tools" / "setup_mission.py"
+    results["manifest"] = {"apply": run_setup(script, env, args.roles, extra)}
+    # Unchanged manifest: plan only, nothing to apply
+    results["manifest"]["reapply"] = run_setup(script, env, args.roles, extra)
+
+    print(json.dumps({"bench": "setup_provision", "roles": args.roles, "supervisors": 3,
+                      "latency": args.latency, "fail_every": args.fail_every,
+                      "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+sse_fanout — load test for the mobile server's /api/heartbeat change feed
+
+Starts mobile/mc-server.py on a throwaway DB, holds 1..N SSE connections
+open while a writer commits at a fixed rate, and reports server CPU time,
+thread count, RSS and watcher query counts per step as JSON. With --asgi
+the server runs under uvicorn and streams are coroutines instead of threads.
+
+With the shared watcher, polls/sec and diffs/sec stay flat as clients grow;
+only the per-client fan-out cost scales.
+
+Usage:
+  python3 bench/sse_fanout.py
+  python3 bench/sse_fanout.py --steps 1,50,500 --window 10 --writes-per-sec 2
+  python3 bench/sse_fanout.py --asgi --steps 1,100,1000
+"""
+
+import argparse
+import json
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+from common import cpu_seconds, make_db, proc_status, start_server
+
+
+def open_stream(port: int, token: str) -> socket.socket:
+    s = socket.create_connection(("127.0.0.1", port))
+    s.sendall(f"GET /api/heartbeat?token={token} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    return s
+
+
+def drain(socks: list[socket.socket], stop: threading.Event) -> None:
+    """Read and discard event data so server-side writes never block."""
+    while not stop.is_set():
+        for s in list(socks):
+            try:
+                s.setblocking(False)
+                s.recv(65536)
+            except (BlockingIOError, OSError):
+                pass
+        time.sleep(0.05)
+
+
+def watcher_stats(port: int, token: str) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/info?token={token}") as r:
+        return json.load(r)["watcher"]
+
+
+def writer(db: Path, rate: float, stop: threading.Event) -> None:
+    conn = sqlite3.connect(db)
+    conn.execute("PRAGMA busy_timeout=5000")
+    i = 0
+    while not stop.is_set():
+        i += 1
+        conn.execute(
+            "UPDATE tasks SET status=CASE status WHEN 'pending' THEN 'in_progress' ELSE 'pending' END, "
+            "updated_at=datetime('now') WHERE id=?", (i % 500 + 1,))
+        conn.commit()
+        stop.wait(1 / rate)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE fan-out load test for mc-server.py")
+    parser.add_argument("--steps", default="1,10,100,500", help="Comma-separated client counts")
+    parser.add_argument("--window", type=float, default=5.0, help="Seconds measured per step")
+    parser.add_argument("--writes-per-sec", type=float, default=1.0, help="Background commit rate")
+    parser.add_argument("--port", type=int, default=13737, help="Keep below the ephemeral port range")
+    parser.add_argument("--asgi", action="store_true", help="Run the server in --asgi mode")
+    args = parser.parse_args()
+
+    steps = [int(s) for s in args.steps.split(",") if s.strip()]
+    tmp = Path(tempfile.mkdtemp(prefix="mc-bench-"))
+    db = tmp / "mission-control.db"
+    make_db(db)
+    proc, token = start_server(db, args.port, extra=["--asgi"] if args.asgi else None)
+
+    stop = threading.Event()
+    socks: list[socket.socket] = []
+    threading.Thread(target=writer, args=(db, args.writes_per_sec, stop), daemon=True).start()
+    threading.Thread(target=drain, args=(socks, stop), daemon=True).start()
+
+    results = []
+    try:
+        for n in steps:
+            while len(socks) < n:
+                socks.append(open_stream(args.port, token))
+            time.sleep(1)
+            cpu0, w0, t0 = cpu_seconds(proc.pid), watcher_stats(args.port, token), time.time()
+            time.sleep(args.window)
+            cpu1, w1, t1 = cpu_seconds(proc.pid), watcher_stats(args.port, token), time.time()
+            elapsed = t1 - t0
+            results.append({
+                "clients": n,
+                "subscribers": w1["subscribers"],
+                "server_threads": proc_status(proc.pid, "Threads"),
+                "rss_mb": round(proc_status(proc.pid, "VmRSS") / 1024, 1),
+                "cpu_pct": round(100 * (cpu1 - cpu0) / elapsed, 2),
+                "polls_per_sec": round((w1["polls"] - w0["polls"]) / elapsed, 2),
+                "diffs_per_sec": round((w1["diffs"] - w0["diffs"]) / elapsed, 2),
+            })
+            print(json.dumps(results[-1]), file=sys.stderr)
+    finally:
+        stop.set()
+        for s in socks:
+            s.close()
+        proc.terminate()
+        proc.wait()
+
+    print(json.dumps({"bench": "sse_fanout", "mode": "asgi" if args.asgi else "threaded",
+                      "writes_per_sec": args.writes_per_sec,
+                      "window": args.window, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
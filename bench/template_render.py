@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+template_render — time AGENTS.md rendering and writing in tools/setup_mission.py
+
+Renders --agents AGENTS.md files from agents/templates/base.md, repeated
+until it is --template-kb KB, the way a large team template with policies
+looks. It compares safe_render (one str.replace pass over the whole
+template per placeholder, per agent) with a compiled Template (split once,
+one join per agent) and checks they give the same text.
+
+Then it writes every file into a throwaway workspace twice: the second
+pass has nothing to change, so it should write nothing (content hash
+match), and once more after a one-line policy tweak.
+
+Usage:
+  python3 bench/template_render.py
+  python3 bench/template_render.py --agents 1000 --template-kb 200
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT
+
+sys.path.insert(0, str(ROOT / "tools"))
+import setup_mission  # noqa: E402
+
+KEYS = ("role_specialization", "role_description", "agent_id", "role", "project", "mission", "goal", "config_dir")
+
+
+def agent_values(n: int, policy: str) -> list[dict[str, str]]:
+    return [dict(zip(KEYS, (f"{policy}\nWork on {{project}} as agent {k}.", f"role{k} specialist",
+                            f"bench-m1-role{k}", f"role{k}", "bench", "m1", "Bench mission", "/tmp/bench")))
+            for k in range(n)]
+
+
+def write_all(root: Path, docs: list[str]) -> dict:
+    """Write each doc to root/<k>/AGENTS.md unless unchanged; return seconds and writes."""
+    t0, writes = time.perf_counter(), 0
+    for k, doc in enumerate(docs):
+        path = root / str(k) / "AGENTS.md"
+        if setup_mission.file_differs(path, doc):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(doc)
+            writes += 1
+    return {"seconds": round(time.perf_counter() - t0, 3), "writes": writes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time AGENTS.md rendering and writing")
+    parser.add_argument("--agents", type=int, default=500)
+    parser.add_argument("--template-kb", type=int, default=100, help="Template size in KB")
+    args = parser.parse_args()
+
+    base = (ROOT / "agents" / "templates" / "base.md").read_text()
+    text = base * max(1, args.template_kb * 1024 // len(base))
+    values = agent_values(args.agents, "Policy: keep {mission} moving.")
+
+    t0 = time.perf_counter()
+    plain = [setup_mission.safe_render(text, **v) for v in values]
+    safe_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    template = setup_mission.Template(text, KEYS)
+    compiled = [template.render(**v) for v in values]
+    compiled_seconds = time.perf_counter() - t0
+    assert compiled == plain, "compiled template rendered differently from safe_render"
+
+    root = Path(tempfile.mkdtemp(prefix="mc-bench-"))
+    first = write_all(root, compiled)
+    unchanged = write_all(root, compiled)
+    tweaked = [template.render(**v) for v in agent_values(args.agents, "Policy: keep {mission} moving fast.")]
+    after_tweak = write_all(root, tweaked)
+
+    print(json.dumps({
+        "bench": "template_render", "agents": args.agents, "template_kb": round(len(text) / 1024),
+        "render": {
+            "safe_render_ms_per_agent": round(safe_seconds / args.agents * 1000, 3),
+            "compiled_ms_per_agent": round(compiled_seconds / args.agents * 1000, 3),
+            "speedup": round(safe_seconds / compiled_seconds, 1),
+        },
+        "write": {"first": first, "unchanged": unchanged, "policy_tweak": after_tweak},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
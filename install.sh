@@ -42,8 +42,12 @@ mkdir -p "$BIN_DIR"
 cp "$SCRIPT_DIR/mc" "$BIN_DIR/mc"
 chmod +x "$BIN_DIR/mc"
 
-# Copy schema.sql alongside mc for schema resolution
+# Copy schema.sql and the Python modules alongside mc (resolved via SCHEMA_DIR)
 cp "$SCRIPT_DIR/schema.sql" "$BIN_DIR/schema.sql"
+cp "$SCRIPT_DIR/mc_core.py" "$BIN_DIR/mc_core.py"
+cp "$SCRIPT_DIR/mc_retention.py" "$BIN_DIR/mc_retention.py"
+cp "$SCRIPT_DIR/mc_cron.py" "$BIN_DIR/mc_cron.py"
+cp "$SCRIPT_DIR/mc_schedule.py" "$BIN_DIR/mc_schedule.py"
 
 # Check PATH
 if [[ ":$PATH:" != *":$BIN_DIR:"* ]]; then
@@ -0,0 +1,1397 @@
+#!/usr/bin/env python3
+"""
+mc_core — Mission Control hot-path commands and task operations
+
+`mc` execs this module for the commands agents run on every cron tick
+(board, list, claim, claim-next, start, done, block, graph, checkin,
+inbox, mission status, search, fleet, feed). Each runs as one process with
+one connection and one transaction, instead of a sqlite3 spawn per query.
+mobile/mc-server.py imports the task operations (claim, claim_next, search,
+checkin) so the CLI and HTTP API share one definition.
+
+Project, mission and agent are resolved exactly as in `mc`:
+  mc_core.py [-p PROJECT] [-m MISSION] [--json|--ndjson] [--fields a,b] <command> [args...]
+
+The read commands (board, list, inbox, fleet, feed, search) print JSON rows
+instead of text with --json or --ndjson; `checkin --json` prints one object.
+
+Claims are a single conditional statement, so the check and the write
+cannot interleave with another agent's: two claimers racing for one task
+see exactly one success.
+"""
+
+import json
+import os
+import re
+import shlex
+import sqlite3
+import sys
+import time
+import unicodedata
+from pathlib import Path
+
+# PRAGMA user_version of a DB with the current schema; SCHEMA_VERSION in `mc`
+SCHEMA_VERSION = 12
+
+R, G, Y, C, B, N = '\033[0;31m', '\033[0;32m', '\033[1;33m', '\033[0;36m', '\033[1m', '\033[0m'
+
+STATUS_ICONS = {
+    'pending': '○', 'claimed': '◉', 'in_progress': '▶',
+    'review': '⟳', 'blocked': '✗', 'done': '✓',
+}
+
+# A scheduled task is waiting until activate_due() finds it due and stamps
+# activated_at; reads test for that instead of comparing with the clock.
+# Both expressions match a partial index's WHERE (idx_tasks_waiting, and
+# idx_tasks_ready with status = 'pending'), so queries using them can use it.
+WAITING = 'scheduled_at IS NOT NULL AND activated_at IS NULL'
+READY = '(scheduled_at IS NULL OR activated_at IS NOT NULL)'
+
+# A task is claimable when it is open, unowned (or already ours) and due.
+# `mc add` stores an unassigned owner as '' rather than NULL.
+CLAIMABLE = f'''
+    status IN ('pending', 'claimed')
+    AND COALESCE(owner, '') IN ('', :agent)
+    AND {READY}
+'''
+
+# A claim holds a lease (tasks.lease_expires_at) of LEASE_TTL seconds, or
+# MC_LEASE_TTL; the owner's checkins renew it, and reclaim_expired() puts a
+# task whose lease ran out back to pending. 0 turns leases off.
+LEASE_TTL = 7200
+
+
+def lease_ttl():
+    return max(int(os.environ.get('MC_LEASE_TTL') or LEASE_TTL), 0)
+
+
+def lease(ttl=None):
+    """datetime() modifier for a lease taken now (:lease), or None — no lease — when leases are off."""
+    ttl = lease_ttl() if ttl is None else ttl
+    return f'+{ttl} seconds' if ttl > 0 else None
+
+
+CLAIM_SQL = f'''
+    UPDATE tasks
+    SET owner = :agent, status = :status, lease_expires_at = datetime('now', :lease),
+        claimed_at = datetime('now'), updated_at = datetime('now')
+    WHERE id = :id AND mission_id = :mid AND {CLAIMABLE}
+    RETURNING id, subject
+'''
+
+CLAIM_NEXT_SQL = f'''
+    UPDATE tasks
+    SET owner = :agent, status = :status, lease_expires_at = datetime('now', :lease),
+        claimed_at = datetime('now'), updated_at = datetime('now')
+    WHERE id = (
+        SELECT id FROM tasks
+        WHERE mission_id = :mid AND status = 'pending' AND {CLAIMABLE}
+        ORDER BY priority DESC, id
+        LIMIT 1
+    )
+    RETURNING id, subject
+'''
+
+
+class ClaimError(Exception):
+    """The task could not be claimed; the message says why."""
+
+
+class MissionError(Exception):
+    """The mission is missing (status None) or not in a state that allows the operation."""
+
+    def __init__(self, name, status=None, action='cannot modify'):
+        self.name = name
+        self.status = status
+        if status is None:
+            super().__init__(f"Mission '{name}' not found.")
+        else:
+            super().__init__(f"Mission '{name}' is {status}" + (f' — {action}.' if action else '.'))
+
+
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=5)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA busy_timeout=5000')
+    return conn
+
+
+def first(cursor):
+    """First row of a (possibly RETURNING) statement, with the statement run to completion."""
+    rows = cursor.fetchall()
+    return rows[0] if rows else None
+
+
+def log_activity(conn, mid, agent, action, target_type, target_id, detail=''):
+    conn.execute(
+        'INSERT INTO activity(mission_id, agent, action, target_type, target_id, detail) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        (mid, agent, action, target_type, target_id, detail))
+
+
+def mission_row(conn, name):
+    row = conn.execute('SELECT * FROM missions WHERE name = ?', (name,)).fetchone()
+    if row is None:
+        raise MissionError(name)
+    return row
+
+
+def writable_mission_id(conn, name):
+    """Id of mission `name`, which must be active."""
+    row = mission_row(conn, name)
+    if row['status'] != 'active':
+        raise MissionError(name, row['status'])
+    return row['id']
+
+
+def open_mission_id(conn, name):
+    """Id of mission `name`, which may be paused but not completed or archived."""
+    row = mission_row(conn, name)
+    if row['status'] in ('completed', 'archived'):
+        raise MissionError(name, row['status'], action=None)
+    return row['id']
+
+# ═══════════════════════════════════════════
+# TASK OPERATIONS (shared with mc-server)
+# ═══════════════════════════════════════════
+
+def claim_failure(conn, mid, task_id, agent):
+    """Explain why CLAIM_SQL matched nothing (read after the fact, for messages only)."""
+    row = conn.execute(
+        f"SELECT status, owner, scheduled_at, {WAITING} AS future "
+        'FROM tasks WHERE id = ? AND mission_id = ?', (task_id, mid)).fetchone()
+    if row is None:
+        return f'#{task_id} not found'
+    if row['status'] == 'blocked':
+        return f'#{task_id} is blocked — resolve blockers first'
+    if row['future']:
+        return f"#{task_id} is scheduled for {row['scheduled_at']} — cannot claim yet"
+    if row['owner'] and row['owner'] != agent:
+        return f"Already claimed by {row['owner']}"
+    return f"#{task_id} is {row['status']}"
+
+
+def claim(conn, mid, task_id, agent, status='claimed'):
+    """Claim task `task_id` for `agent` and commit. Raises ClaimError if it is not claimable."""
+    params = {'id': task_id, 'mid': mid, 'agent': agent, 'status': status, 'lease': lease()}
+    row = first(conn.execute(CLAIM_SQL, params))
+    if row is None:
+        conn.rollback()
+        raise ClaimError(claim_failure(conn, mid, task_id, agent))
+    log_activity(conn, mid, agent, 'task_claimed', 'task', row['id'])
+    conn.commit()
+    return dict(row)
+
+
+def claim_next(conn, mid, agent, status='claimed', commit=True):
+    """Claim the highest-priority pending task for `agent` and commit. None if there is none.
+
+    With commit=False the caller's transaction is left open either way.
+    """
+    params = {'mid': mid, 'agent': agent, 'status': status, 'lease': lease()}
+    row = first(conn.execute(CLAIM_NEXT_SQL, params))
+    if row is None:
+        if commit:
+            conn.rollback()
+        return None
+    log_activity(conn, mid, agent, 'task_claimed', 'task', row['id'], 'claim-next')
+    if commit:
+        conn.commit()
+    return dict(row)
+
+
+# Open blockers of the tasks row being updated; a blocker stops blocking once
+# it is done or cancelled. task_deps' primary key yields them in id order.
+OPEN_BLOCKERS = '''
+    FROM task_deps d JOIN tasks b ON b.id = d.depends_on
+    WHERE d.task_id = tasks.id AND b.status NOT IN ('done', 'cancelled')
+'''
+
+
+def unblock_dependents(conn, mid, task_id):
+    """Re-evaluate tasks downstream of `task_id`; return ids that are no longer blocked.
+
+    Walks task_deps through the depends_on index only: direct dependents,
+    plus the dependents of any that are themselves already closed. A blocked
+    task with no open blockers left goes back to pending; blocked_by is
+    rewritten to the remaining open blockers either way.
+    """
+    rows = conn.execute(f'''
+        WITH RECURSIVE downstream(id) AS (
+            SELECT task_id FROM task_deps WHERE depends_on = :id
+            UNION
+            SELECT d.task_id FROM downstream r
+            JOIN tasks t ON t.id = r.id AND t.status IN ('done', 'cancelled')
+            JOIN task_deps d ON d.depends_on = r.id
+        )
+        UPDATE tasks
+        SET blocked_by = (SELECT json_group_array(d.depends_on) {OPEN_BLOCKERS}),
+            status = CASE WHEN EXISTS (SELECT 1 {OPEN_BLOCKERS}) THEN status ELSE 'pending' END,
+            updated_at = datetime('now')
+        WHERE id IN (SELECT id FROM downstream) AND mission_id = :mid AND status = 'blocked'
+        RETURNING id, status
+    ''', {'id': task_id, 'mid': mid}).fetchall()
+    return sorted(r['id'] for r in rows if r['status'] == 'pending')
+
+
+class DependencyError(Exception):
+    """The dependency cannot be added; the message says why."""
+
+
+def block(conn, mid, task_id, depends_on):
+    """Make `task_id` wait on `depends_on`. Raises DependencyError for unknown tasks or cycles."""
+    found = {r[0] for r in conn.execute(
+        'SELECT id FROM tasks WHERE mission_id = ? AND id IN (?, ?)', (mid, task_id, depends_on))}
+    for tid in (task_id, depends_on):
+        if tid not in found:
+            raise DependencyError(f'#{tid} not found')
+    if task_id == depends_on:
+        raise DependencyError(f'#{task_id} cannot depend on itself')
+    # Would close a loop if depends_on already (transitively) waits on task_id.
+    # Rows are (task, the task it was reached from), so the walk is O(edges).
+    reached = conn.execute('''
+        WITH RECURSIVE upstream(id, via) AS (
+            SELECT :by, NULL
+            UNION
+            SELECT d.depends_on, u.id FROM upstream u JOIN task_deps d ON d.task_id = u.id
+            WHERE u.id != :id
+        )
+        SELECT id, via FROM upstream
+    ''', {'id': task_id, 'by': depends_on}).fetchall()
+    via = {}
+    for r in reached:
+        via.setdefault(r['id'], r['via'])
+    if task_id in via:
+        path = [task_id]
+        while path[-1] != depends_on:
+            path.append(via[path[-1]])
+        chain = ' → '.join(f'#{t}' for t in [task_id, *reversed(path)])
+        raise DependencyError(f'would create a cycle: {chain}')
+    conn.execute('INSERT OR IGNORE INTO task_deps(task_id, depends_on) VALUES (?, ?)', (task_id, depends_on))
+    conn.execute(f'''
+        UPDATE tasks
+        SET status = 'blocked', lease_expires_at = NULL, updated_at = datetime('now'),
+            blocked_by = (SELECT json_group_array(d.depends_on) {OPEN_BLOCKERS})
+        WHERE id = ? AND mission_id = ?
+    ''', (task_id, mid))
+
+
+def critical_path(conn, mid):
+    """Longest chain of open tasks through open dependencies, as a list of task ids."""
+    open_ids = [r[0] for r in conn.execute(
+        "SELECT id FROM tasks WHERE mission_id = ? AND status NOT IN ('done', 'cancelled') ORDER BY id",
+        (mid,))]
+    edges = conn.execute('''
+        SELECT d.depends_on, d.task_id FROM task_deps d
+        JOIN tasks t ON t.id = d.task_id AND t.mission_id = ? AND t.status NOT IN ('done', 'cancelled')
+        JOIN tasks b ON b.id = d.depends_on AND b.status NOT IN ('done', 'cancelled')
+    ''', (mid,)).fetchall()
+    dependents = {tid: [] for tid in open_ids}
+    indegree = dict.fromkeys(open_ids, 0)
+    for before, after in edges:
+        if before in dependents and after in indegree:
+            dependents[before].append(after)
+            indegree[after] += 1
+    # Kahn's algorithm; length/prev give the longest chain ending at each task
+    length, prev = dict.fromkeys(open_ids, 1), {}
+    ready = [tid for tid in open_ids if indegree[tid] == 0]
+    while ready:
+        tid = ready.pop()
+        for nxt in dependents[tid]:
+            if length[tid] + 1 > length[nxt]:
+                length[nxt], prev[nxt] = length[tid] + 1, tid
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                ready.append(nxt)
+    if not open_ids:
+        return []
+    tail = max(open_ids, key=lambda t: (length[t], -t))
+    path = [tail]
+    while path[-1] in prev:
+        path.append(prev[path[-1]])
+    return path[::-1]
+
+# ═══════════════════════════════════════════
+# ACTIVATION AND LEASES (shared with mc-server)
+# ═══════════════════════════════════════════
+
+# Waiting tasks of a mission whose time has come: one range of
+# idx_tasks_waiting(mission_id, scheduled_at), however many are still ahead.
+DUE = f"mission_id = :mid AND {WAITING} AND scheduled_at <= datetime('now')"
+
+ACTIVATE_SQL = f'''
+    UPDATE tasks SET activated_at = datetime('now'), updated_at = datetime('now')
+    WHERE {DUE}
+    RETURNING id, subject, owner, status
+'''
+
+# Other agents' claims whose lease ran out: one range of
+# idx_tasks_lease(mission_id, lease_expires_at), however many are still held.
+EXPIRED = ("mission_id = :mid AND lease_expires_at <= datetime('now') "
+           "AND status IN ('claimed', 'in_progress') AND owner IS NOT :agent")
+
+# When the next waiting task of each active mission is due, and the next lease expires
+NEXT_DUE_SQL = f'''
+    SELECT id, (SELECT MIN(scheduled_at) FROM tasks WHERE mission_id = missions.id AND {WAITING}) AS due,
+           (SELECT MIN(lease_expires_at) FROM tasks WHERE mission_id = missions.id
+            AND lease_expires_at IS NOT NULL AND status IN ('claimed', 'in_progress')) AS expires
+    FROM missions WHERE status = 'active'
+'''
+
+
+def notify_owners(conn, mid, tasks, headline):
+    """Send each owner of `tasks` one message from 'mc': `headline` and up to 10 of its tasks.
+
+    Tasks without an owner are announced to the whole mission.
+    """
+    by_owner = {}
+    for r in tasks:
+        by_owner.setdefault(r['owner'] or None, []).append(r)
+    for owner, owned in by_owner.items():
+        listed = ', '.join(f"#{r['id']} {r['subject']}" for r in owned[:10])
+        more = f' (+{len(owned) - 10} more)' if len(owned) > 10 else ''
+        conn.execute(
+            "INSERT INTO messages(mission_id, from_agent, to_agent, body, msg_type) VALUES (?, 'mc', ?, ?, 'status')",
+            (mid, owner, f'{headline}: {listed}{more}'))
+
+
+def activate_due(conn, mid, agent):
+    """Activate mission `mid`'s scheduled tasks that are due and commit; return the open ones.
+
+    Each activated task gets a task_due activity row (by `agent`, whose
+    command ran the pass), and each owner one message listing its tasks.
+    When nothing is due this is a single index probe and takes no lock.
+    """
+    if conn.execute(f'SELECT 1 FROM tasks WHERE {DUE} LIMIT 1', {'mid': mid}).fetchone() is None:
+        return []
+    conn.execute('BEGIN IMMEDIATE')
+    due = [dict(r) for r in conn.execute(ACTIVATE_SQL, {'mid': mid})
+           if r['status'] not in ('done', 'cancelled')]
+    due.sort(key=lambda r: r['id'])
+    conn.executemany(
+        "INSERT INTO activity(mission_id, agent, action, target_type, target_id, detail) "
+        "VALUES (?, ?, 'task_due', 'task', ?, ?)", [(mid, agent, r['id'], r['subject']) for r in due])
+    notify_owners(conn, mid, due, '⏰ Due now')
+    conn.commit()
+    return due
+
+
+def reclaim_expired(conn, mid, agent):
+    """Put mission `mid`'s claims whose lease expired back to pending and commit; return them.
+
+    `agent`'s own claims are left alone: it is running a command, so it is
+    alive, and its checkin renews them. Each reclaimed task gets a
+    task_reclaimed activity row (by `agent`) and each previous owner one
+    message listing its tasks. When nothing has expired this is a single
+    index probe and takes no lock.
+    """
+    params = {'mid': mid, 'agent': agent}
+    if conn.execute(f'SELECT 1 FROM tasks WHERE {EXPIRED} LIMIT 1', params).fetchone() is None:
+        return []
+    conn.execute('BEGIN IMMEDIATE')
+    expired = sorted((dict(r) for r in conn.execute(f'SELECT id, subject, owner FROM tasks WHERE {EXPIRED}', params)),
+                     key=lambda r: r['id'])
+    conn.executemany(
+        "UPDATE tasks SET status = 'pending', owner = '', claimed_at = NULL, lease_expires_at = NULL, "
+        "updated_at = datetime('now') WHERE id = ?", [(r['id'],) for r in expired])
+    conn.executemany(
+        "INSERT INTO activity(mission_id, agent, action, target_type, target_id, detail) "
+        "VALUES (?, ?, 'task_reclaimed', 'task', ?, ?)",
+        [(mid, agent, r['id'], f"lease of {r['owner']} expired") for r in expired])
+    # A previous owner that crashed mid-task should not stay busy
+    conn.executemany(f'UPDATE agents SET status = {AGENT_STATUS} WHERE name = :a',
+                     [{'a': owner} for owner in sorted({r['owner'] for r in expired})])
+    notify_owners(conn, mid, expired, '⌛ Lease expired, back to pending')
+    conn.commit()
+    return expired
+
+
+def wake_owners(db, tasks):
+    """Enable the cron jobs of the owners of `tasks` that cron-guard left disabled."""
+    owners = sorted({t['owner'] for t in tasks if t['owner']})
+    if not owners:
+        return []
+    import mc_cron  # only needed when owned tasks come due; keeps startup lean
+    conn = mc_cron.open_index(db)
+    try:
+        return [row['name'] for row, ok in mc_cron.wake(conn, owners) if ok]
+    finally:
+        conn.close()
+
+# ═══════════════════════════════════════════
+# SEARCH (shared with mc-server)
+# ═══════════════════════════════════════════
+
+# Only the newest RANK_WINDOW matches are ranked: a common term matches most
+# of a mission, and scoring every hit is what makes such a query slow.
+RANK_WINDOW = 1000
+
+# One statement per index: the newest matches by rowid, the best-ranked of
+# those, then snippets for just the rows returned. Snippet marks are \x01/\x02.
+SEARCH_SQL = {
+    'task': '''
+        WITH hits AS (
+            SELECT rowid AS id, bm25(tasks_fts, 2.0, 1.0, 0.0) AS score FROM tasks_fts
+            WHERE tasks_fts MATCH :match ORDER BY rowid DESC LIMIT :window),
+        top AS (SELECT id, score FROM hits ORDER BY score LIMIT :limit)
+        SELECT 'task' AS type, t.id, t.subject AS title, t.status AS label, t.owner AS agent,
+               substr(t.updated_at, 1, 16) AS at, top.score,
+               snippet(tasks_fts, -1, char(1), char(2), '…', 12) AS snippet
+        FROM top JOIN tasks_fts ON tasks_fts.rowid = top.id JOIN tasks t ON t.id = top.id
+        WHERE tasks_fts MATCH :match ORDER BY top.score
+    ''',
+    'msg': '''
+        WITH hits AS (
+            SELECT rowid AS id, bm25(messages_fts, 1.0, 0.0) AS score FROM messages_fts
+            WHERE messages_fts MATCH :match ORDER BY rowid DESC LIMIT :window),
+        top AS (SELECT id, score FROM hits ORDER BY score LIMIT :limit)
+        SELECT 'msg' AS type, m.id, m.from_agent || ' → ' || COALESCE(m.to_agent, 'all') AS title,
+               m.msg_type AS label, m.from_agent AS agent, substr(m.created_at, 1, 16) AS at, top.score,
+               snippet(messages_fts, 0, char(1), char(2), '…', 12) AS snippet
+        FROM top JOIN messages_fts ON messages_fts.rowid = top.id JOIN messages m ON m.id = top.id
+        WHERE messages_fts MATCH :match ORDER BY top.score
+    ''',
+    'activity': '''
+        WITH hits AS (
+            SELECT rowid AS id, bm25(activity_fts, 1.0, 0.0) AS score FROM activity_fts
+            WHERE activity_fts MATCH :match ORDER BY rowid DESC LIMIT :window),
+        top AS (SELECT id, score FROM hits ORDER BY score LIMIT :limit)
+        SELECT 'activity' AS type, a.id, a.action AS title, a.target_type AS label, a.agent,
+               substr(a.created_at, 1, 16) AS at, top.score,
+               snippet(activity_fts, 0, char(1), char(2), '…', 12) AS snippet
+        FROM top JOIN activity_fts ON activity_fts.rowid = top.id JOIN activity a ON a.id = top.id
+        WHERE activity_fts MATCH :match ORDER BY top.score
+    ''',
+}
+
+
+def fts_query(text):
+    """FTS5 query for free text: every word must match; "quoted phrases" and wo* prefixes are kept.
+
+    Each term is quoted, so operators and punctuation in the input are plain
+    text. Returns '' when there is nothing to search for.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"?|(\S+)', text):
+        term = phrase or word.rstrip('*')
+        if term.strip():
+            # Prefixes of 2+ characters use the prefix index; a 1-character one would match everything
+            prefix = word.endswith('*') and len(term) > 1
+            terms.append('"' + term.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+def search(conn, mid, text, kinds=('task', 'msg', 'activity'), limit=20):
+    """Best `limit` matches for `text` in mission `mid` across `kinds`, best first (bm25 score, lower is better)."""
+    query = fts_query(text)
+    if not query:
+        return []
+    # The terms must not match the indexed mission_id column itself
+    match = f'mission_id : "{int(mid)}" AND (- mission_id : ({query}))'
+    params = {'match': match, 'window': RANK_WINDOW, 'limit': limit}
+    rows = [dict(r) for kind in kinds for r in conn.execute(SEARCH_SQL[kind], params)]
+    return sorted(rows, key=lambda r: r['score'])[:limit]
+
+# ═══════════════════════════════════════════
+# CHECKIN (shared with mc-server)
+# ═══════════════════════════════════════════
+
+# Seconds within which a repeated heartbeat with the same status is not
+# written again (MC_HEARTBEAT_INTERVAL; 0 writes every one)
+HEARTBEAT_INTERVAL = 60
+
+AGENT_STATUS = "CASE WHEN EXISTS (SELECT 1 FROM tasks WHERE owner = :a AND status = 'in_progress') " \
+               "THEN 'busy' ELSE 'idle' END"
+
+# Nothing to write: last_seen is within the interval and the status is unchanged
+HEARTBEAT_FRESH_SQL = f'''
+    SELECT 1 FROM agents WHERE name = :a AND last_seen > datetime('now', :window) AND status = {AGENT_STATUS}
+'''
+
+# One statement whether or not the agent exists: a new agent gets an empty
+# role, an existing one keeps its role, session and registration time, and
+# is only rewritten when the heartbeat is not fresh. Returns a row if written.
+HEARTBEAT_SQL = f'''
+    INSERT INTO agents(name, role, last_seen, status, session_id, registered_at)
+    VALUES (:a, '', datetime('now'), {AGENT_STATUS}, '', datetime('now'))
+    ON CONFLICT(name) DO UPDATE SET last_seen = excluded.last_seen, status = excluded.status
+    WHERE agents.last_seen IS NULL OR agents.last_seen <= datetime('now', :window)
+       OR agents.status IS NOT excluded.status
+    RETURNING name
+'''
+
+# Heartbeat writes per agent, mission and day, in place of one activity row each
+HEARTBEAT_COUNT_SQL = '''
+    INSERT INTO agent_heartbeats(agent, mission_id, day, writes, last_at)
+    VALUES (:a, :mid, date('now'), 1, datetime('now'))
+    ON CONFLICT DO UPDATE SET writes = writes + 1, last_at = excluded.last_at
+'''
+
+# The agent's leases with less than half their length left start over; one
+# idx_tasks_owner_status range, and no rows (so no changelog churn) most of the time
+LEASE_RENEW_SQL = '''
+    UPDATE tasks SET lease_expires_at = datetime('now', :lease)
+    WHERE owner = :a AND status IN ('claimed', 'in_progress') AND lease_expires_at < datetime('now', :renew)
+'''
+
+CHECKIN_TASK_COLUMNS = 'id, subject, status, priority, task_type, scheduled_at'
+
+
+def checkin(conn, mission, agent, full=False, claim=None, limit=10, interval=HEARTBEAT_INTERVAL):
+    """Record `agent`'s heartbeat in mission `mission` and commit; return what its tick needs.
+
+    Always {'agent', 'mission'}. With `full` and an active mission, the same
+    transaction also claims the next task (with `claim`, the status to
+    claim it with: 'claimed', or 'in_progress' to start it) and reads the
+    agent's open tasks, up to `limit` claimable tasks and up to `limit`
+    unread messages, newest first, marking those addressed to the agent read.
+
+    A heartbeat is written (agents.last_seen, and +1 in agent_heartbeats) only
+    if the last one is over `interval` seconds old or the agent's status
+    changed. Otherwise a plain checkin only reads and takes no write lock.
+    A written heartbeat also renews the agent's leases that are over half
+    gone, so `interval` is capped at half the lease.
+    Raises MissionError, with the heartbeat committed, if the mission does
+    not exist.
+    """
+    ttl = lease_ttl()
+    if ttl:
+        interval = min(interval, ttl // 2)
+    params = {'a': agent, 'window': f'-{max(int(interval), 0)} seconds'}
+    fresh = not full and interval > 0 and conn.execute(HEARTBEAT_FRESH_SQL, params).fetchone() is not None
+    conn.execute('BEGIN' if fresh else 'BEGIN IMMEDIATE')
+    m = conn.execute('SELECT id, name, status, description, user_instructions FROM missions WHERE name = ?',
+                     (mission,)).fetchone()
+    result = {'agent': agent, 'mission': m and {k: m[k] for k in ('name', 'status', 'description', 'user_instructions')}}
+    if m is None or m['status'] in ('paused', 'completed', 'archived'):
+        if not fresh:
+            first(conn.execute(HEARTBEAT_SQL, params))
+        conn.commit()
+        if m is None:
+            raise MissionError(mission)
+        return result
+
+    mid = m['id']
+    claimed = claim_next(conn, mid, agent, claim, commit=False) if full and claim else None
+    # After the claim, so an agent that has just started a task shows as busy
+    if not fresh and first(conn.execute(HEARTBEAT_SQL, params)) is not None:
+        conn.execute(HEARTBEAT_COUNT_SQL, {'a': agent, 'mid': mid})
+    if not fresh and ttl:
+        conn.execute(LEASE_RENEW_SQL, {'a': agent, 'lease': lease(ttl), 'renew': f'+{ttl // 2} seconds'})
+    if full:
+        params = {'a': agent, 'agent': agent, 'mid': mid, 'after': MAX_ROWID, 'limit': limit + 1}
+        tasks = [dict(r) for r in conn.execute(
+            f"SELECT {CHECKIN_TASK_COLUMNS} FROM tasks WHERE owner = :a AND mission_id = :mid "
+            "AND status NOT IN ('done', 'cancelled') ORDER BY priority DESC, id", params)]
+        # One row past `limit` of each says whether there are more
+        claimable = [dict(r) for r in conn.execute(
+            f"SELECT {CHECKIN_TASK_COLUMNS} FROM tasks WHERE mission_id = :mid AND status = 'pending' "
+            f"AND {CLAIMABLE} ORDER BY priority DESC, id LIMIT :limit", params)]
+        messages = [dict(r) for r in conn.execute(inbox_sql(
+            'id, from_agent, to_agent, task_id, body, msg_type, created_at', True), params)]
+        more_claimable, more_messages = len(claimable) > limit, len(messages) > limit
+        claimable, messages = claimable[:limit], messages[:limit]
+        result.update(claimed=claimed, tasks=tasks, claimable=claimable, more_claimable=more_claimable,
+                      messages=messages, more_messages=more_messages)
+        conn.execute(
+            "UPDATE messages SET read_at = datetime('now') WHERE id IN (SELECT value FROM json_each(?)) "
+            'AND read_at IS NULL', (json.dumps([r['id'] for r in messages if r['to_agent'] == agent]),))
+    else:
+        result['unread'] = conn.execute(
+            'SELECT COUNT(*) FROM messages WHERE to_agent = ? AND read_at IS NULL '
+            'AND (mission_id = ? OR mission_id IS NULL)', (agent, mid)).fetchone()[0]
+    conn.commit()
+    return result
+
+# ═══════════════════════════════════════════
+# CONTEXT (mirrors resolve_project/resolve_mission in mc)
+# ═══════════════════════════════════════════
+
+class Context:
+    def __init__(self, project_flag='', mission_flag=''):
+        profile = os.environ.get('OPENCLAW_PROFILE', '')
+        home = Path.home()
+        self.config_dir = home / f'.openclaw-{profile}' if profile else home / '.openclaw'
+        self.agent = os.environ.get('MC_AGENT') or self._whoami()
+        self.config_text = self._read_config()
+        if os.environ.get('MC_DB'):
+            self.db = os.environ['MC_DB']
+            self.project = '(custom)'
+            project = self._resolve_project(project_flag)
+        else:
+            self.project = project = self._resolve_project(project_flag)
+            self.db = str(self.config_dir / 'projects' / project / 'mission-control.db')
+        self.mission = self._resolve_mission(mission_flag, project)
+
+    @staticmethod
+    def _whoami():
+        import getpass
+        return getpass.getuser()
+
+    def _read_config(self):
+        try:
+            return (self.config_dir / 'config.json').read_text()
+        except OSError:
+            return ''
+
+    def _resolve_project(self, flag):
+        for value in (flag, os.environ.get('MC_PROJECT'), os.environ.get('MC_WORKSPACE')):
+            if value:
+                return value
+        if os.path.isfile('.mc-workspace'):
+            return Path('.mc-workspace').read_text().rstrip('\n')
+        # Same pattern as mc's grep, so both always pick the same DB
+        for key in ('default_project', 'default_workspace'):
+            m = re.search(rf'"{key}":"([^"]*)"', self.config_text)
+            if m and m.group(1):
+                return m.group(1)
+        return 'default'
+
+    def _resolve_mission(self, flag, project):
+        for value in (flag, os.environ.get('MC_MISSION')):
+            if value:
+                return value
+        try:
+            config = json.loads(self.config_text or '{}')
+            projects = config.get('projects', config.get('workspaces', {}))
+            return projects.get(project, {}).get('default_mission', '') or 'default'
+        except (ValueError, AttributeError):
+            return 'default'
+
+
+def disable_mission_crons(ctx):
+    """Disable the openclaw cron jobs of this mission's agents (named {project}-{mission}-*)."""
+    import mc_cron  # only needed on the rare checkpoint path; keeps startup lean
+    conn = mc_cron.open_index(ctx.db)
+    try:
+        for row, ok in mc_cron.set_mission_crons(conn, ctx, 'disable'):
+            if ok:
+                print(f"  Disabled cron: {row['job_id']}")
+    finally:
+        conn.close()
+
+
+def upkeep_mission(conn, ctx):
+    """If the current mission is active, activate its due tasks (waking their owners) and reclaim expired leases."""
+    m = conn.execute("SELECT id FROM missions WHERE name = ? AND status = 'active'", (ctx.mission,)).fetchone()
+    if m is not None:
+        wake_owners(ctx.db, activate_due(conn, m['id'], ctx.agent))
+        reclaim_expired(conn, m['id'], ctx.agent)
+
+# ═══════════════════════════════════════════
+# OUTPUT (matches sqlite3 -header -column)
+# ═══════════════════════════════════════════
+
+def display_width(text):
+    # sqlite3's column mode counts code points, so emoji flags take one column
+    return sum(0 if unicodedata.combining(ch) else 1 for ch in text)
+
+
+def print_columns(rows, headers):
+    if not rows:
+        return
+    cells = [['' if v is None else str(v) for v in row] for row in rows]
+    widths = [max(display_width(h), *(display_width(r[i]) for r in cells)) for i, h in enumerate(headers)]
+
+    def line(values):
+        return '  '.join(v + ' ' * (w - display_width(v)) for v, w in zip(values, widths))
+
+    print(line(headers))
+    print(line(['-' * w for w in widths]))
+    for r in cells:
+        print(line(r))
+
+
+def schedule_flag(row):
+    return f" ⏰{row['scheduled_at'][:16]}" if row['future'] else ''
+
+
+# Cursor before the first page of a newest-first (id DESC) listing
+MAX_ROWID = 2 ** 63 - 1
+
+
+def page_footer(command, argv, cursor):
+    """Text-mode hint for the next keyset page: the same command with --after <cursor>."""
+    args, it = [], iter(argv)
+    for arg in it:
+        if arg == '--after':
+            next(it, None)
+        else:
+            args.append(arg)
+    print(f"{C}… more: {shlex.join(['mc', *command.split(), *args, '--after', str(cursor)])}{N}")
+
+
+def fields(*columns, **derived):
+    """Field name → SQL expression for machine-readable output: table columns, then derived values."""
+    return {**{c: c for c in columns}, **derived}
+
+
+TASK_FIELDS = fields('id', 'subject', 'description', 'status', 'owner', 'created_by', 'priority', 'task_type',
+                     'scheduled_at', 'activated_at', 'created_at', 'updated_at', 'claimed_at', 'completed_at',
+                     'lease_expires_at')
+MESSAGE_FIELDS = fields('id', 'from_agent', 'to_agent', 'task_id', 'body', 'msg_type', 'created_at', 'read_at')
+ACTIVITY_FIELDS = fields('id', 'agent', 'action', 'target_type', 'target_id', 'detail', 'created_at')
+AGENT_FIELDS = fields('name', 'role', 'status', 'last_seen', 'session_id', 'registered_at', 'max_tasks',
+                      task_id="(SELECT id FROM tasks WHERE owner = agents.name AND status = 'in_progress' LIMIT 1)",
+                      heartbeat_writes_today="(SELECT COALESCE(SUM(writes), 0) FROM agent_heartbeats "
+                                             "WHERE agent = agents.name AND day = date('now'))")
+SEARCH_FIELDS = fields('type', 'id', 'title', 'label', 'agent', 'at', 'score', 'snippet')
+
+
+class FieldError(Exception):
+    """--fields named something the command does not output."""
+
+
+class Output:
+    """--json (one array) or --ndjson (one object per line) instead of the text view.
+
+    Rows are written as the query yields them, keyed by schema.sql column
+    names, without colors. --fields a,b selects only those columns.
+    """
+
+    def __init__(self, fmt, names=()):
+        self.fmt, self.names = fmt, tuple(names)
+
+    def select(self, available):
+        """(keys, SQL select list) for the requested fields of `available` (all of them by default)."""
+        unknown = [n for n in self.names if n not in available]
+        if unknown:
+            raise FieldError(f"Unknown field: {', '.join(unknown)} (available: {', '.join(available)})")
+        keys = self.names or tuple(available)
+        return keys, ', '.join(k if available[k] == k else f'{available[k]} AS {k}' for k in keys)
+
+    def write(self, rows, keys):
+        """Stream `rows` (sequences in `keys` order) as JSON objects."""
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        out = sys.stdout
+        if self.fmt == 'ndjson':
+            for row in rows:
+                out.write(encode(dict(zip(keys, row))) + '\n')
+            return
+        sep = '['
+        for row in rows:
+            out.write(sep + encode(dict(zip(keys, row))))
+            sep = ','
+        out.write('[]\n' if sep == '[' else ']\n')
+
+
+def output_flags(argv):
+    """Take --json, --ndjson and --fields a,b out of argv, wherever they are; return (Output or None, rest)."""
+    fmt, names, rest = None, (), []
+    args = iter(argv)
+    for arg in args:
+        if arg in ('--json', '--ndjson'):
+            fmt = arg[2:]
+        elif arg == '--fields' or arg.startswith('--fields='):
+            value = arg.partition('=')[2] if '=' in arg else next(args, '')
+            names = tuple(n.strip() for n in value.split(',') if n.strip())
+        else:
+            rest.append(arg)
+    if names and fmt is None:
+        fmt = 'json'
+    return (Output(fmt, names) if fmt else None), rest
+
+# ═══════════════════════════════════════════
+# COMMANDS
+# ═══════════════════════════════════════════
+
+def cmd_board(conn, ctx, argv):
+    limit = 10  # tasks shown per status
+    args = iter(argv)
+    for arg in args:
+        if arg == '--limit':
+            limit = int(next(args, limit))
+    conn.execute('BEGIN')
+    mission = mission_row(conn, ctx.mission)
+    mid = mission['id']
+    if ctx.output:
+        # The rows the board shows (first --limit per status), with each status' total
+        keys, select = ctx.output.select({**TASK_FIELDS, 'status_count': 'COUNT(*) OVER (PARTITION BY status)'})
+        order = 'CASE _status ' + ' '.join(f"WHEN '{s}' THEN {i}" for i, s in enumerate(STATUS_ICONS)) + ' END'
+        ctx.output.write(conn.execute(f'''
+            SELECT {', '.join(keys)} FROM (
+                SELECT {select}, status AS _status, priority AS _priority, id AS _id,
+                       ROW_NUMBER() OVER (PARTITION BY status ORDER BY priority DESC, id) AS _n
+                FROM tasks WHERE mission_id = ?
+            ) WHERE _n <= ? AND {order} IS NOT NULL
+            ORDER BY {order}, _priority DESC, _id
+        ''', (mid, limit)), keys)
+        conn.commit()
+        return 0
+    print(f"{B}═══ MISSION CONTROL ═══{N}  {time.strftime('%H:%M')}  agent: {C}{ctx.agent}{N}")
+    print(f'  project: {C}{ctx.project}{N}  mission: {C}{ctx.mission}{N}')
+    if mission['status'] == 'paused':
+        print(f'  status: {Y}⏸ PAUSED{N}')
+    print()
+
+    counts = dict(conn.execute(
+        'SELECT status, COUNT(*) FROM tasks WHERE mission_id = ? GROUP BY status', (mid,)).fetchall())
+    rows = conn.execute(f'''
+        SELECT * FROM (
+            SELECT id, subject, owner, status, task_type, scheduled_at, {WAITING} AS future,
+                   ROW_NUMBER() OVER (PARTITION BY status ORDER BY priority DESC, id) AS n
+            FROM tasks WHERE mission_id = ?
+        ) WHERE n <= ?
+    ''', (mid, limit)).fetchall()
+    for status, icon in STATUS_ICONS.items():
+        if not counts.get(status):
+            continue
+        print(f'{B}── {icon} {status} ({counts[status]}) ──{N}')
+        shown = [r for r in rows if r['status'] == status]
+        for r in shown:
+            owner = f" [{r['owner']}]" if r['owner'] is not None else ''
+            checkpoint = ' 🏁' if r['task_type'] == 'checkpoint' else ''
+            print(f"  #{r['id']} {r['subject']}{owner}{checkpoint}{schedule_flag(r)}")
+        if shown and counts[status] > len(shown):
+            print(f"  {C}… {counts[status] - len(shown)} more: mc list --all --status {status} "
+                  f"--after {shown[-1]['id']}{N}")
+        print()
+
+    scheduled = conn.execute(f'''
+        SELECT id, subject, owner, scheduled_at, COUNT(*) OVER () AS total
+        FROM tasks WHERE mission_id = ? AND {WAITING} AND status NOT IN ('done', 'cancelled')
+        ORDER BY scheduled_at LIMIT 5
+    ''', (mid,)).fetchall()
+    if scheduled:
+        print(f"{B}── ⏰ scheduled ({scheduled[0]['total']}) ──{N}")
+        for r in scheduled:
+            owner = f" [{r['owner']}]" if r['owner'] is not None else ''
+            print(f"  #{r['id']} {r['subject']} ⏰{r['scheduled_at'][:16]}{owner}")
+        print()
+    conn.commit()
+    return 0
+
+
+def cmd_list(conn, ctx, argv):
+    where, params = ['mission_id = ?'], []
+    show_all, after, limit = False, None, -1
+    args = iter(argv)
+    for arg in args:
+        if arg == '--status':
+            where.append('status = ?'); params.append(next(args, ''))
+        elif arg == '--owner':
+            where.append('owner = ?'); params.append(next(args, ''))
+        elif arg == '--mine':
+            where.append('owner = ?'); params.append(ctx.agent)
+        elif arg == '--all':
+            show_all = True
+        elif arg == '--after':
+            after = int(next(args, 0))
+        elif arg == '--limit':
+            limit = int(next(args, limit))
+    if not show_all:
+        where.append("status NOT IN ('done', 'cancelled')")
+        # Hide scheduled tasks that are not due yet by default
+        where.append(READY)
+
+    conn.execute('BEGIN')
+    mid = mission_row(conn, ctx.mission)['id']
+    if after is not None:
+        # Rows after task #after in (priority DESC, id) order: the rest of its
+        # priority, then the lower ones, as one range of the priority indexes
+        cursor = conn.execute('SELECT priority FROM tasks WHERE id = ? AND mission_id = ?', (after, mid)).fetchone()
+        if cursor is None:
+            conn.rollback()
+            print(f'{R}--after: task #{after} not found{N}', file=sys.stderr)
+            return 1
+        where.append('priority <= ? AND (priority < ? OR id > ?)')
+        params += [cursor['priority'], cursor['priority'], after]
+    if ctx.output:
+        keys, select = ctx.output.select(TASK_FIELDS)
+        ctx.output.write(conn.execute(
+            f"SELECT {select} FROM tasks WHERE {' AND '.join(where)} ORDER BY priority DESC, id LIMIT ?",
+            (mid, *params, limit)), keys)
+        conn.commit()
+        return 0
+    rows = conn.execute(f'''
+        SELECT id, subject, status, COALESCE(owner, '-') AS owner, priority, task_type, scheduled_at,
+               {WAITING} AS future
+        FROM tasks WHERE {' AND '.join(where)} ORDER BY priority DESC, id LIMIT ?
+    ''', (mid, *params, limit + 1 if limit >= 0 else -1)).fetchall()
+    conn.commit()
+    more = 0 <= limit < len(rows)
+    rows = rows[:limit] if more else rows
+    print_columns([
+        (r['id'], r['subject'], f"{STATUS_ICONS.get(r['status'], '○')} {r['status']}", r['owner'],
+         {2: '!!!', 1: '!'}.get(r['priority'], '')
+         + (' 🏁' if r['task_type'] == 'checkpoint' else '') + schedule_flag(r))
+        for r in rows
+    ], ['id', 'subject', 'st', 'owner', 'flags'])
+    if more and rows:
+        page_footer('list', argv, rows[-1]['id'])
+    return 0
+
+
+def cmd_claim(conn, ctx, argv):
+    if not argv:
+        print('Usage: mc claim <id>', file=sys.stderr)
+        return 1
+    task_id = int(argv[0])
+    conn.execute('BEGIN IMMEDIATE')
+    mid = writable_mission_id(conn, ctx.mission)
+    try:
+        claim(conn, mid, task_id, ctx.agent)
+    except ClaimError as e:
+        print(f'{R}{e}{N}')
+        return 1
+    print(f'{G}Claimed #{task_id}{N}')
+    return 0
+
+
+def cmd_claim_next(conn, ctx, argv):
+    conn.execute('BEGIN IMMEDIATE')
+    mid = writable_mission_id(conn, ctx.mission)
+    task = claim_next(conn, mid, ctx.agent)
+    if task is None:
+        print(f'{Y}No claimable tasks{N}')
+        return 1
+    print(f"{G}Claimed #{task['id']}{N} {task['subject']}")
+    return 0
+
+
+def cmd_start(conn, ctx, argv):
+    if not argv:
+        print('Usage: mc start <id>', file=sys.stderr)
+        return 1
+    task_id = int(argv[0])
+    conn.execute('BEGIN IMMEDIATE')
+    mid = writable_mission_id(conn, ctx.mission)
+    row = conn.execute(
+        f"SELECT status, scheduled_at, {WAITING} AS future "
+        'FROM tasks WHERE id = ? AND mission_id = ?', (task_id, mid)).fetchone()
+    if row and row['status'] == 'blocked':
+        conn.rollback()
+        print(f'{R}#{task_id} is blocked — resolve blockers first{N}')
+        return 1
+    if row and row['future']:
+        conn.rollback()
+        print(f"{R}#{task_id} is scheduled for {row['scheduled_at']} — cannot start yet{N}")
+        return 1
+    conn.execute(
+        "UPDATE tasks SET status = 'in_progress', lease_expires_at = datetime('now', ?), updated_at = datetime('now') "
+        'WHERE id = ? AND mission_id = ? AND owner = ?', (lease(), task_id, mid, ctx.agent))
+    conn.execute("UPDATE agents SET status = 'busy' WHERE name = ?", (ctx.agent,))
+    log_activity(conn, mid, ctx.agent, 'task_started', 'task', task_id)
+    conn.commit()
+    print(f'{C}▶ Working on #{task_id}{N}')
+    return 0
+
+
+def cmd_done(conn, ctx, argv):
+    if not argv:
+        print('Usage: mc done <id> [-m note]', file=sys.stderr)
+        return 1
+    task_id, note = int(argv[0]), ''
+    args = iter(argv[1:])
+    for arg in args:
+        if arg == '-m':
+            note = next(args, '')
+
+    conn.execute('BEGIN IMMEDIATE')
+    mid = open_mission_id(conn, ctx.mission)
+    task_type = first(conn.execute(
+        "UPDATE tasks SET status = 'done', lease_expires_at = NULL, completed_at = datetime('now'), "
+        "updated_at = datetime('now') WHERE id = ? AND mission_id = ? RETURNING task_type", (task_id, mid)))
+    conn.execute("UPDATE agents SET status = 'idle' WHERE name = ?", (ctx.agent,))
+    log_activity(conn, mid, ctx.agent, 'task_completed', 'task', task_id, note)
+    if note:
+        conn.execute(
+            "INSERT INTO messages(mission_id, from_agent, task_id, body, msg_type) VALUES (?, ?, ?, ?, 'status')",
+            (mid, ctx.agent, task_id, note))
+    freed = unblock_dependents(conn, mid, task_id)
+    for tid in freed:
+        log_activity(conn, mid, ctx.agent, 'task_unblocked', 'task', tid, f'unblocked by #{task_id} completion')
+    # Checkpoint auto-pause: if completed task is a checkpoint, pause the mission
+    checkpoint = task_type is not None and task_type['task_type'] == 'checkpoint'
+    if checkpoint:
+        conn.execute("UPDATE missions SET status = 'paused', updated_at = datetime('now') WHERE id = ?", (mid,))
+        log_activity(conn, mid, ctx.agent, 'mission_paused', 'mission', mid, f'checkpoint #{task_id} reached')
+    conn.commit()
+
+    print(f'{G}✓ Done #{task_id}{N}' + (f' — {note}' if note else ''))
+    for tid in freed:
+        print(f'{C}↳ #{tid} unblocked{N}')
+    if checkpoint:
+        print(f'{Y}🏁 Checkpoint reached — mission paused{N}')
+        disable_mission_crons(ctx)
+        print(f'{Y}Resume with: mc -p {ctx.project} -m {ctx.mission} mission resume{N}')
+    return 0
+
+
+def cmd_block(conn, ctx, argv):
+    task_id = by = None
+    args = iter(argv)
+    for arg in args:
+        if arg == '--by':
+            by = next(args, None)
+        elif task_id is None:
+            task_id = arg
+    if task_id is None or not by:
+        print('Usage: mc block <id> --by <other-id>')
+        return 1
+    task_id, by = int(task_id), int(by)
+    conn.execute('BEGIN IMMEDIATE')
+    mid = writable_mission_id(conn, ctx.mission)
+    try:
+        block(conn, mid, task_id, by)
+    except DependencyError as e:
+        conn.rollback()
+        print(f'{R}Cannot block #{task_id} by #{by}: {e}{N}')
+        return 1
+    log_activity(conn, mid, ctx.agent, 'task_blocked', 'task', task_id, f'by #{by}')
+    conn.commit()
+    print(f'{R}✗ #{task_id} blocked by #{by}{N}')
+    return 0
+
+
+def cmd_graph(conn, ctx, argv):
+    conn.execute('BEGIN')
+    mid = mission_row(conn, ctx.mission)['id']
+    path = critical_path(conn, mid)
+    tasks = {r['id']: r for r in conn.execute(
+        "SELECT id, subject, status, owner FROM tasks WHERE mission_id = ? AND status NOT IN ('done', 'cancelled')",
+        (mid,))}
+    waits = conn.execute('''
+        SELECT d.task_id, group_concat('#' || d.depends_on, ' ') AS blockers
+        FROM task_deps d
+        JOIN tasks t ON t.id = d.task_id AND t.mission_id = ? AND t.status NOT IN ('done', 'cancelled')
+        JOIN tasks b ON b.id = d.depends_on AND b.status NOT IN ('done', 'cancelled')
+        GROUP BY d.task_id ORDER BY d.task_id
+    ''', (mid,)).fetchall()
+    conn.commit()
+
+    def label(tid):
+        t = tasks[tid]
+        owner = f" [{t['owner']}]" if t['owner'] else ''
+        return f"#{tid} {t['subject']}{owner}  {STATUS_ICONS.get(t['status'], '○')} {t['status']}"
+
+    print(f'{B}═══ DEPENDENCY GRAPH ═══{N}  mission: {C}{ctx.mission}{N}  open tasks: {len(tasks)}')
+    print()
+    if len(path) > 1:
+        print(f'{B}── critical path ({len(path)} tasks) ──{N}')
+        print(f'  {label(path[0])}')
+        for tid in path[1:]:
+            print(f'  → {label(tid)}')
+        print()
+    else:
+        print(f'{G}No open dependency chains{N}')
+        print()
+    if waits:
+        print(f'{B}── waiting ({len(waits)}) ──{N}')
+        for w in waits:
+            print(f"  #{w['task_id']} {tasks[w['task_id']]['subject']} ← {w['blockers']}")
+        print()
+    return 0
+
+
+def cmd_checkin(conn, ctx, argv):
+    full, claim, limit = ctx.output is not None, False, 10
+    args = iter(argv)
+    for arg in args:
+        if arg == '--full':
+            full = True
+        elif arg == '--claim':
+            full = claim = True
+        elif arg == '--limit':
+            limit = int(next(args, limit))
+    if ctx.output and (ctx.output.fmt != 'json' or ctx.output.names):
+        raise FieldError('checkin prints one JSON object: use --json, without --ndjson or --fields')
+    interval = int(os.environ.get('MC_HEARTBEAT_INTERVAL') or HEARTBEAT_INTERVAL)
+    result = checkin(conn, ctx.mission, ctx.agent, full=full, claim='claimed' if claim else None,
+                     limit=limit, interval=interval)
+    if ctx.output:
+        print(json.dumps(result, ensure_ascii=False, separators=(',', ':')))
+        return 0
+    mission = result['mission']
+
+    # Mission status guard
+    if mission['status'] in ('paused', 'completed', 'archived'):
+        print(f"MISSION_{mission['status'].upper()}")
+        return 0
+
+    if not full:
+        if result['unread'] > 0:
+            print(f"{Y}{result['unread']} unread messages{N} — run: mc inbox --unread")
+        else:
+            print(f'{G}HEARTBEAT_OK{N} ({ctx.agent})')
+        return 0
+
+    def task_rows(rows):
+        return [(r['id'], r['subject'], f"{STATUS_ICONS.get(r['status'], '○')} {r['status']}",
+                 {2: '!!!', 1: '!'}.get(r['priority'], '') + (' 🏁' if r['task_type'] == 'checkpoint' else ''))
+                for r in rows]
+
+    print(f"{G}HEARTBEAT_OK{N} ({ctx.agent})  mission: {C}{mission['name']}{N}")
+    if mission['user_instructions']:
+        print(f'{C}📋 User Instructions:{N}')
+        print(f"  {mission['user_instructions']}")
+    if result['claimed']:
+        print(f"{G}Claimed #{result['claimed']['id']}{N} {result['claimed']['subject']}")
+    elif claim:
+        print(f'{Y}No claimable tasks{N}')
+    if result['tasks']:
+        print(f'{C}Your tasks:{N}')
+        print_columns(task_rows(result['tasks']), ['id', 'subject', 'st', 'flags'])
+    if result['claimable']:
+        print(f'{C}Claimable:{N}')
+        print_columns(task_rows(result['claimable']), ['id', 'subject', 'st', 'flags'])
+        if result['more_claimable']:
+            page_footer('list', ['--status', 'pending'], result['claimable'][-1]['id'])
+    if result['messages']:
+        print(f'{C}Unread messages:{N}')
+        print_columns([(r['id'], r['from_agent'], r['body'], r['msg_type'], r['created_at'][:16])
+                       for r in result['messages']], ['id', 'from', 'body', 'type', 'at'])
+        if result['more_messages']:
+            page_footer('inbox', ['--unread'], result['messages'][-1]['id'])
+    return 0
+
+
+# Direct and broadcast messages, of this mission or of none. Each pair is
+# one idx_messages_inbox (or idx_messages_to_unread) range read newest first
+# and cut at a page, so a page costs the same however long the history is.
+INBOX_SCOPES = (('to_agent = :a', 'mission_id = :mid'), ('to_agent = :a', 'mission_id IS NULL'),
+                ('to_agent IS NULL', 'mission_id = :mid'), ('to_agent IS NULL', 'mission_id IS NULL'))
+
+
+def inbox_sql(select, unread_only):
+    unread = 'AND read_at IS NULL' if unread_only else ''
+    pages = ' UNION ALL '.join(
+        f'SELECT * FROM (SELECT id FROM messages WHERE {to} AND {mission} AND id < :after {unread} '
+        'ORDER BY id DESC LIMIT :limit)' for to, mission in INBOX_SCOPES)
+    return f'SELECT {select} FROM messages WHERE id IN ({pages}) ORDER BY id DESC LIMIT :limit'
+
+
+def cmd_inbox(conn, ctx, argv):
+    unread_only, after, limit = False, MAX_ROWID, 20
+    args = iter(argv)
+    for arg in args:
+        if arg == '--unread':
+            unread_only = True
+        elif arg == '--after':
+            after = int(next(args, after))
+        elif arg == '--limit':
+            limit = int(next(args, limit))
+    conn.execute('BEGIN IMMEDIATE')
+    mid = mission_row(conn, ctx.mission)['id']
+    if ctx.output:
+        keys, select = ctx.output.select(MESSAGE_FIELDS)
+    else:
+        keys, select = None, '''id, from_agent, body, msg_type,
+               CASE WHEN read_at IS NULL THEN '●' ELSE '' END AS new,
+               substr(created_at, 1, 16) AS at'''
+    # One extra row tells the text view whether there is another page
+    page = limit + (ctx.output is None)
+    rows = conn.execute(inbox_sql(f'{select}, id AS _id, to_agent AS _to', unread_only),
+                        {'a': ctx.agent, 'mid': mid, 'after': after, 'limit': page}).fetchall()
+    more, rows = len(rows) > limit, rows[:limit]
+    # Only what is delivered now counts as read; broadcasts have no reader
+    conn.execute(
+        "UPDATE messages SET read_at = datetime('now') WHERE id IN (SELECT value FROM json_each(?)) "
+        'AND read_at IS NULL', (json.dumps([r['_id'] for r in rows if r['_to'] == ctx.agent]),))
+    conn.commit()
+    if ctx.output:
+        ctx.output.write(rows, keys)
+    else:
+        print_columns([tuple(r)[:6] for r in rows], ['id', 'from', 'body', 'type', 'new', 'at'])
+        if more:
+            page_footer('inbox', argv, rows[-1]['_id'])
+    return 0
+
+
+def cmd_search(conn, ctx, argv):
+    kinds, limit, words = list(SEARCH_SQL), 20, []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--type':
+            kinds = [next(args, '')]
+        elif arg == '--limit':
+            limit = int(next(args, limit))
+        else:
+            words.append(arg)
+    if not words or kinds[0] not in SEARCH_SQL:
+        print('Usage: mc search "query" [--type task|msg|activity] [--limit N]', file=sys.stderr)
+        return 1
+    text = ' '.join(words)
+    keys = ctx.output.select(SEARCH_FIELDS)[0] if ctx.output else None
+    conn.execute('BEGIN')
+    mid = mission_row(conn, ctx.mission)['id']
+    rows = search(conn, mid, text, kinds, limit)
+    conn.commit()
+    if ctx.output:
+        for r in rows:
+            r['snippet'] = (r['snippet'] or '').replace(chr(1), '').replace(chr(2), '')
+        ctx.output.write(([r[k] for k in keys] for r in rows), keys)
+        return 0
+
+    print(f'{B}═══ SEARCH ═══{N}  "{text}"  mission: {C}{ctx.mission}{N}  {len(rows)} results')
+    for r in rows:
+        meta = ' '.join(v for v in (r['label'], r['agent'], r['at']) if v)
+        print(f"  {r['type']:<8} #{r['id']:<5} {r['title']}  {C}{meta}{N}")
+        snippet = ' '.join((r['snippet'] or '').split())
+        print(f"           {snippet.replace(chr(1), B).replace(chr(2), N)}")
+    return 0
+
+
+def cmd_fleet(conn, ctx, argv):
+    if ctx.output:
+        keys, select = ctx.output.select(AGENT_FIELDS)
+        ctx.output.write(conn.execute(f'SELECT {select} FROM agents ORDER BY name'), keys)
+        return 0
+    rows = conn.execute('''
+        SELECT name, role,
+          CASE status WHEN 'busy' THEN '▶ busy' WHEN 'idle' THEN '○ idle' ELSE '✗ offline' END AS status,
+          COALESCE((SELECT subject FROM tasks WHERE owner = agents.name AND status = 'in_progress' LIMIT 1), '-')
+            AS working_on,
+          substr(last_seen, 1, 16) AS last_seen
+        FROM agents ORDER BY status, name
+    ''').fetchall()
+    print(f'{B}═══ FLEET STATUS ═══{N}')
+    print_columns([tuple(r) for r in rows], ['name', 'role', 'status', 'working_on', 'last_seen'])
+    return 0
+
+
+def cmd_feed(conn, ctx, argv):
+    where, params, after, limit = ['mission_id = ?'], [], MAX_ROWID, 20
+    args = iter(argv)
+    for arg in args:
+        if arg in ('--last', '--limit'):
+            limit = int(next(args, limit))
+        elif arg == '--agent':
+            where.append('agent = ?'); params.append(next(args, ''))
+        elif arg == '--after':
+            after = int(next(args, after))
+    conn.execute('BEGIN')
+    mid = mission_row(conn, ctx.mission)['id']
+    if ctx.output:
+        keys, select = ctx.output.select(ACTIVITY_FIELDS)
+        ctx.output.write(conn.execute(
+            f"SELECT {select} FROM activity WHERE {' AND '.join(where)} AND id < ? ORDER BY id DESC LIMIT ?",
+            (mid, *params, after, limit)), keys)
+        conn.commit()
+        return 0
+    rows = conn.execute(
+        f"SELECT substr(created_at, 1, 16) AS at, agent, action, detail, id FROM activity "
+        f"WHERE {' AND '.join(where)} AND id < ? ORDER BY id DESC LIMIT ?",
+        (mid, *params, after, limit + 1)).fetchall()
+    conn.commit()
+    print_columns([tuple(r)[:4] for r in rows[:limit]], ['at', 'agent', 'action', 'detail'])
+    if len(rows) > limit:
+        page_footer('feed', argv, rows[limit - 1]['id'])
+    return 0
+
+
+def cmd_mission_status(conn, ctx, argv):
+    conn.execute('BEGIN')
+    m = mission_row(conn, ctx.mission)
+    counts = dict(conn.execute(
+        'SELECT status, COUNT(*) FROM tasks WHERE mission_id = ? GROUP BY status', (m['id'],)).fetchall())
+    scheduled = conn.execute(f'''
+        SELECT id, subject, scheduled_at FROM tasks
+        WHERE mission_id = ? AND {WAITING} AND status NOT IN ('done', 'cancelled')
+        ORDER BY scheduled_at LIMIT 5
+    ''', (m['id'],)).fetchall()
+    conn.commit()
+
+    print(f'{B}═══ MISSION STATUS ═══{N}')
+    print(f'  Project:     {C}{ctx.project}{N}')
+    print(f"  Mission:     {C}{m['name']}{N}")
+    print(f"  Description: {m['description'] or '-'}")
+    status_line = {
+        'active': f'{G}▶ ACTIVE{N}', 'paused': f'{Y}⏸ PAUSED{N}',
+        'completed': f'{G}✓ COMPLETED{N}', 'archived': 'archived',
+    }.get(m['status'])
+    if status_line:
+        print(f'  Status:      {status_line}')
+    print()
+
+    print(f'{C}Progress:{N}')
+    for st in ('pending', 'claimed', 'in_progress', 'review', 'blocked', 'done', 'cancelled'):
+        if counts.get(st):
+            print(f'  {st}: {counts[st]}')
+    print()
+
+    if m['user_instructions']:
+        print(f'{C}📋 User Instructions:{N}')
+        print(f"  {m['user_instructions']}")
+        print()
+
+    if scheduled:
+        print(f'{C}⏰ Upcoming Scheduled:{N}')
+        for r in scheduled:
+            print(f"  #{r['id']} {r['subject']} ⏰{r['scheduled_at'][:16]}")
+        print()
+    return 0
+
+
+COMMANDS = {
+    'board': cmd_board,
+    'list': cmd_list,
+    'claim': cmd_claim,
+    'claim-next': cmd_claim_next,
+    'start': cmd_start,
+    'done': cmd_done,
+    'block': cmd_block,
+    'graph': cmd_graph,
+    'checkin': cmd_checkin,
+    'inbox': cmd_inbox,
+    'mission status': cmd_mission_status,
+    'search': cmd_search,
+    'fleet': cmd_fleet,
+    'feed': cmd_feed,
+}
+
+# Commands that take --json / --ndjson / --fields (checkin takes --json alone)
+READ_COMMANDS = {'board', 'list', 'inbox', 'fleet', 'feed', 'search'}
+JSON_COMMANDS = READ_COMMANDS | {'checkin'}
+
+
+def main(argv=None):
+    output, argv = output_flags(sys.argv[1:] if argv is None else argv)
+    project_flag = mission_flag = ''
+    while argv and argv[0] in ('-p', '--project', '-w', '--workspace', '-m', '--mission'):
+        flag, value, argv = argv[0], argv[1] if len(argv) > 1 else '', argv[2:]
+        if flag in ('-m', '--mission'):
+            mission_flag = value
+        else:
+            project_flag = value
+    name = ' '.join(argv[:2]) if argv[:2] == ['mission', 'status'] else (argv[0] if argv else '')
+    if name not in COMMANDS:
+        print(f'mc_core: unknown command: {name or "(none)"}', file=sys.stderr)
+        return 2
+    if output and name not in JSON_COMMANDS:
+        print(f"--json/--ndjson/--fields work with: {', '.join(sorted(JSON_COMMANDS))}", file=sys.stderr)
+        return 2
+    rest = argv[len(name.split()):]
+
+    ctx = Context(project_flag, mission_flag)
+    ctx.output = output
+    if not os.path.isfile(ctx.db):
+        print(f'{Y}No database found at {ctx.db}{N}', file=sys.stderr)
+        print('Run: mc init' + (f' -p {project_flag}' if project_flag else ''), file=sys.stderr)
+        return 1
+
+    conn = connect(ctx.db)
+    try:
+        if name != 'fleet':
+            upkeep_mission(conn, ctx)
+        return COMMANDS[name](conn, ctx, rest)
+    except MissionError as e:
+        print(f'{R}{e}{N}' + (f' Run: mc mission create {e.name}' if e.status is None else ''),
+              file=sys.stderr)
+        if e.status == 'paused':
+            print(f'{Y}Resume: mc -p {ctx.project} -m {ctx.mission} mission resume{N}', file=sys.stderr)
+        return 1
+    except FieldError as e:
+        print(f'{R}{e}{N}', file=sys.stderr)
+        return 2
+    except sqlite3.OperationalError as e:
+        if 'no such table' not in str(e) and 'no such column' not in str(e):
+            raise
+        print(f'{R}Database schema is out of date ({e}).{N} Run: mc migrate', file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+mc_cron — cached openclaw cron-job index (`mc cron-guard`, mission pause/resume/complete)
+
+Finding a job id by name used to mean a full `openclaw cron list --json`
+plus a python3 to parse it, twice per agent tick for cron-guard alone. The
+name → id map is kept in the project DB (cron_jobs) instead and re-listed
+only when it is older than MC_CRON_TTL seconds (default 600), when a name
+is not in it, or when openclaw rejects a cached id. Enabling, disabling and
+removing jobs through MC update the index in place.
+
+Whole-mission operations read every {project}-{mission}-* job in one query
+and run the openclaw calls in parallel, then record the results in one
+transaction. Without a project DB (or before schema v4) the index lives in
+memory for the one command, which is exactly the old behaviour.
+
+  mc_cron.py [-p PROJECT] guard <disable|enable|check> <agent-name>
+  mc_cron.py [-p PROJECT] [-m MISSION] mission <disable|enable|remove>
+  mc_cron.py [-p PROJECT] refresh
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import mc_core
+from mc_core import G, N, Y
+
+CRON_TTL = int(os.environ.get('MC_CRON_TTL', '600'))
+
+INDEX_SQL = '''
+    CREATE TABLE IF NOT EXISTS cron_jobs (
+      name TEXT PRIMARY KEY, job_id TEXT NOT NULL,
+      enabled INTEGER NOT NULL DEFAULT 1, listed_at TEXT NOT NULL
+    ) WITHOUT ROWID
+'''
+
+# Rows whose name starts with :prefix, as a range over the primary key
+PREFIX_SQL = 'SELECT name, job_id, enabled FROM cron_jobs WHERE name >= :prefix AND name < :prefix || char(1114111) ORDER BY name'
+NAME_SQL = 'SELECT name, job_id, enabled FROM cron_jobs WHERE name = :name'
+DISABLED_SQL = 'SELECT name, job_id, enabled FROM cron_jobs WHERE name IN (SELECT value FROM json_each(:names)) AND enabled = 0'
+
+# What each operation leaves behind in the index
+DONE_SQL = {
+    'disable': 'UPDATE cron_jobs SET enabled = 0 WHERE name = ?',
+    'enable': 'UPDATE cron_jobs SET enabled = 1 WHERE name = ?',
+    'rm': 'DELETE FROM cron_jobs WHERE name = ?',
+}
+
+
+def openclaw(*args):
+    flags = ['--profile', os.environ['OPENCLAW_PROFILE']] if os.environ.get('OPENCLAW_PROFILE') else []
+    try:
+        return subprocess.run(['openclaw', *flags, *args], capture_output=True, text=True)
+    except OSError as e:
+        return subprocess.CompletedProcess(args, 127, '', str(e))
+
+
+def open_index(db):
+    """Connection holding cron_jobs: the project DB, or memory if it has no index."""
+    if db and os.path.isfile(db):
+        conn = mc_core.connect(db)
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cron_jobs'").fetchone():
+            return conn
+        conn.close()
+    conn = sqlite3.connect(':memory:')
+    conn.row_factory = sqlite3.Row
+    conn.execute(INDEX_SQL)
+    return conn
+
+
+def refresh(conn):
+    """Replace the index with a fresh `openclaw cron list`; False (index kept) if it cannot be read."""
+    result = openclaw('cron', 'list', '--json')
+    if result.returncode != 0:
+        return False
+    try:
+        jobs = json.loads(result.stdout or '{}').get('jobs', [])
+    except (ValueError, AttributeError):
+        return False
+    conn.execute('BEGIN IMMEDIATE')
+    conn.execute('DELETE FROM cron_jobs')
+    conn.executemany(
+        "INSERT OR REPLACE INTO cron_jobs(name, job_id, enabled, listed_at) VALUES (?, ?, ?, datetime('now'))",
+        [(j['name'], j['id'], int(bool(j.get('enabled', True)))) for j in jobs if j.get('name') and j.get('id')])
+    conn.commit()
+    return True
+
+
+def lookup(conn, sql, params):
+    """Index rows for `sql`, re-listing first when the index is stale or has no match."""
+    fresh = conn.execute("SELECT MAX(listed_at) > datetime('now', ?) FROM cron_jobs",
+                         (f'-{CRON_TTL} seconds',)).fetchone()[0]
+    rows = conn.execute(sql, params).fetchall() if fresh else []
+    if not rows and refresh(conn):
+        rows = conn.execute(sql, params).fetchall()
+    return rows
+
+
+def apply(conn, op, rows, sql, params):
+    """Run `openclaw cron <op> <id>` for rows in parallel; return [(row, ok)] and update the index.
+
+    Ids openclaw rejects are looked up again in a fresh listing and retried
+    once, in case the job was re-created outside MC.
+    """
+    if not rows:
+        return []
+    with ThreadPoolExecutor(min(8, len(rows))) as pool:
+        results = list(zip(rows, pool.map(lambda r: openclaw('cron', op, r['job_id']).returncode == 0, rows)))
+    if not all(ok for _, ok in results) and refresh(conn):
+        current = {r['name']: r for r in conn.execute(sql, params)}
+        for i, (row, ok) in enumerate(results):
+            new = current.get(row['name'])
+            if not ok and new is not None and new['job_id'] != row['job_id']:
+                results[i] = (new, openclaw('cron', op, new['job_id']).returncode == 0)
+    conn.execute('BEGIN IMMEDIATE')
+    conn.executemany(DONE_SQL[op], [(row['name'],) for row, ok in results if ok])
+    conn.commit()
+    return results
+
+# ═══════════════════════════════════════════
+# COMMANDS
+# ═══════════════════════════════════════════
+
+def cmd_guard(conn, ctx, argv):
+    if len(argv) < 2 or argv[0] not in ('disable', 'enable', 'check'):
+        print('Usage: mc cron-guard <disable|enable|check> <agent-name>', file=sys.stderr)
+        return 1
+    op, name = argv[0], argv[1]
+    if op == 'check':
+        # Answer from a fresh listing: the job may have been toggled outside MC
+        refresh(conn)
+    rows = lookup(conn, NAME_SQL, {'name': name})
+    if not rows:
+        print(f"{Y}[CRON_GUARD] No cron job found for '{name}'{N}", file=sys.stderr)
+        return 0  # Best-effort: don't fail
+    if op == 'check':
+        print(f"[CRON_GUARD] {name}: {'enabled' if rows[0]['enabled'] else 'disabled'}")
+        return 0
+    [(_, ok)] = apply(conn, op, rows, NAME_SQL, {'name': name})
+    if ok:
+        print(f'{G}[CRON_GUARD] {name}: cron {op}d{N}')
+    else:
+        print(f'{Y}[CRON_GUARD] {name}: {op} failed (best-effort){N}', file=sys.stderr)
+    return 0
+
+
+def set_mission_crons(conn, ctx, op):
+    """Disable, enable or remove (op 'rm') every cron job of the mission's agents; return [(row, ok)]."""
+    params = {'prefix': f'{ctx.project}-{ctx.mission}-'}
+    return apply(conn, op, lookup(conn, PREFIX_SQL, params), PREFIX_SQL, params)
+
+
+def wake(conn, names):
+    """Enable the jobs of agents `names` that the index has as disabled; return [(row, ok)].
+
+    Only the cached index is read, so agents whose jobs are already enabled
+    (or unknown) cost no openclaw call.
+    """
+    params = {'names': json.dumps(names)}
+    return apply(conn, 'enable', conn.execute(DISABLED_SQL, params).fetchall(), DISABLED_SQL, params)
+
+
+def cmd_mission(conn, ctx, argv):
+    if not argv or argv[0] not in ('disable', 'enable', 'remove'):
+        print('Usage: mc_cron.py mission <disable|enable|remove>', file=sys.stderr)
+        return 1
+    op = 'rm' if argv[0] == 'remove' else argv[0]
+    results = set_mission_crons(conn, ctx, op)
+    for row, ok in results:
+        if op == 'rm':
+            print(f"  Removed cron: {row['name']} ({row['job_id']})" if ok
+                  else f"  {Y}Failed to remove cron: {row['name']}{N}")
+        elif ok:
+            print(f"  {op.capitalize()}d cron: {row['job_id']}")
+    if op == 'rm' and not results:
+        print('  (no matching crons)')
+    return 0
+
+
+def cmd_refresh(conn, ctx, argv):
+    if not refresh(conn):
+        print(f'{Y}Could not read openclaw cron list{N}', file=sys.stderr)
+        return 1
+    print(f"{G}Indexed {conn.execute('SELECT COUNT(*) FROM cron_jobs').fetchone()[0]} cron jobs{N}")
+    return 0
+
+
+COMMANDS = {'guard': cmd_guard, 'mission': cmd_mission, 'refresh': cmd_refresh}
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    project_flag = mission_flag = ''
+    while argv and argv[0] in ('-p', '--project', '-w', '--workspace', '-m', '--mission'):
+        flag, value, argv = argv[0], argv[1] if len(argv) > 1 else '', argv[2:]
+        if flag in ('-m', '--mission'):
+            mission_flag = value
+        else:
+            project_flag = value
+    if not argv or argv[0] not in COMMANDS:
+        print('Usage: mc_cron.py <guard|mission|refresh> [args]', file=sys.stderr)
+        return 1
+
+    ctx = mc_core.Context(project_flag, mission_flag)
+    conn = open_index(ctx.db)
+    try:
+        return COMMANDS[argv[0]](conn, ctx, argv[1:])
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
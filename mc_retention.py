@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+mc_retention — activity rollups, expiry and archival (`mc retention`)
+
+Every run first counts new activity rows of finished hours into
+activity_rollup (hourly and daily counts per mission, agent and action),
+then expires rows older than their action's keep_days, appending them to
+archive/activity-YYYY-MM.jsonl.gz next to the DB before deleting them. Only
+rows already counted can expire, so the rollups stay complete.
+
+Both passes walk an index in batches. A rollup batch is one short write
+transaction. An expiry batch is picked in a read transaction and archived
+before the write lock is taken, only for the DELETE by id, so agents are
+never held off the write lock for long. A run is incremental and safe to
+repeat or interrupt; an interrupted batch may archive a row twice, never
+lose one.
+
+  mc_retention.py [-p PROJECT] run [--batch N] [--no-archive] [--dry-run]
+  mc_retention.py [-p PROJECT] show
+  mc_retention.py [-p PROJECT] set <action|*> <days|forever>
+"""
+
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import mc_core
+from mc_core import B, C, G, N, R, Y
+
+# Rows of the batch after `:through`, stopping before the current hour.
+ROLLUP_SQL = '''
+    INSERT INTO activity_rollup(period, bucket, mission_id, agent, action, n)
+    SELECT p.period,
+           CASE p.period WHEN 'hour' THEN strftime('%Y-%m-%d %H:00', a.created_at) ELSE date(a.created_at) END,
+           COALESCE(a.mission_id, 0), COALESCE(a.agent, ''), a.action, COUNT(*)
+    FROM activity a, (SELECT 'hour' AS period UNION ALL SELECT 'day') p
+    WHERE a.id > :through AND a.id <= :upto
+    GROUP BY 1, 2, 3, 4, 5
+    ON CONFLICT DO UPDATE SET n = n + excluded.n
+'''
+
+# Expired rows after the (created_at, id) cursor, in idx_activity_time order.
+# Rows of actions that are kept longer are passed over inside the index walk.
+EXPIRED_SQL = '''
+    SELECT a.id, a.mission_id, a.agent, a.action, a.target_type, a.target_id, a.detail, a.created_at
+    FROM activity a
+    WHERE a.created_at < datetime('now', :min_age) AND (a.created_at, a.id) > (:at, :id)
+      AND a.id <= :through
+      AND a.created_at < datetime('now', '-' || COALESCE(
+            (SELECT keep_days FROM retention_policy WHERE action = a.action),
+            (SELECT keep_days FROM retention_policy WHERE action = '*')) || ' days')
+    ORDER BY a.created_at, a.id
+    LIMIT :batch
+'''
+
+
+def state(conn, key):
+    return conn.execute('SELECT value FROM retention_state WHERE key = ?', (key,)).fetchone()[0]
+
+
+def hour_start_id(conn):
+    """Id of the first activity row of the current hour; every row before it is in a finished hour."""
+    row = conn.execute(
+        "SELECT id FROM activity WHERE created_at >= strftime('%Y-%m-%d %H:00:00', 'now') "
+        'ORDER BY created_at LIMIT 1').fetchone()
+    return row[0] if row else conn.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM activity').fetchone()[0]
+
+
+def rollup(conn, batch, pause=0.01):
+    """Count activity of finished hours into activity_rollup; return (rows, through)."""
+    total = 0
+    while True:
+        conn.execute('BEGIN IMMEDIATE')
+        through = state(conn, 'rollup_through')
+        limit = hour_start_id(conn)
+        upto, n = conn.execute('''
+            SELECT MAX(id), COUNT(*) FROM (
+                SELECT id FROM activity WHERE id > ? AND id < ? ORDER BY id LIMIT ?)
+        ''', (through, limit, batch)).fetchone()
+        if not n:
+            conn.commit()
+            return total, through
+        conn.execute(ROLLUP_SQL, {'through': through, 'upto': upto})
+        conn.execute("UPDATE retention_state SET value = ? WHERE key = 'rollup_through'", (upto,))
+        conn.commit()
+        total += n
+        time.sleep(pause)
+
+
+def expire(conn, db, batch, archive=True, dry_run=False, pause=0.01):
+    """Delete (and archive) rolled-up activity past its keep_days; return (rows, archive files).
+
+    A dry run counts what a real run would expire, including rows it would roll up first.
+    """
+    min_days = conn.execute('SELECT MIN(keep_days) FROM retention_policy').fetchone()[0]
+    if min_days is None:
+        return 0, set()
+    archive_dir = Path(db).resolve().parent / 'archive'
+    cursor = {'at': '', 'id': 0}
+    total, files = 0, set()
+    while True:
+        # The walk passes over rows that are kept longer; a reader does that
+        # without holding anyone off the write lock
+        conn.execute('BEGIN')
+        through = hour_start_id(conn) - 1 if dry_run else state(conn, 'rollup_through')
+        rows = conn.execute(EXPIRED_SQL, {
+            **cursor, 'min_age': f'-{min_days} days', 'through': through, 'batch': batch,
+        }).fetchall()
+        conn.commit()
+        if not rows:
+            return total, files
+        cursor = {'at': rows[-1]['created_at'], 'id': rows[-1]['id']}
+        if dry_run:
+            total += len(rows)
+            continue
+        if archive:
+            by_file = {}
+            for r in rows:
+                by_file.setdefault(archive_dir / f"activity-{r['created_at'][:7]}.jsonl.gz", []).append(r)
+            archive_dir.mkdir(exist_ok=True)
+            for path, group in by_file.items():
+                # Appending adds a gzip member; zcat and gzip.open read them as one stream
+                with gzip.open(path, 'at', encoding='utf-8') as f:
+                    f.writelines(json.dumps(dict(r), ensure_ascii=False) + '\n' for r in group)
+                files.add(path)
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('DELETE FROM activity WHERE id IN (SELECT value FROM json_each(?))',
+                     (json.dumps([r['id'] for r in rows]),))
+        conn.commit()
+        total += len(rows)
+        time.sleep(pause)
+
+
+# ═══════════════════════════════════════════
+# COMMANDS
+# ═══════════════════════════════════════════
+
+def cmd_run(conn, ctx, argv):
+    batch, archive, dry_run = 500, True, False
+    args = iter(argv)
+    for arg in args:
+        if arg == '--batch':
+            batch = int(next(args, batch))
+        elif arg == '--no-archive':
+            archive = False
+        elif arg == '--dry-run':
+            dry_run = True
+    if not dry_run:
+        counted, through = rollup(conn, batch)
+        print(f'{G}Rolled up {counted} rows{N} (through activity #{through})')
+    expired, files = expire(conn, ctx.db, batch, archive, dry_run)
+    if dry_run:
+        print(f'{Y}Would expire {expired} rows{N} (past keep_days)')
+        return 0
+    print(f'{G}Expired {expired} rows{N}')
+    for path in sorted(files):
+        print(f'  → {path}')
+    return 0
+
+
+def cmd_show(conn, ctx, argv):
+    conn.execute('BEGIN')
+    policies = conn.execute("SELECT action, keep_days FROM retention_policy ORDER BY action = '*', action").fetchall()
+    rows, oldest = conn.execute('SELECT COUNT(*), MIN(created_at) FROM activity').fetchone()
+    through = state(conn, 'rollup_through')
+    daily = conn.execute('''
+        SELECT bucket, action, SUM(n) AS n FROM activity_rollup
+        WHERE period = 'day' AND bucket >= date('now', '-6 days')
+        GROUP BY bucket, action ORDER BY bucket DESC, n DESC
+    ''').fetchall()
+    conn.commit()
+
+    print(f'{B}═══ ACTIVITY RETENTION ═══{N}  project: {C}{ctx.project}{N}')
+    print(f'  rows: {rows}  oldest: {(oldest or "-")[:16]}  rolled up through: #{through}')
+    print()
+    print(f'{B}── keep ──{N}')
+    for p in policies:
+        days = 'forever' if p['keep_days'] is None else f"{p['keep_days']} days"
+        print(f"  {'(default)' if p['action'] == '*' else p['action']}: {days}")
+    if daily:
+        print()
+        print(f'{B}── last 7 days ──{N}')
+        mc_core.print_columns([tuple(r) for r in daily], ['day', 'action', 'n'])
+    return 0
+
+
+def cmd_set(conn, ctx, argv):
+    if len(argv) != 2 or not (argv[1] == 'forever' or argv[1].isdigit()):
+        print('Usage: mc retention set <action|*> <days|forever>', file=sys.stderr)
+        return 1
+    action, days = argv[0], None if argv[1] == 'forever' else int(argv[1])
+    conn.execute('BEGIN IMMEDIATE')
+    conn.execute('INSERT OR REPLACE INTO retention_policy(action, keep_days) VALUES (?, ?)', (action, days))
+    conn.commit()
+    print(f"{G}Keep {'all activity' if action == '*' else action}{N}: {argv[1]}" + (' days' if days is not None else ''))
+    return 0
+
+
+COMMANDS = {'run': cmd_run, 'show': cmd_show, 'set': cmd_set}
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    project_flag = ''
+    while argv and argv[0] in ('-p', '--project', '-w', '--workspace', '-m', '--mission'):
+        if argv[0] not in ('-m', '--mission'):
+            project_flag = argv[1] if len(argv) > 1 else ''
+        argv = argv[2:]
+    if not argv or argv[0] not in COMMANDS:
+        print('Usage: mc retention <run|show|set> [args]', file=sys.stderr)
+        return 1
+
+    ctx = mc_core.Context(project_flag)
+    if not os.path.isfile(ctx.db):
+        print(f'{Y}No database found at {ctx.db}{N}', file=sys.stderr)
+        return 1
+    conn = mc_core.connect(ctx.db)
+    try:
+        return COMMANDS[argv[0]](conn, ctx, argv[1:])
+    except sqlite3.OperationalError as e:
+        if 'no such table' not in str(e):
+            raise
+        print(f'{R}Database schema is out of date ({e}).{N} Run: mc migrate', file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
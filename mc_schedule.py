@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+mc_schedule — assign pending tasks to agents with free capacity (`mc schedule`)
+
+A run matches the mission's claimable pending tasks to its agents in one
+write transaction. Each task scores priority + hours waited / --aging, so a
+low-priority task that has waited long enough overtakes fresh urgent ones
+instead of starving. In score order, a task goes to the eligible agent with
+the lowest load relative to its cap (then the fewest tasks this run, then
+name):
+
+  - the mission's agents are those setup_mission provisioned for it
+    (mission_agents), or every registered agent if there are none;
+    offline agents get nothing
+  - a task tagged role:<role> (`mc add --tag role:backend`) only goes to
+    agents of one of its roles; an untagged task goes to any agent except
+    the supervisors (monitor, brain, escalator)
+  - load is the agent's claimed and in_progress tasks across all missions;
+    the cap is agents.max_tasks (`mc schedule cap`), else --cap
+
+Assignments are claims (status claimed) and are recorded with their score
+and reason in schedule_decisions, shown by `mc schedule show`.
+
+  mc_schedule.py [-p PROJECT] [-m MISSION] run [--dry-run] [--cap N] [--window N] [--aging HOURS]
+  mc_schedule.py [-p PROJECT] [-m MISSION] show [--limit N] [--after <id>]
+  mc_schedule.py [-p PROJECT] cap <agent> <n|default>
+"""
+
+import json
+import os
+import sqlite3
+import sys
+
+import mc_core
+from mc_core import B, C, G, N, R, Y
+
+SUPERVISOR_ROLES = ('monitor', 'brain', 'escalator')
+
+# Up to :window of the oldest claimable tasks of each priority present. The
+# levels are found by MAX(priority) seeks into idx_tasks_ready and each
+# level is one range of it in id order, so a run reads O(levels × window)
+# rows however many tasks are pending or waiting.
+CANDIDATES_SQL = f'''
+    WITH RECURSIVE levels(p) AS (
+        SELECT MAX(priority) FROM tasks WHERE mission_id = :mid AND status = 'pending' AND {mc_core.READY}
+        UNION ALL
+        SELECT (SELECT MAX(priority) FROM tasks
+                WHERE mission_id = :mid AND status = 'pending' AND {mc_core.READY} AND priority < p)
+        FROM levels WHERE p IS NOT NULL
+    )
+    SELECT id, subject, priority, tags,
+           (julianday('now') - julianday(created_at)) * 24 AS waited
+    FROM tasks WHERE id IN (
+        SELECT t.id FROM levels, tasks t
+        WHERE t.id IN (
+            SELECT id FROM tasks
+            WHERE mission_id = :mid AND status = 'pending' AND priority = levels.p AND {mc_core.CLAIMABLE}
+            ORDER BY id LIMIT :window)
+    )
+'''
+
+AGENTS_SQL = '''
+    SELECT a.name, COALESCE(ma.role, a.role, '') AS role, a.max_tasks,
+           (SELECT COUNT(*) FROM tasks WHERE owner = a.name AND status = 'claimed')
+           + (SELECT COUNT(*) FROM tasks WHERE owner = a.name AND status = 'in_progress') AS load
+    FROM agents a LEFT JOIN mission_agents ma ON ma.mission_id = :mid AND ma.agent_id = a.name
+    WHERE COALESCE(a.status, 'idle') != 'offline'
+      AND (ma.agent_id IS NOT NULL OR NOT EXISTS (SELECT 1 FROM mission_agents WHERE mission_id = :mid))
+    ORDER BY a.name
+'''
+
+DECISION_SQL = '''
+    INSERT INTO schedule_decisions(mission_id, task_id, agent, score, reason) VALUES (?, ?, ?, ?, ?)
+'''
+
+
+def task_roles(tags):
+    """Roles named by role:<role> tags of a tasks.tags value."""
+    try:
+        tags = json.loads(tags or '[]')
+    except ValueError:
+        return []
+    return [t[5:] for t in tags if isinstance(t, str) and t.startswith('role:')] if isinstance(tags, list) else []
+
+
+def plan(conn, mid, cap=1, window=200, aging=24.0):
+    """Decide assignments for mission `mid` without writing; return (assignments, skipped).
+
+    assignments are dicts (task_id, subject, priority, agent, score,
+    reason) in the order decided; skipped maps a reason to the number of
+    tasks it held back.
+    """
+    agents = [dict(r, cap=cap if r['max_tasks'] is None else r['max_tasks'], given=0)
+              for r in conn.execute(AGENTS_SQL, {'mid': mid})]
+    tasks = [dict(r, roles=task_roles(r['tags']), score=r['priority'] + max(r['waited'], 0) / aging)
+             for r in conn.execute(CANDIDATES_SQL, {'mid': mid, 'agent': '', 'window': window})]
+    tasks.sort(key=lambda t: (-t['score'], t['id']))
+    assignments, skipped = [], {}
+    for task in tasks:
+        if not any(a['load'] < a['cap'] for a in agents):
+            skipped['no agent has capacity left'] = skipped.get('no agent has capacity left', 0) + 1
+            continue
+        if task['roles']:
+            fits = [a for a in agents if a['role'] in task['roles']]
+            wanted = f"role {'/'.join(task['roles'])}"
+        else:
+            fits = [a for a in agents if a['role'] not in SUPERVISOR_ROLES]
+            wanted = 'a worker'
+        free = [a for a in fits if a['load'] < a['cap']]
+        if not free:
+            reason = f'no agent with {wanted}' if not fits else f'every agent with {wanted} is at capacity'
+            skipped[reason] = skipped.get(reason, 0) + 1
+            continue
+        agent = min(free, key=lambda a: (a['load'] / a['cap'], a['given'], a['name']))
+        reason = (f"priority {task['priority']}, waited {max(task['waited'], 0):.1f}h"
+                  + (f", role {agent['role']}" if task['roles'] else '')
+                  + f", load {agent['load']}/{agent['cap']}")
+        agent['load'] += 1
+        agent['given'] += 1
+        assignments.append({'task_id': task['id'], 'subject': task['subject'], 'priority': task['priority'],
+                            'agent': agent['name'], 'score': round(task['score'], 3), 'reason': reason})
+    return assignments, skipped
+
+
+def run(conn, mid, actor, cap=1, window=200, aging=24.0, dry_run=False):
+    """Plan and (unless `dry_run`) apply assignments in one transaction; return plan()'s result.
+
+    Each assignment is a conditional claim (CLAIM_SQL), so only those that
+    took effect are returned; with the write lock held from the first read,
+    that is all of them.
+    """
+    conn.execute('BEGIN' if dry_run else 'BEGIN IMMEDIATE')
+    assignments, skipped = plan(conn, mid, cap, window, aging)
+    if dry_run:
+        conn.rollback()
+        return assignments, skipped
+    applied, lease = [], mc_core.lease()
+    for a in assignments:
+        if mc_core.first(conn.execute(mc_core.CLAIM_SQL, {
+                'id': a['task_id'], 'mid': mid, 'agent': a['agent'], 'status': 'claimed', 'lease': lease})) is None:
+            continue
+        conn.execute(DECISION_SQL, (mid, a['task_id'], a['agent'], a['score'], a['reason']))
+        mc_core.log_activity(conn, mid, actor, 'task_assigned', 'task', a['task_id'], f"→ {a['agent']}")
+        applied.append(a)
+    conn.commit()
+    return applied, skipped
+
+# ═══════════════════════════════════════════
+# COMMANDS
+# ═══════════════════════════════════════════
+
+def cmd_run(conn, ctx, argv):
+    cap, window, aging, dry_run = 1, 200, 24.0, False
+    args = iter(argv)
+    for arg in args:
+        if arg == '--cap':
+            cap = int(next(args, cap))
+        elif arg == '--window':
+            window = int(next(args, window))
+        elif arg == '--aging':
+            aging = float(next(args, aging))
+        elif arg == '--dry-run':
+            dry_run = True
+    if cap < 1 or window < 1 or aging <= 0:
+        print('--cap and --window must be at least 1, --aging above 0', file=sys.stderr)
+        return 1
+    mid = mc_core.writable_mission_id(conn, ctx.mission)
+    mc_core.upkeep_mission(conn, ctx)
+    assignments, skipped = run(conn, mid, ctx.agent, cap, window, aging, dry_run)
+
+    print(f'{B}═══ SCHEDULE ═══{N}  mission: {C}{ctx.mission}{N}' + (f'  {Y}(dry run){N}' if dry_run else ''))
+    for a in assignments:
+        print(f"  #{a['task_id']} {a['subject']} → {C}{a['agent']}{N}  score {a['score']:.2f} ({a['reason']})")
+    verb = 'Would assign' if dry_run else 'Assigned'
+    print(f'{G}{verb} {len(assignments)} tasks{N}')
+    for reason, n in sorted(skipped.items(), key=lambda kv: (-kv[1], kv[0])):
+        print(f'  {Y}{n} left pending:{N} {reason}')
+    return 0
+
+
+def cmd_show(conn, ctx, argv):
+    after, limit = mc_core.MAX_ROWID, 20
+    args = iter(argv)
+    for arg in args:
+        if arg == '--after':
+            after = int(next(args, after))
+        elif arg == '--limit':
+            limit = int(next(args, limit))
+    conn.execute('BEGIN')
+    mid = mc_core.mission_row(conn, ctx.mission)['id']
+    rows = conn.execute('''
+        SELECT d.id, substr(d.created_at, 1, 16) AS at, '#' || d.task_id AS task, t.subject, d.agent,
+               printf('%.2f', d.score) AS score, d.reason
+        FROM schedule_decisions d LEFT JOIN tasks t ON t.id = d.task_id
+        WHERE d.mission_id = ? AND d.id < ? ORDER BY d.id DESC LIMIT ?
+    ''', (mid, after, limit + 1)).fetchall()
+    conn.commit()
+    print(f'{B}═══ SCHEDULE DECISIONS ═══{N}  mission: {C}{ctx.mission}{N}')
+    mc_core.print_columns([tuple(r)[1:] for r in rows[:limit]], ['at', 'task', 'subject', 'agent', 'score', 'reason'])
+    if len(rows) > limit:
+        mc_core.page_footer('schedule show', argv, rows[limit - 1]['id'])
+    return 0
+
+
+def cmd_cap(conn, ctx, argv):
+    if len(argv) != 2 or not (argv[1] == 'default' or argv[1].isdigit() and int(argv[1]) > 0):
+        print('Usage: mc schedule cap <agent> <n|default>', file=sys.stderr)
+        return 1
+    agent, cap = argv[0], None if argv[1] == 'default' else int(argv[1])
+    conn.execute('BEGIN IMMEDIATE')
+    if mc_core.first(conn.execute('UPDATE agents SET max_tasks = ? WHERE name = ? RETURNING name',
+                                  (cap, agent))) is None:
+        conn.rollback()
+        print(f'{R}Unknown agent: {agent}{N} (mc register {agent})', file=sys.stderr)
+        return 1
+    conn.commit()
+    print(f"{G}{agent}{N}: " + (f'at most {cap} open tasks' if cap else 'default cap (--cap)'))
+    return 0
+
+
+COMMANDS = {'run': cmd_run, 'show': cmd_show, 'cap': cmd_cap}
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    project_flag = mission_flag = ''
+    while argv and argv[0] in ('-p', '--project', '-w', '--workspace', '-m', '--mission'):
+        flag, value, argv = argv[0], argv[1] if len(argv) > 1 else '', argv[2:]
+        if flag in ('-m', '--mission'):
+            mission_flag = value
+        else:
+            project_flag = value
+    if not argv or argv[0] not in COMMANDS:
+        print('Usage: mc schedule <run|show|cap> [args]', file=sys.stderr)
+        return 1
+
+    ctx = mc_core.Context(project_flag, mission_flag)
+    if not os.path.isfile(ctx.db):
+        print(f'{Y}No database found at {ctx.db}{N}', file=sys.stderr)
+        return 1
+    conn = mc_core.connect(ctx.db)
+    try:
+        return COMMANDS[argv[0]](conn, ctx, argv[1:])
+    except mc_core.MissionError as e:
+        print(f'{R}{e}{N}', file=sys.stderr)
+        return 1
+    except sqlite3.OperationalError as e:
+        if 'no such table' not in str(e) and 'no such column' not in str(e):
+            raise
+        print(f'{R}Database schema is out of date ({e}).{N} Run: mc migrate', file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
 """Mission Control Mobile Server v0.3 — Token auth + SSE + Project/Mission support"""
 import os
+import re
+import html
 import sys
 import json
 import time
+import queue
+import bisect
 import secrets
 import sqlite3
 import argparse
-from flask import Flask, jsonify, request, Response, send_from_directory
+import threading
+from collections import OrderedDict
+from flask import Flask, g, jsonify, request, Response, send_from_directory
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import mc_core
 
 # ═══════════════════════════════════════════
 # CLI ARGS
@@ -25,6 +34,24 @@ parser.add_argument('--port', '-p', type=int, default=3737,
 parser.add_argument('--db',
     default=os.environ.get('MC_DB', ''),
     help='Direct DB path (overrides project resolution)')
+parser.add_argument('--watch-interval', type=float, default=0.5,
+    help='Seconds between change checks of the shared watcher (default: 0.5)')
+parser.add_argument('--pool-size', type=int, default=16,
+    help='Idle SQLite connections kept open per project (default: 16)')
+parser.add_argument('--max-projects', type=int, default=8,
+    help='Project DBs kept open at once; least recently used are closed (default: 8)')
+parser.add_argument('--token', default=os.environ.get('MC_SERVER_TOKEN', ''),
+    help='Access token (default: $MC_SERVER_TOKEN, else a new random one per start)')
+parser.add_argument('--slow-query-ms', type=float, default=0,
+    help='Log statements slower than this many ms to stderr (default: 0, off)')
+parser.add_argument('--metrics-ttl', type=float, default=10,
+    help='Seconds the mission gauges on /metrics are cached (default: 10)')
+parser.add_argument('--stale-after', type=int, default=900,
+    help='Seconds since last_seen before /metrics counts an agent as stale (default: 900)')
+parser.add_argument('--heartbeat-interval', type=int, default=mc_core.HEARTBEAT_INTERVAL,
+    help='Seconds within which /api/checkin does not rewrite an unchanged heartbeat (default: 60)')
+parser.add_argument('--asgi', action='store_true',
+    help='Serve with uvicorn; SSE/WebSocket streams run as coroutines (needs: pip install uvicorn a2wsgi)')
 args = parser.parse_args()
 
 # ═══════════════════════════════════════════
@@ -32,14 +59,16 @@ args = parser.parse_args()
 # ═══════════════════════════════════════════
 
 app = Flask(__name__)
-TOKEN = secrets.token_urlsafe(16)
+app.json.sort_keys = False
+TOKEN = args.token or secrets.token_urlsafe(16)
+PROJECTS_DIR = os.path.expanduser('~/.openclaw/projects')
 
 if args.db:
     DB = args.db
     PROJECT = '(custom)'
 else:
     PROJECT = args.project
-    DB = os.path.expanduser(f'~/.openclaw/projects/{PROJECT}/mission-control.db')
+    DB = os.path.join(PROJECTS_DIR, PROJECT, 'mission-control.db')
 
 MISSION_NAME = args.mission
 
@@ -48,39 +77,665 @@ if not os.path.exists(DB):
     print(f"Run: mc init -p {PROJECT}", file=sys.stderr)
     sys.exit(1)
 
+def schema_current(path):
+    """True if the DB is at mc's schema version; the queries here need its columns."""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('PRAGMA user_version').fetchone()[0] >= mc_core.SCHEMA_VERSION
+    finally:
+        conn.close()
+
+if not schema_current(DB):
+    print(f"Error: Database schema is out of date: {DB}", file=sys.stderr)
+    print("Run: mc migrate", file=sys.stderr)
+    sys.exit(1)
+
+# ═══════════════════════════════════════════
+# METRICS (GET /metrics, Prometheus text format)
+# ═══════════════════════════════════════════
+
+class Metrics:
+    """Counters and histograms kept in process, rendered for /metrics.
+
+    Labels are tuples of (name, value) pairs. Histogram buckets are stored
+    per bucket and made cumulative when rendered.
+    """
+
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.meta = {}        # name -> (type, help)
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [per-bucket counts..., +Inf count, sum]
+
+    def describe(self, name, kind, text):
+        self.meta[name] = (kind, text)
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            self.counters[name, labels] = self.counters.get((name, labels), 0) + value
+
+    def observe(self, name, labels, seconds):
+        i = bisect.bisect_left(self.BUCKETS, seconds)
+        with self.lock:
+            h = self.histograms.get((name, labels))
+            if h is None:
+                h = self.histograms[name, labels] = [0] * (len(self.BUCKETS) + 2)
+            h[i] += 1
+            h[-1] += seconds
+
+    @staticmethod
+    def _labels(labels):
+        if not labels:
+            return ''
+        text = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                        for k, v in labels)
+        return '{' + text + '}'
+
+    def render(self, gauges=()):
+        """Exposition text for everything recorded, plus `gauges`: (name, labels, value) tuples."""
+        samples = {}
+        with self.lock:
+            for (name, labels), value in self.counters.items():
+                samples.setdefault(name, []).append(f'{name}{self._labels(labels)} {round(value, 6)}')
+            for (name, labels), h in self.histograms.items():
+                lines = samples.setdefault(name, [])
+                total = 0
+                for le, n in zip((*self.BUCKETS, '+Inf'), h[:-1]):
+                    total += n
+                    lines.append(f'{name}_bucket{self._labels(labels + (("le", le),))} {total}')
+                lines.append(f'{name}_sum{self._labels(labels)} {h[-1]:.6f}')
+                lines.append(f'{name}_count{self._labels(labels)} {total}')
+        for name, labels, value in gauges:
+            samples.setdefault(name, []).append(f'{name}{self._labels(labels)} {value}')
+        out = []
+        for name, (kind, text) in self.meta.items():
+            if kind != 'histogram' and name not in samples:
+                continue
+            out += [f'# HELP {name} {text}', f'# TYPE {name} {kind}', *samples.get(name, [])]
+        return '\n'.join(out) + '\n'
+
+
+METRICS = Metrics()
+for _name, _kind, _text in (
+    ('mc_http_requests_total', 'counter', 'HTTP requests by route, method and status.'),
+    ('mc_http_request_duration_seconds', 'histogram',
+     'Time to build the response by route (for streams: until the stream opens).'),
+    ('mc_db_query_duration_seconds', 'histogram', 'SQLite statement time by route, including busy waits.'),
+    ('mc_db_busy_retries_total', 'counter', 'Statements retried because another connection held the write lock.'),
+    ('mc_db_busy_wait_seconds_total', 'counter', 'Time spent waiting for the write lock.'),
+    ('mc_db_slow_queries_total', 'counter', 'Statements slower than --slow-query-ms.'),
+    ('mc_sse_subscribers', 'gauge', 'Open /heartbeat and /ws streams per project.'),
+    ('mc_watcher_polls_total', 'counter', 'data_version checks by the change watcher.'),
+    ('mc_watcher_diffs_total', 'counter', 'Changelog reads after the watcher saw a commit.'),
+    ('mc_pool_idle_connections', 'gauge', 'Idle pooled SQLite connections per project.'),
+    ('mc_tasks', 'gauge', 'Tasks by mission and status (active and paused missions).'),
+    ('mc_unread_messages', 'gauge', 'Unread direct messages by mission and recipient.'),
+    ('mc_agent_seen_age_seconds', 'gauge', 'Seconds since each agent last checked in.'),
+    ('mc_agents_stale', 'gauge', 'Agents not seen for --stale-after seconds.'),
+    ('mc_mission_gauges_age_seconds', 'gauge', 'Age of the cached mission gauges.'),
+):
+    METRICS.describe(_name, _kind, _text)
+
+# Same waits SQLite's own busy handler uses, in seconds; the last one repeats
+BUSY_BACKOFF = (0.001, 0.002, 0.005, 0.01, 0.015, 0.02, 0.025, 0.025, 0.025, 0.05, 0.05, 0.1)
+BUSY_TIMEOUT = 5.0
+
+def is_busy(e):
+    """True for a lock that waiting can resolve (not a stale WAL snapshot)."""
+    name = getattr(e, 'sqlite_errorname', None)
+    if name:
+        return name in ('SQLITE_BUSY', 'SQLITE_BUSY_RECOVERY')
+    return 'database is locked' in str(e)
+
+ROUTE_SCOPE_RE = re.compile(r'/p/<project>/m/<mission>')
+
+def current_route():
+    """Route label: the URL rule without the project/mission scope."""
+    rule = request.url_rule
+    return ROUTE_SCOPE_RE.sub('', rule.rule) if rule is not None else '(unmatched)'
+
+@app.before_request
+def start_timer():
+    g.started = time.perf_counter()
+    g.route = current_route()
+
+@app.after_request
+def record_request(response):
+    route = g.get('route') or current_route()
+    METRICS.inc('mc_http_requests_total',
+                (('route', route), ('method', request.method), ('status', response.status_code)))
+    if 'started' in g:
+        METRICS.observe('mc_http_request_duration_seconds', (('route', route),),
+                        time.perf_counter() - g.started)
+    return response
+
 # ═══════════════════════════════════════════
 # HELPERS
 # ═══════════════════════════════════════════
 
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections.
+
+    Each connection is configured once (WAL, synchronous=NORMAL, mmap,
+    page cache) and keeps sqlite3's prepared-statement cache warm across
+    requests. Werkzeug starts a thread per request, so connections are
+    pooled rather than thread-local. busy_timeout is 0: PooledConnection
+    waits for the write lock itself, so the waits show up in /metrics.
+    """
+
+    PRAGMAS = (
+        "PRAGMA busy_timeout=0",
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-16000",
+        "PRAGMA temp_store=MEMORY",
+    )
+
+    def __init__(self, db_path, size=16):
+        self.db_path = db_path
+        self.idle = queue.LifoQueue(maxsize=size)
+        self.closed = False
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=0, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def release(self, conn):
+        if self.closed:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        """Close idle connections; ones still checked out close on release."""
+        self.closed = True
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class Rows(list):
+    """All rows of one statement, with the cursor methods the routes use."""
+
+    def fetchone(self):
+        return self[0] if self else None
+
+    def fetchall(self):
+        return self
+
+
+class PooledConnection:
+    """sqlite3.Connection stand-in whose close() returns it to the pool.
+
+    execute() runs the statement to completion, so its time (recorded per
+    route, and logged past --slow-query-ms) covers fetching the rows too.
+    While another connection holds the write lock it retries with SQLite's
+    own backoff, for up to BUSY_TIMEOUT seconds as busy_timeout did.
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = pool.acquire()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def execute(self, sql, params=()):
+        started = time.perf_counter()
+        route = g.get('route', '(none)')
+        retries = 0
+        while True:
+            try:
+                rows = Rows(self._conn.execute(sql, params).fetchall())
+                break
+            except sqlite3.OperationalError as e:
+                delay = BUSY_BACKOFF[min(retries, len(BUSY_BACKOFF) - 1)]
+                if not is_busy(e) or time.perf_counter() - started + delay > BUSY_TIMEOUT:
+                    raise
+                retries += 1
+                METRICS.inc('mc_db_busy_retries_total', (('route', route),))
+                METRICS.inc('mc_db_busy_wait_seconds_total', (), delay)
+                time.sleep(delay)
+        elapsed = time.perf_counter() - started
+        METRICS.observe('mc_db_query_duration_seconds', (('route', route),), elapsed)
+        if args.slow_query_ms and elapsed * 1000 >= args.slow_query_ms:
+            METRICS.inc('mc_db_slow_queries_total', (('route', route),))
+            print(f"[slow-query] {elapsed * 1000:.1f} ms {route} retries={retries} "
+                  f"{' '.join(sql.split())} {params!r}", file=sys.stderr)
+        return rows
+
+    def close(self):
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+
+class MissionCache:
+    """Mission name -> id, cleared by the change watcher when missions change."""
+
+    def __init__(self):
+        self.ids = {}
+
+    def resolve(self, conn, name):
+        mid = self.ids.get(name)
+        if mid is None:
+            row = conn.execute(
+                "SELECT id FROM missions WHERE name=?", (name,)
+            ).fetchone()
+            if not row:
+                return None
+            mid = self.ids[name] = row['id']
+        return mid
+
+    def invalidate(self):
+        self.ids = {}
+
+
 def get_db():
-    conn = sqlite3.connect(DB)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA busy_timeout=5000")
+    conn = PooledConnection(g.handle.pool)
+    g.setdefault('db_conns', []).append(conn)
     return conn
 
+@app.teardown_request
+def release_db(exc):
+    # Routes close their connection; this catches ones left open by an error
+    for conn in g.pop('db_conns', []):
+        conn.close()
+
 def row_to_dict(row):
     return dict(row) if row else None
 
 def get_mission_id(conn):
-    row = conn.execute(
-        "SELECT id FROM missions WHERE name=?", (MISSION_NAME,)
-    ).fetchone()
-    if not row:
-        return None
-    return row['id']
+    return g.handle.missions.resolve(conn, g.mission)
 
 # ═══════════════════════════════════════════
-# AUTH
+# CHANGE WATCHER (one per server, shared by all SSE clients)
 # ═══════════════════════════════════════════
 
+class ChangeWatcher(threading.Thread):
+    """Poll `PRAGMA data_version` on one connection and fan out typed
+    delta events to every subscriber queue.
+
+    data_version only moves when another connection commits, so an idle DB
+    costs one pragma per interval no matter how many clients are connected.
+    After a commit, the changelog (seq > last seen) names exactly which rows
+    changed; activity is append-only and read by id.
+
+    The watcher also activates scheduled tasks (mc_core.activate_due) as
+    they come due and reclaims claims whose lease expired
+    (mc_core.reclaim_expired): it keeps the earliest of the active missions'
+    waiting scheduled_at and lease_expires_at, re-read after each commit,
+    and when the clock passes it the resulting changes go out as events on
+    the same poll.
+    """
+
+    QUEUE_SIZE = 256
+
+    def __init__(self, db_path, interval=0.5, missions=None):
+        super().__init__(daemon=True, name=f'mc-watcher:{db_path}')
+        self.db_path = db_path
+        self.interval = interval
+        self.missions = missions
+        self.stopped = threading.Event()
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.conn = None
+        self.data_version = None
+        self.tasks = {}        # id -> status
+        self.agents = {}       # name -> status
+        self.last_seq = 0
+        self.last_activity_id = 0
+        self.next_due = None   # earliest waiting scheduled_at or lease expiry (UTC text, as stored)
+        self.polls = 0         # data_version checks
+        self.diffs = 0         # changelog reads after a commit was seen
+
+    def subscribe(self, mission_id, q=None):
+        """Register `q` (a new thread Queue by default) for one mission's events."""
+        if q is None:
+            q = queue.Queue(maxsize=self.QUEUE_SIZE)
+        q.mission_id = mission_id
+        with self.lock:
+            self.subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            self.subscribers.discard(q)
+
+    def subscriber_count(self):
+        with self.lock:
+            return len(self.subscribers)
+
+    def stop(self):
+        self.stopped.set()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _snapshot(self):
+        """Load baseline state so old_status is known for the first change."""
+        c = self.conn
+        self.tasks = {r['id']: r['status'] for r in c.execute('SELECT id, status FROM tasks')}
+        self.agents = {r['name']: r['status'] for r in c.execute('SELECT name, status FROM agents')}
+        self.last_seq = c.execute('SELECT COALESCE(MAX(seq), 0) FROM changelog').fetchone()[0]
+        self.last_activity_id = c.execute('SELECT COALESCE(MAX(id), 0) FROM activity').fetchone()[0]
+
+    def _next_due(self):
+        return min((t for r in self.conn.execute(mc_core.NEXT_DUE_SQL) for t in (r['due'], r['expires']) if t),
+                   default=None)
+
+    def _upkeep(self, now):
+        """Activate the due tasks of every active mission (waking their owners) and reclaim expired leases."""
+        due = []
+        for r in self.conn.execute(mc_core.NEXT_DUE_SQL).fetchall():
+            if r['due'] and r['due'] <= now:
+                due += mc_core.activate_due(self.conn, r['id'], 'mc-server')
+            if r['expires'] and r['expires'] <= now:
+                mc_core.reclaim_expired(self.conn, r['id'], 'mc-server')
+        mc_core.wake_owners(self.db_path, due)
+
+    def _diff(self):
+        """Return delta events for everything committed since the last diff."""
+        c = self.conn
+        events = []
+
+        changes = c.execute('''
+            SELECT seq, tbl, row_key, mission_id, op FROM changelog
+            WHERE seq > ? ORDER BY seq
+        ''', (self.last_seq,)).fetchall()
+        for ch in changes:
+            self.last_seq = ch['seq']
+            deleted = ch['op'] == 'delete'
+            if ch['tbl'] == 'tasks':
+                tid = int(ch['row_key'])
+                row = None if deleted else c.execute(
+                    'SELECT status, owner FROM tasks WHERE id = ?', (tid,)).fetchone()
+                old_status = self.tasks.pop(tid, None)
+                if row:
+                    self.tasks[tid] = row['status']
+                events.append({
+                    'type': 'task', 'seq': ch['seq'], 'id': tid, 'mission_id': ch['mission_id'],
+                    'old_status': old_status, 'new_status': row['status'] if row else None,
+                    'owner': row['owner'] if row else None,
+                })
+            elif ch['tbl'] == 'agents':
+                name = ch['row_key']
+                row = None if deleted else c.execute(
+                    'SELECT status, last_seen FROM agents WHERE name = ?', (name,)).fetchone()
+                old_status = self.agents.pop(name, None)
+                if row:
+                    self.agents[name] = row['status']
+                events.append({
+                    'type': 'agent', 'seq': ch['seq'], 'name': name,
+                    'old_status': old_status, 'new_status': row['status'] if row else None,
+                    'last_seen': row['last_seen'] if row else None,
+                })
+            elif ch['tbl'] == 'messages':
+                row = None if deleted else c.execute('''
+                    SELECT from_agent, to_agent, task_id, msg_type, read_at
+                    FROM messages WHERE id = ?
+                ''', (int(ch['row_key']),)).fetchone()
+                event = {'type': 'message', 'seq': ch['seq'], 'id': int(ch['row_key']),
+                         'mission_id': ch['mission_id'], 'deleted': deleted}
+                if row:
+                    event.update(dict(row))
+                events.append(event)
+            elif ch['tbl'] == 'missions':
+                if self.missions is not None:
+                    self.missions.invalidate()
+                row = c.execute('SELECT status FROM missions WHERE id = ?',
+                                (int(ch['row_key']),)).fetchone()
+                events.append({'type': 'mission', 'seq': ch['seq'], 'mission_id': ch['mission_id'],
+                               'status': row['status'] if row else None})
+
+        for r in c.execute('''
+            SELECT id, mission_id, agent, action, target_type, target_id
+            FROM activity WHERE id > ? ORDER BY id
+        ''', (self.last_activity_id,)):
+            self.last_activity_id = r['id']
+            events.append(dict(r, type='activity'))
+
+        return events
+
+    def publish(self, events):
+        """Queue events for each subscriber of the matching mission."""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for q in subscribers:
+            mine = [e for e in events
+                    if e['type'] in ('agent', 'resync')
+                    or e.get('mission_id') in (q.mission_id, None)]
+            if not mine:
+                continue
+            try:
+                q.put_nowait(mine)
+            except queue.Full:
+                # Slow consumer: drop its backlog and make it reload the board
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait([{'type': 'resync'}])
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                if self.conn is None:
+                    self.conn = self._connect()
+                    self.data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+                    self._snapshot()
+                    self.next_due = self._next_due()
+                version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+                self.polls += 1
+                changed = version != self.data_version
+                if changed:
+                    self.data_version = version
+                    self.next_due = self._next_due()
+                now = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+                if self.next_due is not None and self.next_due <= now:
+                    # Our own commits do not move data_version; diff them now
+                    self._upkeep(now)
+                    self.next_due = self._next_due()
+                    changed = True
+                if changed:
+                    self.diffs += 1
+                    events = self._diff()
+                    if events:
+                        self.publish(events)
+            except sqlite3.Error as e:
+                print(f"[watcher] {e}", file=sys.stderr)
+                if self.conn is not None:
+                    self.conn.close()
+                    self.conn = None
+                self.publish([{'type': 'resync'}])
+                self.stopped.wait(5)
+                continue
+            self.stopped.wait(self.interval)
+        if self.conn is not None:
+            self.conn.close()
+
+# ═══════════════════════════════════════════
+# PROJECTS (one handle per DB file, LRU-evicted)
+# ═══════════════════════════════════════════
+
+# Everything the mission gauges on /metrics need, in one statement: task
+# counts and unread messages of open missions, and each agent's last_seen age.
+MISSION_GAUGES_SQL = '''
+    SELECT 'tasks' AS kind, m.name AS mission, t.status AS key, COUNT(*) AS n
+    FROM missions m JOIN tasks t ON t.mission_id = m.id
+    WHERE m.status IN ('active', 'paused')
+    GROUP BY m.id, t.status
+    UNION ALL
+    SELECT 'unread', m.name, u.to_agent, u.n
+    FROM (SELECT mission_id, to_agent, COUNT(*) AS n FROM messages
+          WHERE read_at IS NULL AND to_agent IS NOT NULL
+          GROUP BY to_agent, mission_id) u
+    JOIN missions m ON m.id = u.mission_id
+    WHERE m.status IN ('active', 'paused')
+    UNION ALL
+    SELECT 'seen', NULL, name, CAST(strftime('%s', 'now') - strftime('%s', last_seen) AS INTEGER)
+    FROM agents
+'''
+
+class ProjectDB:
+    """Per-DB-file state: connection pool, mission id cache and change watcher."""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.pool = ConnectionPool(path, size=args.pool_size)
+        self.missions = MissionCache()
+        self.watcher = ChangeWatcher(path, interval=args.watch_interval, missions=self.missions)
+        self.watcher.start()
+        self.gauge_lock = threading.Lock()
+        self.gauges = []
+        self.gauges_at = None
+
+    def mission_gauges(self):
+        """Mission gauges for /metrics, recomputed at most every --metrics-ttl seconds."""
+        with self.gauge_lock:
+            if self.gauges_at is None or time.monotonic() - self.gauges_at >= args.metrics_ttl:
+                conn = PooledConnection(self.pool)
+                try:
+                    rows = conn.execute(MISSION_GAUGES_SQL)
+                finally:
+                    conn.close()
+                project = ('project', self.name)
+                gauges, stale = [], 0
+                for r in rows:
+                    if r['kind'] == 'tasks':
+                        gauges.append(('mc_tasks', (project, ('mission', r['mission']), ('status', r['key'])), r['n']))
+                    elif r['kind'] == 'unread':
+                        gauges.append(('mc_unread_messages', (project, ('mission', r['mission']), ('agent', r['key'])), r['n']))
+                    else:
+                        if r['n'] is not None:
+                            gauges.append(('mc_agent_seen_age_seconds', (project, ('agent', r['key'])), r['n']))
+                        stale += r['n'] is None or r['n'] >= args.stale_after
+                gauges.append(('mc_agents_stale', (project,), stale))
+                self.gauges, self.gauges_at = gauges, time.monotonic()
+            return self.gauges + [('mc_mission_gauges_age_seconds', (('project', self.name),),
+                                   round(time.monotonic() - self.gauges_at, 3))]
+
+    def close(self):
+        self.watcher.stop()
+        self.pool.close()
+
+
+class ProjectRegistry:
+    """Project handles opened on first use and kept in LRU order.
+
+    Past `limit`, the least recently used handle is closed unless it still
+    has SSE subscribers. Handles are keyed by DB file, so every client of a
+    project shares one pool and one watcher.
+    """
+
+    NAME_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.handles = OrderedDict()   # realpath -> ProjectDB
+        self.lock = threading.Lock()
+
+    def path_for(self, name):
+        if name == PROJECT:
+            return DB
+        if not self.NAME_RE.match(name):
+            return None
+        return os.path.join(PROJECTS_DIR, name, 'mission-control.db')
+
+    def get(self, name):
+        path = self.path_for(name)
+        if path is None or not os.path.exists(path):
+            raise LookupError(f'Project "{name}" not found')
+        key = os.path.realpath(path)
+        with self.lock:
+            handle = self.handles.get(key)
+            if handle is not None:
+                self.handles.move_to_end(key)
+                return handle
+            if not schema_current(path):
+                raise RuntimeError(f'Project "{name}" schema is out of date — run: mc migrate')
+            handle = self.handles[key] = ProjectDB(name, path)
+            self._evict()
+            return handle
+
+    def _evict(self):
+        for key in list(self.handles):
+            if len(self.handles) <= self.limit:
+                return
+            handle = self.handles[key]
+            if handle.watcher.subscriber_count():
+                continue
+            del self.handles[key]
+            handle.close()
+
+    def __len__(self):
+        return len(self.handles)
+
+
+projects = ProjectRegistry(args.max_projects)
+
+# ═══════════════════════════════════════════
+# AUTH + SCOPE
+# ═══════════════════════════════════════════
+
+@app.url_value_preprocessor
+def pop_scope(endpoint, values):
+    values = values if values is not None else {}
+    g.project = values.pop('project', None) or PROJECT
+    g.mission = values.pop('mission', None) or MISSION_NAME
+
 @app.before_request
 def check_token():
     if request.path == '/' or request.path.endswith('.html'):
         return
-    if request.path.startswith('/api'):
+    if request.path.startswith('/api') or request.path == '/metrics':
         if request.args.get('token') != TOKEN:
             return jsonify({'error': 'unauthorized'}), 401
 
+@app.before_request
+def open_project():
+    if request.routing_exception is not None or request.endpoint == 'list_projects':
+        return
+    if not request.path.startswith('/api'):
+        return
+    try:
+        g.handle = projects.get(g.project)
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+
+def api_route(rule, **options):
+    """Register `/api<rule>` for the default project/mission and
+    `/api/p/<project>/m/<mission><rule>` for any other."""
+    def decorator(f):
+        app.add_url_rule(f'/api{rule}', view_func=f, **options)
+        app.add_url_rule(f'/api/p/<project>/m/<mission>{rule}',
+                         endpoint=f'{f.__name__}_scoped', view_func=f, **options)
+        return f
+    return decorator
+
 # ═══════════════════════════════════════════
 # STATIC FILES
 # ═══════════════════════════════════════════
@@ -93,7 +748,18 @@ def index():
 # API ENDPOINTS
 # ═══════════════════════════════════════════
 
-@app.route('/api/info')
+@app.route('/api/projects')
+def list_projects():
+    """Projects this server can open, plus the ones currently open."""
+    names = []
+    if os.path.isdir(PROJECTS_DIR):
+        names = sorted(n for n in os.listdir(PROJECTS_DIR)
+                       if os.path.exists(os.path.join(PROJECTS_DIR, n, 'mission-control.db')))
+    with projects.lock:
+        open_names = [h.name for h in projects.handles.values()]
+    return jsonify({'default': PROJECT, 'projects': names, 'open': open_names})
+
+@api_route('/info')
 def info():
     """Return current project/mission context."""
     conn = get_db()
@@ -103,19 +769,61 @@ def info():
     ).fetchall()
     conn.close()
     return jsonify({
-        'project': PROJECT,
-        'mission': MISSION_NAME,
+        'project': g.project,
+        'mission': g.mission,
         'mission_id': mid,
-        'missions': [row_to_dict(m) for m in missions]
+        'missions': [row_to_dict(m) for m in missions],
+        'watcher': {
+            'subscribers': g.handle.watcher.subscriber_count(),
+            'polls': g.handle.watcher.polls,
+            'diffs': g.handle.watcher.diffs,
+        },
+        'projects_open': len(projects)
     })
 
-@app.route('/api/board')
+TASK_COLUMNS = '''
+    id, subject, description, status, owner, priority,
+    task_type, scheduled_at, activated_at,
+    created_at, updated_at, claimed_at, completed_at, lease_expires_at
+'''
+
+def board_seq(conn, mid):
+    """Latest changelog seq visible to a mission's board (its rows + agents)."""
+    return conn.execute('''
+        SELECT MAX(
+            COALESCE((SELECT MAX(seq) FROM changelog WHERE mission_id = ?), 0),
+            COALESCE((SELECT MAX(seq) FROM changelog WHERE mission_id IS NULL), 0))
+    ''', (mid,)).fetchone()[0]
+
+def changed_keys(conn, tbl, mid, since, op):
+    """Row keys of `tbl` changed after `since` for this mission (or global rows)."""
+    scope = 'mission_id IS NULL' if mid is None else 'mission_id = ?'
+    params = (tbl, since, op) if mid is None else (tbl, since, op, mid)
+    return [r[0] for r in conn.execute(f'''
+        SELECT row_key FROM changelog
+        WHERE tbl = ? AND seq > ? AND op = ? AND {scope}
+        ORDER BY seq
+    ''', params)]
+
+@api_route('/board')
 def board():
+    """Full board, or only rows changed after `?since=<seq>`.
+
+    Responses carry an ETag derived from the board's latest seq, so an
+    unchanged board costs one indexed lookup and a 304.
+    """
+    since = request.args.get('since', type=int)
     conn = get_db()
     mid = get_mission_id(conn)
     if mid is None:
         conn.close()
-        return jsonify({'error': f'Mission "{MISSION_NAME}" not found'}), 404
+        return jsonify({'error': f'Mission "{g.mission}" not found'}), 404
+
+    seq = board_seq(conn, mid)
+    etag = f'b{mid}-{seq}-{"d" if since else "f"}'
+    if request.if_none_match.contains(etag):
+        conn.close()
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
 
     # Get mission status
     mission_row = conn.execute(
@@ -123,44 +831,80 @@ def board():
     ).fetchone()
     mission_status = row_to_dict(mission_row) if mission_row else {}
 
-    tasks = conn.execute('''
-        SELECT id, subject, description, status, owner, priority,
-               task_type, scheduled_at,
-               created_at, updated_at, claimed_at, completed_at
-        FROM tasks
-        WHERE mission_id = ?
-        ORDER BY
-            CASE status
-                WHEN 'in_progress' THEN 1
-                WHEN 'claimed' THEN 2
-                WHEN 'pending' THEN 3
-                WHEN 'blocked' THEN 4
-                WHEN 'review' THEN 5
-                WHEN 'done' THEN 6
-            END,
-            priority DESC,
-            id
-    ''', (mid,)).fetchall()
-
-    agents = conn.execute('''
-        SELECT name, role, status, last_seen
-        FROM agents
-        ORDER BY status, name
-    ''').fetchall()
+    if since:
+        task_ids = [int(k) for k in changed_keys(conn, 'tasks', mid, since, 'upsert')]
+        agent_names = changed_keys(conn, 'agents', None, since, 'upsert')
+        message_ids = [int(k) for k in changed_keys(conn, 'messages', mid, since, 'upsert')]
+        tasks = conn.execute(f'''
+            SELECT {TASK_COLUMNS} FROM tasks
+            WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(task_ids),)).fetchall()
+        agents = conn.execute('''
+            SELECT name, role, status, last_seen FROM agents
+            WHERE name IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(agent_names),)).fetchall()
+        messages = conn.execute('''
+            SELECT id, task_id, from_agent, to_agent, body, msg_type, created_at, read_at
+            FROM messages WHERE id IN (SELECT value FROM json_each(?))
+        ''', (json.dumps(message_ids),)).fetchall()
+        deleted = {
+            'tasks': [int(k) for k in changed_keys(conn, 'tasks', mid, since, 'delete')],
+            'agents': changed_keys(conn, 'agents', None, since, 'delete'),
+            'messages': [int(k) for k in changed_keys(conn, 'messages', mid, since, 'delete')],
+        }
+    else:
+        tasks = conn.execute(f'''
+            SELECT {TASK_COLUMNS}
+            FROM tasks
+            WHERE mission_id = ?
+            ORDER BY
+                CASE status
+                    WHEN 'in_progress' THEN 1
+                    WHEN 'claimed' THEN 2
+                    WHEN 'pending' THEN 3
+                    WHEN 'blocked' THEN 4
+                    WHEN 'review' THEN 5
+                    WHEN 'done' THEN 6
+                END,
+                priority DESC,
+                id
+        ''', (mid,)).fetchall()
+
+        agents = conn.execute('''
+            SELECT name, role, status, last_seen
+            FROM agents
+            ORDER BY status, name
+        ''').fetchall()
 
     conn.close()
-    return jsonify({
+    body = {
         'tasks': [row_to_dict(t) for t in tasks],
         'agents': [row_to_dict(a) for a in agents],
-        'project': PROJECT,
-        'mission': MISSION_NAME,
+        'project': g.project,
+        'mission': g.mission,
         'mission_status': mission_status.get('status', 'active'),
         'user_instructions': mission_status.get('user_instructions'),
+        'seq': seq,
+        'full': not since,
         'timestamp': int(time.time() * 1000)
-    })
+    }
+    if since:
+        body['since'] = since
+        body['messages'] = [row_to_dict(m) for m in messages]
+        body['deleted'] = deleted
+    resp = jsonify(body)
+    resp.set_etag(etag)
+    return resp
 
-@app.route('/api/task/<int:task_id>')
+@api_route('/task/<int:task_id>')
 def task_detail(task_id):
+    """Task plus its newest `?limit=` messages (default 50, max 200), oldest first.
+
+    `next_after` is set when older messages exist; pass it back as `?after=`
+    for the page before.
+    """
+    after = request.args.get('after', mc_core.MAX_ROWID, type=int)
+    limit = max(1, min(request.args.get('limit', 50, type=int), 200))
     conn = get_db()
     mid = get_mission_id(conn)
     task = conn.execute(
@@ -171,33 +915,77 @@ def task_detail(task_id):
     messages = conn.execute('''
         SELECT id, from_agent, body, msg_type, created_at
         FROM messages
-        WHERE task_id = ?
-        ORDER BY created_at
-    ''', (task_id,)).fetchall()
+        WHERE task_id = ? AND id < ?
+        ORDER BY id DESC LIMIT ?
+    ''', (task_id, after, limit + 1)).fetchall()
 
     conn.close()
+    page = messages[:limit]
     return jsonify({
         'task': row_to_dict(task),
-        'messages': [row_to_dict(m) for m in messages]
+        'messages': [row_to_dict(m) for m in reversed(page)],
+        'next_after': page[-1]['id'] if len(messages) > limit else None
     })
 
-@app.route('/api/task/<int:task_id>/claim', methods=['POST'])
+@api_route('/task/<int:task_id>/claim', methods=['POST'])
 def claim_task(task_id):
     data = request.get_json() or {}
     agent = data.get('agent', 'mobile')
     conn = get_db()
     mid = get_mission_id(conn)
-    conn.execute('''
-        UPDATE tasks
-        SET owner = ?, status = 'in_progress',
-            claimed_at = datetime('now'), updated_at = datetime('now')
-        WHERE id = ? AND mission_id = ?
-    ''', (agent, task_id, mid))
-    conn.commit()
-    conn.close()
+    if mid is None:
+        conn.close()
+        return jsonify({'error': f'Mission "{g.mission}" not found'}), 404
+    try:
+        mc_core.claim(conn, mid, task_id, agent, status='in_progress')
+    except mc_core.ClaimError as e:
+        return jsonify({'success': False, 'error': str(e)}), 409
+    finally:
+        conn.close()
     return jsonify({'success': True})
 
-@app.route('/api/task/<int:task_id>/complete', methods=['POST'])
+@api_route('/claim-next', methods=['POST'])
+def claim_next():
+    data = request.get_json() or {}
+    agent = data.get('agent', 'mobile')
+    conn = get_db()
+    mid = get_mission_id(conn)
+    if mid is None:
+        conn.close()
+        return jsonify({'error': f'Mission "{g.mission}" not found'}), 404
+    try:
+        task = mc_core.claim_next(conn, mid, agent, status='in_progress')
+    finally:
+        conn.close()
+    if task is None:
+        return jsonify({'success': False, 'error': 'No claimable tasks'}), 409
+    return jsonify({'success': True, 'task': task})
+
+@api_route('/checkin', methods=['POST'])
+def checkin():
+    """`mc checkin --full` in one request: {"agent": ..., "claim": true, "limit": N}.
+
+    A claimed task is started (in_progress), as with /api/claim-next.
+    {"full": false} is a plain heartbeat, coalesced per --heartbeat-interval.
+    """
+    data = request.get_json() or {}
+    agent = data.get('agent', 'mobile')
+    try:
+        limit = max(1, min(int(data.get('limit', 10)), 200))
+    except (TypeError, ValueError):
+        return jsonify({'error': '"limit" must be an integer'}), 400
+    conn = get_db()
+    try:
+        result = mc_core.checkin(conn, g.mission, agent, full=data.get('full', True),
+                                 claim='in_progress' if data.get('claim') else None, limit=limit,
+                                 interval=args.heartbeat_interval)
+    except mc_core.MissionError:
+        return jsonify({'error': f'Mission "{g.mission}" not found'}), 404
+    finally:
+        conn.close()
+    return jsonify(result)
+
+@api_route('/task/<int:task_id>/complete', methods=['POST'])
 def complete_task(task_id):
     data = request.get_json() or {}
     note = data.get('note', '')
@@ -205,10 +993,11 @@ def complete_task(task_id):
     mid = get_mission_id(conn)
     conn.execute('''
         UPDATE tasks
-        SET status = 'done',
+        SET status = 'done', lease_expires_at = NULL,
             completed_at = datetime('now'), updated_at = datetime('now')
         WHERE id = ? AND mission_id = ?
     ''', (task_id, mid))
+    unblocked = mc_core.unblock_dependents(conn, mid, task_id)
 
     if note:
         conn.execute('''
@@ -218,39 +1007,222 @@ def complete_task(task_id):
 
     conn.commit()
     conn.close()
-    return jsonify({'success': True})
+    return jsonify({'success': True, 'unblocked': unblocked})
+
+@api_route('/search')
+def search():
+    """Ranked full-text matches in the mission: ?q=...&type=task|msg|activity&limit=N."""
+    text = request.args.get('q', '')
+    kind = request.args.get('type')
+    if kind and kind not in mc_core.SEARCH_SQL:
+        return jsonify({'error': f'Unknown type "{kind}"'}), 400
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    conn = get_db()
+    mid = get_mission_id(conn)
+    if mid is None:
+        conn.close()
+        return jsonify({'error': f'Mission "{g.mission}" not found'}), 404
+    try:
+        rows = mc_core.search(conn, mid, text, [kind] if kind else list(mc_core.SEARCH_SQL), limit)
+    except sqlite3.OperationalError as e:
+        return jsonify({'error': f'{e}. Run: mc migrate'}), 409
+    finally:
+        conn.close()
+    for r in rows:
+        # Snippets come back as HTML with the matched terms in <mark>
+        r['snippet'] = html.escape(r['snippet'] or '').replace('\x01', '<mark>').replace('\x02', '</mark>')
+    return jsonify({'query': text, 'results': rows})
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text format: request/DB timings, streams, and per-project mission gauges."""
+    try:
+        projects.get(PROJECT)  # the default project always reports, even before its first request
+    except (LookupError, RuntimeError):
+        pass
+    with projects.lock:
+        handles = list(projects.handles.values())
+    gauges = []
+    for h in handles:
+        project = (('project', h.name),)
+        gauges += [
+            ('mc_sse_subscribers', project, h.watcher.subscriber_count()),
+            ('mc_watcher_polls_total', project, h.watcher.polls),
+            ('mc_watcher_diffs_total', project, h.watcher.diffs),
+            ('mc_pool_idle_connections', project, h.pool.idle.qsize()),
+            *h.mission_gauges(),
+        ]
+    return Response(METRICS.render(gauges), mimetype='text/plain; version=0.0.4')
 
-@app.route('/api/heartbeat')
+@api_route('/heartbeat')
 def heartbeat():
+    conn = get_db()
+    mid = get_mission_id(conn)
+    conn.close()
+    watcher = g.handle.watcher
+    q = watcher.subscribe(mid)
+
     def stream():
-        last_check = None
-        while True:
-            try:
-                conn = get_db()
-                mid = get_mission_id(conn)
-                result = conn.execute('''
-                    SELECT MAX(updated_at) as latest FROM tasks
-                    WHERE mission_id = ?
-                ''', (mid,)).fetchone()
-                conn.close()
-
-                latest = result['latest'] if result else None
-
-                if latest != last_check:
-                    last_check = latest
-                    yield f"data: {json.dumps({'refresh': True, 'ts': int(time.time())})}\n\n"
-
-                time.sleep(2)
-            except GeneratorExit:
-                break
-            except Exception as e:
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
-                time.sleep(5)
+        try:
+            while True:
+                try:
+                    events = q.get(timeout=15)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps({'refresh': True, 'events': events, 'ts': int(time.time())})}\n\n"
+        finally:
+            watcher.unsubscribe(q)
 
     return Response(stream(), mimetype='text/event-stream',
                     headers={'Cache-Control': 'no-cache',
                              'X-Accel-Buffering': 'no'})
 
+# ═══════════════════════════════════════════
+# ASGI MODE (--asgi)
+# ═══════════════════════════════════════════
+
+class AsyncSubscriber:
+    """Watcher subscriber for a coroutine stream.
+
+    The watcher thread hands events to the event loop; the stream awaits
+    them, so an idle client holds no thread, only a queue and a task.
+    """
+
+    def __init__(self, loop):
+        import asyncio
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=ChangeWatcher.QUEUE_SIZE)
+        self.mission_id = None
+
+    def put_nowait(self, events):
+        try:
+            self.loop.call_soon_threadsafe(self._put, events)
+        except RuntimeError:
+            pass  # loop closed during shutdown
+
+    def _put(self, events):
+        if self.queue.full():
+            # Slow consumer: drop its backlog and make it reload the board
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            events = [{'type': 'resync'}]
+        self.queue.put_nowait(events)
+
+
+STREAM_RE = re.compile(r'^/api(?:/p/([^/]+)/m/([^/]+))?/(heartbeat|ws)$')
+
+def build_asgi_app():
+    """ASGI app: /heartbeat (SSE) and /ws (WebSocket) as coroutines, the
+    Flask routes through a threaded WSGI bridge."""
+    import asyncio
+    from urllib.parse import parse_qs
+    from a2wsgi import WSGIMiddleware
+
+    wsgi = WSGIMiddleware(app, workers=args.pool_size)
+
+    def open_stream(scope, project, mission):
+        """Auth + project/mission lookup. Returns (status, error, handle, mission_id)."""
+        query = parse_qs(scope.get('query_string', b'').decode())
+        if query.get('token', [None])[0] != TOKEN:
+            return 401, 'unauthorized', None, None
+        try:
+            handle = projects.get(project or PROJECT)
+        except LookupError as e:
+            return 404, str(e), None, None
+        except RuntimeError as e:
+            return 409, str(e), None, None
+        conn = handle.pool.acquire()
+        try:
+            mid = handle.missions.resolve(conn, mission or MISSION_NAME)
+        finally:
+            handle.pool.release(conn)
+        return 200, None, handle, mid
+
+    async def pump(sub, emit, disconnected):
+        """Forward watcher events to `emit` until the client goes away; None means keepalive."""
+        while True:
+            get = asyncio.ensure_future(sub.queue.get())
+            done, _ = await asyncio.wait({get, disconnected}, timeout=15,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if get in done:
+                await emit(get.result())
+            else:
+                get.cancel()
+            if disconnected in done:
+                return
+            if not done:
+                await emit(None)
+
+    async def until(receive, kind):
+        while (await receive())['type'] != kind:
+            pass
+
+    async def stream(scope, receive, send, project, mission):
+        status, error, handle, mid = await asyncio.to_thread(open_stream, scope, project, mission)
+        is_ws = scope['type'] == 'websocket'
+        if status != 200:
+            if is_ws:
+                await send({'type': 'websocket.close', 'code': 4000 + status})
+            else:
+                body = json.dumps({'error': error}).encode()
+                await send({'type': 'http.response.start', 'status': status,
+                            'headers': [(b'content-type', b'application/json')]})
+                await send({'type': 'http.response.body', 'body': body})
+            return
+
+        if is_ws:
+            if (await receive())['type'] != 'websocket.connect':
+                return
+            await send({'type': 'websocket.accept'})
+            disconnected = asyncio.ensure_future(until(receive, 'websocket.disconnect'))
+
+            async def emit(events):
+                if events is not None:
+                    await send({'type': 'websocket.send', 'text': json.dumps(
+                        {'refresh': True, 'events': events, 'ts': int(time.time())})})
+        else:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ]})
+            disconnected = asyncio.ensure_future(until(receive, 'http.disconnect'))
+
+            async def emit(events):
+                if events is None:
+                    chunk = ": keepalive\n\n"
+                else:
+                    chunk = f"data: {json.dumps({'refresh': True, 'events': events, 'ts': int(time.time())})}\n\n"
+                await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+
+        sub = AsyncSubscriber(asyncio.get_running_loop())
+        handle.watcher.subscribe(mid, sub)
+        try:
+            await pump(sub, emit, disconnected)
+        finally:
+            handle.watcher.unsubscribe(sub)
+            disconnected.cancel()
+
+    async def asgi_app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        m = STREAM_RE.match(scope['path'])
+        if m and (scope['type'] == 'websocket') == (m.group(3) == 'ws'):
+            await stream(scope, receive, send, m.group(1), m.group(2))
+        elif scope['type'] == 'websocket':
+            await send({'type': 'websocket.close', 'code': 4404})
+        else:
+            await wsgi(scope, receive, send)
+
+    return asgi_app
+
 # ═══════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════
@@ -262,6 +1234,7 @@ if __name__ == '__main__':
     print(f"\n  Project:   {PROJECT}")
     print(f"  Mission:   {MISSION_NAME}")
     print(f"  DB:        {DB}")
+    print(f"  Other projects: /api/p/<project>/m/<mission>/... under {PROJECTS_DIR}")
     print(f"\n  Local URL:")
     print(f"  http://localhost:{args.port}/?token={TOKEN}")
     print(f"\n  For Tailscale/LAN access, use your IP:")
@@ -269,4 +1242,14 @@ if __name__ == '__main__':
     print(f"\n  Token: {TOKEN}")
     print(f"\n{'='*50}\n")
 
-    app.run(host='0.0.0.0', port=args.port, threaded=True)
+    if args.asgi:
+        try:
+            import uvicorn
+            asgi_app = build_asgi_app()
+        except ImportError as e:
+            print(f"Error: --asgi needs uvicorn and a2wsgi ({e.name} missing)", file=sys.stderr)
+            print("Run: pip install uvicorn a2wsgi", file=sys.stderr)
+            sys.exit(1)
+        uvicorn.run(asgi_app, host='0.0.0.0', port=args.port, log_level='warning')
+    else:
+        app.run(host='0.0.0.0', port=args.port, threaded=True)
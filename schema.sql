@@ -23,6 +23,9 @@ INSERT OR IGNORE INTO missions(id, name, description) VALUES(1, 'default', 'Defa
 -- ═══════════════════════════════════════════
 -- TASKS
 -- ═══════════════════════════════════════════
+-- lease_expires_at is set while a task is claimed or in progress: the
+-- owner's checkins renew it, and once it passes the task goes back to
+-- pending for someone else (mc_core reclaim_expired).
 
 CREATE TABLE IF NOT EXISTS tasks (
   id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -40,10 +43,12 @@ CREATE TABLE IF NOT EXISTS tasks (
   task_type   TEXT DEFAULT 'normal'
                 CHECK(task_type IN ('normal','checkpoint')),
   scheduled_at TEXT DEFAULT NULL,
+  activated_at TEXT DEFAULT NULL,
   created_at  TEXT DEFAULT (datetime('now')),
   updated_at  TEXT DEFAULT (datetime('now')),
   claimed_at  TEXT,
-  completed_at TEXT
+  completed_at TEXT,
+  lease_expires_at TEXT DEFAULT NULL
 );
 
 -- ═══════════════════════════════════════════
@@ -66,6 +71,8 @@ CREATE TABLE IF NOT EXISTS messages (
 -- ═══════════════════════════════════════════
 -- AGENTS (workspace-shared, no mission_id)
 -- ═══════════════════════════════════════════
+-- max_tasks caps the open tasks `mc schedule run` gives the agent (set with
+-- `mc schedule cap`; NULL uses the run's --cap).
 
 CREATE TABLE IF NOT EXISTS agents (
   name        TEXT PRIMARY KEY,
@@ -74,9 +81,23 @@ CREATE TABLE IF NOT EXISTS agents (
   status      TEXT DEFAULT 'idle'
                 CHECK(status IN ('idle','busy','offline')),
   session_id  TEXT,
-  registered_at TEXT DEFAULT (datetime('now'))
+  registered_at TEXT DEFAULT (datetime('now')),
+  max_tasks   INTEGER CHECK(max_tasks > 0)
 );
 
+-- Heartbeat writes counted per agent, mission and day instead of logged as
+-- activity. A checkin within MC_HEARTBEAT_INTERVAL of the last written one,
+-- with the same status, writes nothing and is not counted.
+
+CREATE TABLE IF NOT EXISTS agent_heartbeats (
+  agent       TEXT NOT NULL,
+  mission_id  INTEGER NOT NULL,
+  day         TEXT NOT NULL,
+  writes      INTEGER NOT NULL,
+  last_at     TEXT NOT NULL,
+  PRIMARY KEY (agent, mission_id, day)
+) WITHOUT ROWID;
+
 -- ═══════════════════════════════════════════
 -- ACTIVITY
 -- ═══════════════════════════════════════════
@@ -92,15 +113,259 @@ CREATE TABLE IF NOT EXISTS activity (
   created_at  TEXT DEFAULT (datetime('now'))
 );
 
+-- ═══════════════════════════════════════════
+-- ACTIVITY RETENTION (mc retention)
+-- ═══════════════════════════════════════════
+-- Activity rows are counted into hourly and daily rollups before they may
+-- expire; rollup_through is the highest activity id already counted. A row
+-- expires keep_days after it was written (the '*' row covers actions with
+-- no row of their own; NULL keeps forever) and is archived to JSONL.gz.
+
+CREATE TABLE IF NOT EXISTS retention_policy (
+  action      TEXT PRIMARY KEY,
+  keep_days   INTEGER CHECK(keep_days >= 0)
+);
+
+INSERT OR IGNORE INTO retention_policy(action, keep_days) VALUES('*', 90), ('checkin', 7);
+
+CREATE TABLE IF NOT EXISTS activity_rollup (
+  period      TEXT NOT NULL CHECK(period IN ('hour','day')),
+  bucket      TEXT NOT NULL,
+  mission_id  INTEGER NOT NULL,
+  agent       TEXT NOT NULL,
+  action      TEXT NOT NULL,
+  n           INTEGER NOT NULL,
+  PRIMARY KEY (period, bucket, mission_id, agent, action)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS retention_state (
+  key         TEXT PRIMARY KEY,
+  value       INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO retention_state(key, value) VALUES('rollup_through', 0);
+
+-- ═══════════════════════════════════════════
+-- MISSION AGENTS (provisioned by setup_mission)
+-- ═══════════════════════════════════════════
+-- What setup_mission last applied for each agent of a mission, so a re-run
+-- can diff a manifest against it: cron_hash covers the schedule, delivery
+-- channel and message of the agent's cron job.
+
+CREATE TABLE IF NOT EXISTS mission_agents (
+  mission_id    INTEGER NOT NULL REFERENCES missions(id),
+  agent_id      TEXT NOT NULL,
+  role          TEXT NOT NULL,
+  cron_schedule TEXT NOT NULL,
+  cron_hash     TEXT NOT NULL,
+  updated_at    TEXT DEFAULT (datetime('now')),
+  PRIMARY KEY (mission_id, agent_id)
+) WITHOUT ROWID;
+
+-- ═══════════════════════════════════════════
+-- SCHEDULER (mc schedule)
+-- ═══════════════════════════════════════════
+-- One row per task `mc schedule run` assigned: to whom, the score it was
+-- ranked by and why that agent, so assignments can be audited afterwards.
+
+CREATE TABLE IF NOT EXISTS schedule_decisions (
+  id          INTEGER PRIMARY KEY,
+  mission_id  INTEGER NOT NULL REFERENCES missions(id),
+  task_id     INTEGER NOT NULL,
+  agent       TEXT NOT NULL,
+  score       REAL NOT NULL,
+  reason      TEXT NOT NULL,
+  created_at  TEXT DEFAULT (datetime('now'))
+);
+
+-- ═══════════════════════════════════════════
+-- CRON JOBS (cached `openclaw cron list`, see mc_cron.py)
+-- ═══════════════════════════════════════════
+-- Name → id of every openclaw cron job. listed_at is when the row was last
+-- seen in a full listing; MC's own enable/disable/remove update rows in place.
+
+CREATE TABLE IF NOT EXISTS cron_jobs (
+  name        TEXT PRIMARY KEY,
+  job_id      TEXT NOT NULL,
+  enabled     INTEGER NOT NULL DEFAULT 1,
+  listed_at   TEXT NOT NULL
+) WITHOUT ROWID;
+
+-- ═══════════════════════════════════════════
+-- TASK DEPENDENCIES (edge list; task_id waits on depends_on)
+-- ═══════════════════════════════════════════
+-- Edges are kept after the blocker completes so `mc graph` can show history;
+-- tasks.blocked_by mirrors the still-open blockers for older readers.
+
+CREATE TABLE IF NOT EXISTS task_deps (
+  task_id     INTEGER NOT NULL REFERENCES tasks(id),
+  depends_on  INTEGER NOT NULL REFERENCES tasks(id),
+  created_at  TEXT DEFAULT (datetime('now')),
+  PRIMARY KEY (task_id, depends_on),
+  CHECK (task_id != depends_on)
+) WITHOUT ROWID;
+
+-- ═══════════════════════════════════════════
+-- CHANGELOG (row versions for delta sync)
+-- ═══════════════════════════════════════════
+-- One row per changed entity; a new change replaces the previous entry, so
+-- the table stays bounded by the number of rows ever touched. `seq` is
+-- monotonically increasing across all tables. row_key is TEXT, so integer
+-- ids are cast before the lookup, or it could not use the UNIQUE index.
+
+CREATE TABLE IF NOT EXISTS changelog (
+  seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+  tbl         TEXT NOT NULL,
+  row_key     TEXT NOT NULL,
+  mission_id  INTEGER,
+  op          TEXT NOT NULL CHECK(op IN ('upsert','delete')),
+  changed_at  TEXT DEFAULT (datetime('now')),
+  UNIQUE(tbl, row_key)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_tasks_ins_log AFTER INSERT ON tasks BEGIN
+  DELETE FROM changelog WHERE tbl='tasks' AND row_key=CAST(NEW.id AS TEXT);
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('tasks',NEW.id,NEW.mission_id,'upsert');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_tasks_upd_log AFTER UPDATE ON tasks BEGIN
+  DELETE FROM changelog WHERE tbl='tasks' AND row_key=CAST(NEW.id AS TEXT);
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('tasks',NEW.id,NEW.mission_id,'upsert');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_tasks_del_log AFTER DELETE ON tasks BEGIN
+  DELETE FROM changelog WHERE tbl='tasks' AND row_key=CAST(OLD.id AS TEXT);
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('tasks',OLD.id,OLD.mission_id,'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_messages_ins_log AFTER INSERT ON messages BEGIN
+  DELETE FROM changelog WHERE tbl='messages' AND row_key=CAST(NEW.id AS TEXT);
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('messages',NEW.id,NEW.mission_id,'upsert');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_messages_upd_log AFTER UPDATE ON messages BEGIN
+  DELETE FROM changelog WHERE tbl='messages' AND row_key=CAST(NEW.id AS TEXT);
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('messages',NEW.id,NEW.mission_id,'upsert');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_messages_del_log AFTER DELETE ON messages BEGIN
+  DELETE FROM changelog WHERE tbl='messages' AND row_key=CAST(OLD.id AS TEXT);
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('messages',OLD.id,OLD.mission_id,'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_agents_ins_log AFTER INSERT ON agents BEGIN
+  DELETE FROM changelog WHERE tbl='agents' AND row_key=NEW.name;
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('agents',NEW.name,NULL,'upsert');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_agents_upd_log AFTER UPDATE ON agents BEGIN
+  DELETE FROM changelog WHERE tbl='agents' AND row_key=NEW.name;
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('agents',NEW.name,NULL,'upsert');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_agents_del_log AFTER DELETE ON agents BEGIN
+  DELETE FROM changelog WHERE tbl='agents' AND row_key=OLD.name;
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('agents',OLD.name,NULL,'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_missions_upd_log AFTER UPDATE ON missions BEGIN
+  DELETE FROM changelog WHERE tbl='missions' AND row_key=CAST(NEW.id AS TEXT);
+  INSERT INTO changelog(tbl,row_key,mission_id,op) VALUES('missions',NEW.id,NEW.id,'upsert');
+END;
+
+-- ═══════════════════════════════════════════
+-- FULL-TEXT SEARCH (mc search, /api/search)
+-- ═══════════════════════════════════════════
+-- External-content FTS5 indexes, kept in step by the triggers below. The
+-- mission_id column is indexed too, so a search is scoped with
+-- `mission_id : N AND (...)` inside the index instead of a join. Activity
+-- rows without detail (checkins) are left out of activity_fts.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+  subject, description, mission_id,
+  content='tasks', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+  body, mission_id,
+  content='messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS activity_fts USING fts5(
+  detail, mission_id,
+  content='activity', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+  INSERT INTO tasks_fts(rowid, subject, description, mission_id)
+  VALUES(NEW.id, NEW.subject, NEW.description, NEW.mission_id);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+  INSERT INTO tasks_fts(tasks_fts, rowid, subject, description, mission_id)
+  VALUES('delete', OLD.id, OLD.subject, OLD.description, OLD.mission_id);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF subject, description, mission_id ON tasks BEGIN
+  INSERT INTO tasks_fts(tasks_fts, rowid, subject, description, mission_id)
+  VALUES('delete', OLD.id, OLD.subject, OLD.description, OLD.mission_id);
+  INSERT INTO tasks_fts(rowid, subject, description, mission_id)
+  VALUES(NEW.id, NEW.subject, NEW.description, NEW.mission_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+  INSERT INTO messages_fts(rowid, body, mission_id) VALUES(NEW.id, NEW.body, NEW.mission_id);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+  INSERT INTO messages_fts(messages_fts, rowid, body, mission_id) VALUES('delete', OLD.id, OLD.body, OLD.mission_id);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF body, mission_id ON messages BEGIN
+  INSERT INTO messages_fts(messages_fts, rowid, body, mission_id) VALUES('delete', OLD.id, OLD.body, OLD.mission_id);
+  INSERT INTO messages_fts(rowid, body, mission_id) VALUES(NEW.id, NEW.body, NEW.mission_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS activity_fts_insert AFTER INSERT ON activity
+WHEN COALESCE(NEW.detail, '') != '' BEGIN
+  INSERT INTO activity_fts(rowid, detail, mission_id) VALUES(NEW.id, NEW.detail, NEW.mission_id);
+END;
+CREATE TRIGGER IF NOT EXISTS activity_fts_delete AFTER DELETE ON activity
+WHEN COALESCE(OLD.detail, '') != '' BEGIN
+  INSERT INTO activity_fts(activity_fts, rowid, detail, mission_id) VALUES('delete', OLD.id, OLD.detail, OLD.mission_id);
+END;
+CREATE TRIGGER IF NOT EXISTS activity_fts_update AFTER UPDATE OF detail, mission_id ON activity BEGIN
+  INSERT INTO activity_fts(activity_fts, rowid, detail, mission_id)
+  SELECT 'delete', OLD.id, OLD.detail, OLD.mission_id WHERE COALESCE(OLD.detail, '') != '';
+  INSERT INTO activity_fts(rowid, detail, mission_id)
+  SELECT NEW.id, NEW.detail, NEW.mission_id WHERE COALESCE(NEW.detail, '') != '';
+END;
+
 -- ═══════════════════════════════════════════
 -- INDEXES
 -- ═══════════════════════════════════════════
+-- Shaped after the hot queries: everything is scoped by mission_id, task
+-- lists are ordered by priority DESC, id, and most reads only want open
+-- tasks or unread messages. The partial indexes stay small as the finished
+-- rows pile up. Existing DBs get these through `mc migrate` (schema v1), and
+-- `python3 bench/query_plans.py` fails if a hot query falls back to a scan.
 
-CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
-CREATE INDEX IF NOT EXISTS idx_tasks_owner ON tasks(owner);
-CREATE INDEX IF NOT EXISTS idx_tasks_mission ON tasks(mission_id);
-CREATE INDEX IF NOT EXISTS idx_messages_to ON messages(to_agent);
-CREATE INDEX IF NOT EXISTS idx_messages_unread ON messages(to_agent, read_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_mission_status ON tasks(mission_id, status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_open ON tasks(mission_id, priority DESC, id)
+  WHERE status NOT IN ('done', 'cancelled');
+-- Scheduled tasks not yet due, in due order: the activation pass (mc_core
+-- activate_due) takes the due ones off the front as one range and stamps
+-- activated_at, so reads never compare scheduled_at with the clock. Pending
+-- tasks that are ready (unscheduled or activated) get their own index, so
+-- claim-next walks past none of the waiting ones however many there are;
+-- status is in the key so the planner ranks it above idx_tasks_mission_status.
+CREATE INDEX IF NOT EXISTS idx_tasks_ready ON tasks(mission_id, status, priority DESC, id)
+  WHERE status = 'pending' AND (scheduled_at IS NULL OR activated_at IS NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_tasks_waiting ON tasks(mission_id, scheduled_at)
+  WHERE scheduled_at IS NOT NULL AND activated_at IS NULL;
+-- Leased tasks in expiry order: the expired ones are one range at the front
+CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks(mission_id, lease_expires_at)
+  WHERE lease_expires_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_tasks_owner_status ON tasks(owner, status);
+-- Message indexes end in the implicit rowid, so each (to_agent, mission_id)
+-- or task_id range is in id order: inbox pages and task threads are keyset
+-- ranges (id < :after) that stop after one page.
+CREATE INDEX IF NOT EXISTS idx_messages_inbox ON messages(to_agent, mission_id);
+CREATE INDEX IF NOT EXISTS idx_messages_to_unread ON messages(to_agent, mission_id)
+  WHERE read_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_messages_task ON messages(task_id);
 CREATE INDEX IF NOT EXISTS idx_messages_mission ON messages(mission_id);
 CREATE INDEX IF NOT EXISTS idx_activity_time ON activity(created_at);
 CREATE INDEX IF NOT EXISTS idx_activity_mission ON activity(mission_id);
+CREATE INDEX IF NOT EXISTS idx_activity_agent ON activity(mission_id, agent);
+CREATE INDEX IF NOT EXISTS idx_schedule_decisions_mission ON schedule_decisions(mission_id);
+CREATE INDEX IF NOT EXISTS idx_changelog_mission ON changelog(mission_id, seq);
+CREATE INDEX IF NOT EXISTS idx_task_deps_depends_on ON task_deps(depends_on, task_id);
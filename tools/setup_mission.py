@@ -11,17 +11,32 @@ in addition to the worker agents specified by --roles.
 Agents are named {project}-{mission}-{role} to ensure isolation per mission.
 Cleanup: mc -p <project> -m <mission> mission complete
 
+With --manifest, the whole mission (roles, schedules, policies, seed tasks)
+comes from one JSON file, and only what differs from the MC DB, openclaw
+and the agent workspaces is applied: agents added or removed, crons
+rescheduled, AGENTS.md files rewritten. An unchanged manifest is a no-op.
+
 Usage:
   setup_mission <project> <mission> "<goal>" --roles role1,role2,...
+  setup_mission --manifest mission.json [--dry-run]   (--dry-run diffs changed AGENTS.md files)
   setup_mission ec-site prototype "Django EC prototype" --roles researcher,backend,frontend,reviewer
   setup_mission my-app mvp "Build MVP" --roles analyst --role-config roles.json
 """
 
 import argparse
+import difflib
+import functools
+import hashlib
 import json
 import os
+import re
+import shutil
+import sqlite3
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 _PROFILE = os.environ.get("OPENCLAW_PROFILE", "")
@@ -59,39 +74,103 @@ def run(cmd: str, check: bool = True, capture: bool = False) -> subprocess.Compl
     return result
 
 
-def agent_exists(agent_id: str, oc_profile_flag: str) -> bool:
-    """Check if an openclaw agent already exists."""
+def list_agents(oc_profile_flag: str) -> set[str]:
+    """Names of all openclaw agents (empty if the list cannot be read)."""
     result = run(
         f"openclaw {oc_profile_flag} agents list --json",
         check=False, capture=True,
     )
     if result.returncode != 0:
-        return False
+        return set()
     try:
         data = json.loads(result.stdout)
         agents = data.get("agents", data) if isinstance(data, dict) else data
-        return any(
-            (a.get("name") or a.get("id") or "") == agent_id
+        return {
+            a.get("name") or a.get("id") or ""
             for a in (agents if isinstance(agents, list) else [])
-        )
+        }
     except (json.JSONDecodeError, AttributeError):
-        return False
+        return set()
 
 
-def cron_exists(agent_id: str, oc_profile_flag: str) -> bool:
-    """Check if a cron job with the given name already exists."""
+def list_crons(oc_profile_flag: str) -> dict[str, str]:
+    """All openclaw cron jobs, name → id (empty if the list cannot be read)."""
     result = run(
         f"openclaw {oc_profile_flag} cron list --json",
         check=False, capture=True,
     )
     if result.returncode != 0:
-        return False
+        return {}
     try:
         data = json.loads(result.stdout)
-        jobs = data.get("jobs", [])
-        return any(j.get("name") == agent_id for j in jobs)
+        return {j.get("name"): j.get("id", "") for j in data.get("jobs", [])}
     except (json.JSONDecodeError, AttributeError):
-        return False
+        return {}
+
+
+def list_fleet(db_path: Path) -> dict[str, str]:
+    """Agents registered in the MC fleet, name → role (empty if there is no DB yet)."""
+    if not db_path.exists():
+        return {}
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        return dict(conn.execute("SELECT name, COALESCE(role, '') FROM agents"))
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+
+class Inventory:
+    """openclaw agents, cron jobs and the MC fleet, listed once per run.
+
+    Workers record what they create, so existence checks never re-run a
+    `list --json` subprocess; refresh() re-reads everything for the final report.
+    """
+
+    def __init__(self, oc_profile_flag: str, db_path: Path):
+        self.oc_profile_flag = oc_profile_flag
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> None:
+        with ThreadPoolExecutor(2) as pool:
+            agents = pool.submit(list_agents, self.oc_profile_flag)
+            crons = pool.submit(list_crons, self.oc_profile_flag)
+            self.agents, self.crons = agents.result(), crons.result()
+        self.fleet = list_fleet(self.db_path)
+
+    def record(self, kind: str, name: str, value: str = "") -> None:
+        """Note that `name` now exists in "agents", "crons" (value: id) or "fleet" (value: role)."""
+        with self.lock:
+            target = getattr(self, kind)
+            if isinstance(target, dict):
+                target[name] = value
+            else:
+                target.add(name)
+
+    def forget(self, kind: str, name: str) -> None:
+        with self.lock:
+            target = getattr(self, kind)
+            if isinstance(target, dict):
+                target.pop(name, None)
+            else:
+                target.discard(name)
+
+
+def agent_exists(agent_id: str, oc_profile_flag: str, inventory: Inventory | None = None) -> bool:
+    """Check if an openclaw agent already exists."""
+    if inventory is not None:
+        return agent_id in inventory.agents
+    return agent_id in list_agents(oc_profile_flag)
+
+
+def cron_exists(agent_id: str, oc_profile_flag: str, inventory: Inventory | None = None) -> bool:
+    """Check if a cron job with the given name already exists."""
+    if inventory is not None:
+        return agent_id in inventory.crons
+    return agent_id in list_crons(oc_profile_flag)
 
 
 def safe_render(template: str, **kwargs: str) -> str:
@@ -102,6 +181,65 @@ def safe_render(template: str, **kwargs: str) -> str:
     return result
 
 
+class Template:
+    """A template split once into literal text and placeholder slots.
+
+    render() gives the same result as safe_render() with the same keyword
+    order, in one join per agent: a value is itself rendered with the
+    placeholders that come after its own, so {project} inside a policy still
+    renders, while the template text is never scanned again.
+    """
+
+    def __init__(self, text: str, keys: tuple[str, ...]):
+        self.keys = keys
+        pattern = re.compile("|".join(re.escape(f"{{{key}}}") for key in keys))
+        slot = {f"{{{key}}}": i for i, key in enumerate(keys)}
+        self.parts: list[str | int] = []
+        pos = 0
+        for match in pattern.finditer(text):
+            self.parts += [text[pos:match.start()], slot[match.group()]]
+            pos = match.end()
+        self.parts.append(text[pos:])
+
+    def render(self, **kwargs: str) -> str:
+        if tuple(kwargs) != self.keys:
+            raise ValueError(f"expected {', '.join(self.keys)}; got {', '.join(kwargs)}")
+        values = list(kwargs.values())
+        for i, value in enumerate(values):
+            if "{" in value:
+                values[i] = safe_render(value, **dict(zip(self.keys[i + 1:], values[i + 1:])))
+        return "".join(part if isinstance(part, str) else values[part] for part in self.parts)
+
+
+@functools.lru_cache(maxsize=None)
+def _compiled(loader, template_dir: Path, keys: tuple[str, ...]) -> Template:
+    return Template(loader(), keys)
+
+
+def compiled_template(loader, keys) -> Template:
+    """`loader()`'s template, read from TEMPLATE_DIR and split once per run for these keys."""
+    return _compiled(loader, TEMPLATE_DIR, tuple(keys))
+
+
+def file_differs(path: Path, content: str) -> bool:
+    """True if `path` is missing or its content hash differs from `content`'s."""
+    data = content.encode()
+    try:
+        if path.stat().st_size != len(data):
+            return True
+    except FileNotFoundError:
+        return True
+    return hashlib.sha256(path.read_bytes()).digest() != hashlib.sha256(data).digest()
+
+
+def file_diff(path: Path, content: str, indent: str = "    ") -> list[str]:
+    """Unified diff from `path` (empty if missing) to `content`, for --dry-run."""
+    old = path.read_text().splitlines(keepends=True) if path.exists() else []
+    lines = difflib.unified_diff(old, content.splitlines(keepends=True),
+                                 fromfile=str(path), tofile=f"{path} (new)")
+    return [indent + line.rstrip("\n") for line in lines]
+
+
 def load_role_config(path: str) -> dict:
     """Load roles.json file and return the roles dict."""
     p = Path(path)
@@ -139,8 +277,8 @@ You are **{agent_id}**, a {role_description} working on project **{project}**.
 
 ## Workflow
 0. Cron Guard: `mc cron-guard disable {agent_id}`
-1. `mc -p {project} -m {mission} checkin` — if PAUSED/COMPLETED/ARCHIVED, `mc cron-guard enable {agent_id}` and stop
-2. `mc -p {project} -m {mission} list --mine --status pending`
+1. `mc -p {project} -m {mission} checkin --full` — if PAUSED/COMPLETED/ARCHIVED, `mc cron-guard enable {agent_id}` and stop
+2. Read its unread messages; pick from "Your tasks", else from "Claimable"
 3. Claim highest-priority task: `mc -p {project} -m {mission} claim <id>`
 4. Start work: `mc -p {project} -m {mission} start <id>`
 5. Complete: `mc -p {project} -m {mission} done <id> -m "what I did"`
@@ -175,14 +313,12 @@ def generate_agents_md(
     config_dir: str = "",
 ) -> str:
     """Generate AGENTS.md for a specific agent by filling template placeholders."""
-    template = load_template()
     role_description = generate_role_description(role, role_config, role_desc)
     role_specialization = generate_role_specialization(role, role_config)
 
     # role_specialization must be replaced first so that placeholders
     # like {project} inside the specialization text are also rendered.
-    return safe_render(
-        template,
+    values = dict(
         role_specialization=role_specialization,
         role_description=role_description,
         agent_id=agent_id,
@@ -192,6 +328,7 @@ def generate_agents_md(
         goal=goal,
         config_dir=config_dir,
     )
+    return compiled_template(load_template, values).render(**values)
 
 
 def generate_cron_message(agent_id: str, project: str = "", mission: str = "", profile_env: str = "") -> str:
@@ -321,6 +458,120 @@ def generate_escalator_cron_message(agent_id: str, project: str = "", mission: s
     return generate_cron_message(agent_id)
 
 
+SUPERVISOR_ROLES = ("monitor", "brain", "escalator")
+
+
+def team_specs(
+    project: str,
+    mission: str,
+    goal: str,
+    roles: list[str],
+    role_config: dict | None,
+    role_desc: str | None,
+    cron_schedule: str,
+    supervisor_schedule: str,
+    slack_user_id: str,
+    policies: dict[str, str | None],
+    profile_env: str,
+) -> list[dict]:
+    """Rendered AGENTS.md, cron schedule and message for every worker and supervisor.
+
+    A role in role_config may set its own "cron" schedule.
+    """
+    specs = []
+    for role in roles:
+        agent_id = f"{project}-{mission}-{role}"
+        specs.append({
+            "agent_id": agent_id,
+            "role": role,
+            "agents_md": generate_agents_md(
+                agent_id=agent_id,
+                role=role,
+                project=project,
+                mission=mission,
+                goal=goal,
+                role_config=role_config,
+                role_desc=role_desc,
+                config_dir=str(CONFIG_DIR),
+            ),
+            "cron_schedule": (role_config or {}).get(role, {}).get("cron", cron_schedule),
+            "cron_msg": generate_cron_message(agent_id, project, mission, profile_env),
+            "model": None,
+        })
+
+    # Keyword order matters to rendering: policies are filled in before the
+    # placeholders that come after them, so those render inside policy text too.
+    def render(agent_id: str, policy: dict[str, str]) -> dict[str, str]:
+        head = {"agent_id": agent_id, "project": project, "mission": mission, "goal": goal}
+        tail = {"slack_user_id": slack_user_id}
+        if "escalation_policy" in policy:
+            return {**head, **tail, **policy, "config_dir": str(CONFIG_DIR)}
+        return {**head, **policy, **tail, "config_dir": str(CONFIG_DIR)}
+
+    supervisors = {
+        "monitor": (load_monitor_template, generate_monitor_cron_message,
+                    {"monitor_policy": policies.get("monitor") or ""}),
+        "brain": (load_brain_template, generate_brain_cron_message,
+                  {"brain_policy": policies.get("brain") or ""}),
+        "escalator": (load_escalator_template, generate_escalator_cron_message,
+                      {"escalation_policy": policies.get("escalation") or ""}),
+    }
+    for role, (load, cron_message, policy) in supervisors.items():
+        agent_id = f"{project}-{mission}-{role}"
+        values = render(agent_id, policy)
+        specs.append({
+            "agent_id": agent_id,
+            "role": role,
+            "agents_md": compiled_template(load, values).render(**values),
+            "cron_schedule": supervisor_schedule,
+            "cron_msg": cron_message(agent_id, project, mission, profile_env),
+            "model": SUPERVISOR_MODEL,
+        })
+    return specs
+
+
+def add_cron(agent_id: str, cron_schedule: str, cron_msg: str, slack_channel: str,
+             oc_profile_flag: str) -> subprocess.CompletedProcess:
+    """Create the agent's cron job (named after the agent)."""
+    escaped_msg = cron_msg.replace('"', '\\"')
+    return run(
+        f'openclaw {oc_profile_flag} cron add '
+        f'--agent {agent_id} '
+        f'--name {agent_id} '
+        f'--cron "{cron_schedule}" '
+        f'--session isolated '
+        f'--announce --channel slack --to {slack_channel} '
+        f'--message "{escaped_msg}"'.strip(),
+        check=False, capture=True,
+    )
+
+
+# `openclaw agents add` rewrites the shared openclaw config file, so those run
+# one at a time; everything else in register_agent runs in parallel.
+AGENTS_ADD_LOCK = threading.Lock()
+
+
+def add_agent(agent_id: str, ws_dir: Path, model: str | None, oc_profile_flag: str) -> subprocess.CompletedProcess:
+    """Create the openclaw agent on its workspace."""
+    model_flag = f"--model {model} " if model else ""
+    with AGENTS_ADD_LOCK:
+        return run(
+            f"openclaw {oc_profile_flag} agents add {agent_id} "
+            f"--workspace {ws_dir} "
+            f"{model_flag}"
+            f"--non-interactive".strip(),
+            check=False, capture=True,
+        )
+
+
+def register_fleet(agent_id: str, role: str, project: str, profile_env: str) -> subprocess.CompletedProcess:
+    """Register (or re-role) the agent in the MC fleet."""
+    return run(
+        f"{profile_env}MC_AGENT={agent_id} mc -p {project} register {agent_id} --role {role}",
+        check=False, capture=True,
+    )
+
+
 def register_agent(
     agent_id: str,
     role: str,
@@ -334,72 +585,593 @@ def register_agent(
     profile_env: str,
     dry_run: bool,
     model: str | None = None,
-) -> None:
-    """Register a single agent: workspace, AGENTS.md, openclaw agent, MC fleet, cron."""
+    inventory: Inventory | None = None,
+    log=print,
+) -> dict[str, str]:
+    """Register a single agent: workspace, AGENTS.md, openclaw agent, MC fleet, cron.
+
+    Steps that are already done are skipped, so a re-run resumes after a
+    partial failure. Returns the outcome of each step ("created", "exists",
+    "failed", "skipped" or "dry-run").
+    """
+    outcome = {"agent": "dry-run", "fleet": "dry-run", "cron": "dry-run"}
+
+    def failed(step: str, result: subprocess.CompletedProcess) -> None:
+        outcome[step] = "failed"
+        log(f"  FAILED ({result.returncode}): {(result.stderr or result.stdout or '').strip()[:200]}")
+
     # a. Create workspace
-    print(f"  Creating workspace: {ws_dir}")
+    log(f"  Creating workspace: {ws_dir}")
     if not dry_run:
         ws_dir.mkdir(parents=True, exist_ok=True)
 
-    # b. Write AGENTS.md
+    # b. Write AGENTS.md, unless it already has this content
     agents_md_path = ws_dir / "AGENTS.md"
-    print(f"  Writing AGENTS.md")
-    if not dry_run:
-        agents_md_path.write_text(agents_md)
+    if not file_differs(agents_md_path, agents_md):
+        log(f"  AGENTS.md unchanged, skipping")
+    elif dry_run and agents_md_path.exists():
+        log(f"  Writing AGENTS.md:")
+        for line in file_diff(agents_md_path, agents_md):
+            log(line)
+    else:
+        log(f"  Writing AGENTS.md")
+        if not dry_run:
+            agents_md_path.write_text(agents_md)
 
     # c. Register openclaw agent
-    if not dry_run and agent_exists(agent_id, oc_profile_flag):
-        print(f"  openclaw agent already exists, skipping: {agent_id}")
+    if not dry_run and agent_exists(agent_id, oc_profile_flag, inventory):
+        log(f"  openclaw agent already exists, skipping: {agent_id}")
+        outcome["agent"] = "exists"
     else:
-        print(f"  Registering openclaw agent: {agent_id}")
-        model_flag = f"--model {model} " if model else ""
+        log(f"  Registering openclaw agent: {agent_id}")
         if not dry_run:
-            run(
-                f"openclaw {oc_profile_flag} agents add {agent_id} "
-                f"--workspace {ws_dir} "
-                f"{model_flag}"
-                f"--non-interactive".strip(),
-                check=False,
-            )
+            result = add_agent(agent_id, ws_dir, model, oc_profile_flag)
+            if result.returncode == 0:
+                outcome["agent"] = "created"
+                if inventory is not None:
+                    inventory.record("agents", agent_id)
+            else:
+                failed("agent", result)
 
     # d. Register in MC fleet
-    print(f"  Registering in MC fleet")
-    if not dry_run:
-        run(
-            f"{profile_env}MC_AGENT={agent_id} mc -p {project} register {agent_id} --role {role}",
-            check=False,
-        )
-
-    # e. Add cron job
-    if not dry_run and cron_exists(agent_id, oc_profile_flag):
-        print(f"  Cron job already exists, skipping: {agent_id}")
+    if not dry_run and inventory is not None and inventory.fleet.get(agent_id) == role:
+        log(f"  Already in MC fleet, skipping")
+        outcome["fleet"] = "exists"
+    else:
+        log(f"  Registering in MC fleet")
+        if not dry_run:
+            result = register_fleet(agent_id, role, project, profile_env)
+            if result.returncode == 0:
+                outcome["fleet"] = "created"
+                if inventory is not None:
+                    inventory.record("fleet", agent_id, role)
+            else:
+                failed("fleet", result)
+
+    # e. Add cron job (needs the openclaw agent)
+    if outcome["agent"] == "failed":
+        log(f"  Skipping cron job: openclaw agent was not registered")
+        outcome["cron"] = "skipped"
+    elif not dry_run and cron_exists(agent_id, oc_profile_flag, inventory):
+        log(f"  Cron job already exists, skipping: {agent_id}")
+        outcome["cron"] = "exists"
     else:
-        print(f"  Adding cron job ({cron_schedule})")
+        log(f"  Adding cron job ({cron_schedule})")
         if not dry_run:
-            escaped_msg = cron_msg.replace('"', '\\"')
-            run(
-                f'openclaw {oc_profile_flag} cron add '
-                f'--agent {agent_id} '
-                f'--name {agent_id} '
-                f'--cron "{cron_schedule}" '
-                f'--session isolated '
-                f'--announce --channel slack --to {slack_channel} '
-                f'--message "{escaped_msg}"'.strip(),
-                check=False,
+            result = add_cron(agent_id, cron_schedule, cron_msg, slack_channel, oc_profile_flag)
+            if result.returncode == 0:
+                outcome["cron"] = "created"
+                if inventory is not None:
+                    inventory.record("crons", agent_id)
+            else:
+                failed("cron", result)
+
+    if "failed" in outcome.values() or "skipped" in outcome.values():
+        log(f"  INCOMPLETE — {agent_id} (re-run to resume)")
+    else:
+        log(f"  OK — {agent_id} ready")
+    return outcome
+
+
+def cron_hash(spec: dict, slack_channel: str) -> str:
+    """Fingerprint of everything `cron add` is given for an agent."""
+    text = "\n".join((spec["cron_schedule"], slack_channel, spec["cron_msg"]))
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def record_provisioned(db_path: Path, mission: str, specs: list[dict], slack_channel: str) -> int:
+    """Save the cron each agent was given to mission_agents; returns rows written.
+
+    Rows that already match are left alone, so an unchanged run writes nothing.
+    """
+    if not db_path.exists() or not specs:
+        return 0
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        row = conn.execute("SELECT id FROM missions WHERE name = ?", (mission,)).fetchone()
+        if row is None:
+            return 0
+        recorded = {
+            r[0]: r[1:] for r in conn.execute(
+                "SELECT agent_id, role, cron_schedule, cron_hash FROM mission_agents WHERE mission_id = ?",
+                (row[0],))
+        }
+        changed = [
+            (row[0], sp["agent_id"], sp["role"], sp["cron_schedule"], cron_hash(sp, slack_channel))
+            for sp in specs
+            if recorded.get(sp["agent_id"]) != (sp["role"], sp["cron_schedule"], cron_hash(sp, slack_channel))
+        ]
+        if changed:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO mission_agents(mission_id, agent_id, role, cron_schedule, cron_hash) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT DO UPDATE SET role = excluded.role, cron_schedule = excluded.cron_schedule, "
+                    "cron_hash = excluded.cron_hash, updated_at = datetime('now')",
+                    changed,
+                )
+        return len(changed)
+    except sqlite3.OperationalError as e:
+        print(f"  WARN: could not record agents ({e}) — run: mc migrate", file=sys.stderr)
+        return 0
+    finally:
+        conn.close()
+
+
+def forget_cron_ids(db_path: Path, names: list[str]) -> None:
+    """Drop `names` from MC's cached cron index (cron_jobs), so mc re-lists their new ids on first use."""
+    if not db_path.exists() or not names:
+        return
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        with conn:
+            conn.executemany("DELETE FROM cron_jobs WHERE name = ?", [(n,) for n in names])
+    except sqlite3.OperationalError:
+        pass  # before schema v4 there is no index to keep in step
+    finally:
+        conn.close()
+
+
+# ─── Mission manifests (--manifest) ───
+#
+# {
+#   "project": "ec-site", "mission": "prototype", "goal": "Django EC prototype",
+#   "slack": {"channel": "C0AD97HHZD3", "user_id": "U01ABCDEF"},
+#   "cron": "*/10 * * * *", "supervisor_cron": "0 */6 * * *",
+#   "roles": {"backend": {"description": "...", "specialization": "...", "cron": "*/5 * * * *"}},
+#   "policies": {"monitor": "...", "brain": "...", "escalation": "..."},
+#   "plan": "plan.md",
+#   "tasks": [{"key": "api", "subject": "Build the API", "for": "backend", "depends_on": ["schema"]}]
+# }
+#
+# "roles" has the shape of roles.json; "plan" is relative to the manifest.
+# Seed tasks are matched to the DB by key (tag manifest:<key>), so each is
+# created once and later edits to the DB task are never overwritten.
+
+TASK_TYPES = ("normal", "checkpoint")
+
+
+def load_manifest(path: str) -> dict:
+    """Load and validate a manifest; its seed tasks come back in dependency order."""
+    p = Path(path)
+    if not p.exists():
+        print(f"ERROR: Manifest not found: {path}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        data = json.loads(p.read_text())
+    except json.JSONDecodeError as e:
+        print(f"ERROR: Invalid JSON in {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    errors = []
+    for key in ("project", "mission", "goal"):
+        if not isinstance(data.get(key), str) or not data[key].strip():
+            errors.append(f'"{key}" is required')
+    slack = data.get("slack") or {}
+    for key in ("channel", "user_id"):
+        if not slack.get(key):
+            errors.append(f'"slack.{key}" is required')
+    roles = data.get("roles") or {}
+    if not isinstance(roles, dict) or not roles:
+        errors.append('"roles" must name at least one role')
+        roles = {}
+    for role in roles:
+        if role in SUPERVISOR_ROLES:
+            errors.append(f'role "{role}" is a supervisor; every mission already has one')
+
+    tasks = data.get("tasks") or []
+    by_key = {}
+    for n, task in enumerate(tasks, 1):
+        key = task.get("key")
+        if not key or not task.get("subject"):
+            errors.append(f"task {n} needs a \"key\" and a \"subject\"")
+        elif key in by_key:
+            errors.append(f'task "{key}" is defined twice')
+        else:
+            by_key[key] = task
+        if task.get("for") and task["for"] not in roles and task["for"] not in SUPERVISOR_ROLES:
+            errors.append(f'task "{key}" is for unknown role "{task["for"]}"')
+        if task.get("type", "normal") not in TASK_TYPES:
+            errors.append(f'task "{key}" has unknown type "{task["type"]}"')
+    for key, task in by_key.items():
+        for dep in task.get("depends_on", []):
+            if dep not in by_key:
+                errors.append(f'task "{key}" depends on unknown task "{dep}"')
+
+    # Kahn's algorithm, keeping manifest order among tasks that are ready
+    ordered, done = [], set()
+    pending = [k for k in by_key]
+    while pending:
+        ready = [k for k in pending if all(d in done or d not in by_key for d in by_key[k].get("depends_on", []))]
+        if not ready:
+            errors.append(f"task dependencies form a cycle: {', '.join(pending)}")
+            break
+        ordered += ready
+        done.update(ready)
+        pending = [k for k in pending if k not in done]
+
+    if data.get("plan"):
+        data["plan"] = p.parent / data["plan"]
+        if not data["plan"].exists():
+            errors.append(f"plan file not found: {data['plan']}")
+
+    if errors:
+        for e in errors:
+            print(f"ERROR: {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+    data["roles"] = roles
+    data["tasks"] = [by_key[k] for k in ordered]
+    return data
+
+
+def read_mission_state(db_path: Path, mission: str) -> dict:
+    """The mission row, its recorded agents and its seeded tasks (key → (id, status)), read-only."""
+    state = {"mission": None, "agents": {}, "tasks": {}}
+    if not db_path.exists():
+        return state
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=5)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute("SELECT id, description, status FROM missions WHERE name = ?", (mission,)).fetchone()
+        if row is None:
+            return state
+        state["mission"] = dict(row)
+        state["agents"] = {
+            r["agent_id"]: dict(r) for r in conn.execute(
+                "SELECT agent_id, role, cron_schedule, cron_hash FROM mission_agents WHERE mission_id = ?",
+                (row["id"],))
+        }
+        state["tasks"] = {
+            r[0]: (r[1], r[2]) for r in conn.execute(
+                "SELECT substr(j.value, 10), t.id, t.status FROM tasks t, json_each(t.tags) j "
+                "WHERE t.mission_id = ? AND j.value LIKE 'manifest:%'", (row["id"],))
+        }
+    except sqlite3.OperationalError as e:
+        print(f"ERROR: {db_path}: {e} — run: mc migrate", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+    return state
+
+
+def plan_manifest(manifest: dict, specs: list[dict], state: dict, inventory: Inventory,
+                  project_dir: Path) -> list[dict]:
+    """Actions that bring the DB, openclaw and the workspaces in line with the manifest.
+
+    Each action is {"op": "+"|"~"|"-", "kind", "target", "detail"}, plus the
+    agent spec for per-agent actions. Nothing is written.
+    """
+    channel = manifest["slack"]["channel"]
+    actions = []
+
+    def act(op, kind, target, detail="", **extra):
+        actions.append({"op": op, "kind": kind, "target": target, "detail": detail, **extra})
+
+    db_path = project_dir / "mission-control.db"
+    if not db_path.exists():
+        act("+", "project", manifest["project"])
+    mission = state["mission"]
+    if mission is None:
+        act("+", "mission", manifest["mission"], f" ({manifest['goal']})")
+    elif mission["description"] != manifest["goal"]:
+        act("~", "goal", manifest["mission"], f" ({manifest['goal']})")
+    if manifest.get("plan"):
+        plan_dest = project_dir / "plan.md"
+        if file_differs(plan_dest, manifest["plan"].read_text()):
+            act("~" if plan_dest.exists() else "+", "plan", str(plan_dest))
+
+    for spec in specs:
+        agent_id, role = spec["agent_id"], spec["role"]
+        if agent_id not in inventory.agents:
+            act("+", "agent", agent_id, f" ({role})", spec=spec)
+        ws_md = CONFIG_DIR / "agent_workspaces" / agent_id / "AGENTS.md"
+        if file_differs(ws_md, spec["agents_md"]):
+            act("~" if ws_md.exists() else "+", "AGENTS.md", agent_id, spec=spec)
+        if inventory.fleet.get(agent_id) != role:
+            old = inventory.fleet.get(agent_id)
+            act("~" if old is not None else "+", "role", agent_id,
+                f" ({old} → {role})" if old is not None else f" ({role})", spec=spec)
+        recorded = state["agents"].get(agent_id)
+        if agent_id not in inventory.crons:
+            act("+", "cron", agent_id, f" ({spec['cron_schedule']})", spec=spec)
+        elif recorded is None:
+            # Created before its cron was recorded: re-create it so the record is true
+            act("~", "cron", agent_id, f" (unrecorded → {spec['cron_schedule']})", spec=spec)
+        elif recorded["cron_hash"] != cron_hash(spec, channel):
+            change = (f"{recorded['cron_schedule']} → {spec['cron_schedule']}"
+                      if recorded["cron_schedule"] != spec["cron_schedule"] else "message or channel changed")
+            act("~", "cron", agent_id, f" ({change})", spec=spec)
+
+    desired = {sp["agent_id"] for sp in specs}
+    for agent_id, recorded in sorted(state["agents"].items()):
+        if agent_id not in desired:
+            act("-", "agent", agent_id, f" ({recorded['role']})")
+
+    for task in manifest["tasks"]:
+        if task["key"] not in state["tasks"]:
+            deps = task.get("depends_on", [])
+            act("+", "task", task["key"], f" ({task['subject']})" + (f" after {', '.join(deps)}" if deps else ""),
+                task=task)
+    return actions
+
+
+def apply_agent(agent_id: str, actions: list[dict], project: str, slack_channel: str,
+                oc_profile_flag: str, profile_env: str, inventory: Inventory) -> tuple[list[str], bool]:
+    """Apply one agent's planned actions in order; returns (log lines, whether all succeeded)."""
+    lines, ok = [], True
+    ws_dir = CONFIG_DIR / "agent_workspaces" / agent_id
+
+    def done(action: dict, result: subprocess.CompletedProcess | None = None) -> bool:
+        nonlocal ok
+        line = f"  {action['op']} {action['kind']:<9} {action['target']}{action['detail']}"
+        if result is not None and result.returncode != 0:
+            ok = False
+            lines.append(f"{line}  FAILED ({result.returncode}): "
+                         f"{(result.stderr or result.stdout or '').strip()[:200]}")
+            return False
+        lines.append(line)
+        return True
+
+    if actions[0]["op"] == "-":
+        # Cron first, so it never fires for an agent that is already gone
+        steps = []
+        if agent_id in inventory.crons:
+            steps.append(("crons", f"openclaw {oc_profile_flag} cron rm {inventory.crons[agent_id]}"))
+        if agent_id in inventory.agents:
+            steps.append(("agents", f"openclaw {oc_profile_flag} agents delete {agent_id} --force"))
+        for kind, cmd in steps:
+            result = run(cmd, check=False, capture=True)
+            if result.returncode != 0:
+                done(actions[0], result)
+                return lines, False
+            inventory.forget(kind, agent_id)
+        shutil.rmtree(ws_dir, ignore_errors=True)
+        done(actions[0])
+        return lines, True
+
+    for action in actions:
+        spec = action["spec"]
+        if action["kind"] == "AGENTS.md":
+            ws_dir.mkdir(parents=True, exist_ok=True)
+            (ws_dir / "AGENTS.md").write_text(spec["agents_md"])
+            done(action)
+        elif action["kind"] == "agent":
+            ws_dir.mkdir(parents=True, exist_ok=True)
+            if not (ws_dir / "AGENTS.md").exists():
+                (ws_dir / "AGENTS.md").write_text(spec["agents_md"])
+            if done(action, add_agent(agent_id, ws_dir, spec["model"], oc_profile_flag)):
+                inventory.record("agents", agent_id)
+        elif action["kind"] == "role":
+            if done(action, register_fleet(agent_id, spec["role"], project, profile_env)):
+                inventory.record("fleet", agent_id, spec["role"])
+        elif action["kind"] == "cron":
+            if agent_id not in inventory.agents:
+                ok = False
+                lines.append(f"  {action['op']} cron      {agent_id}  SKIPPED: openclaw agent was not registered")
+                continue
+            if agent_id in inventory.crons:
+                # openclaw has no in-place edit: remove the old job, then add it again
+                result = run(f"openclaw {oc_profile_flag} cron rm {inventory.crons[agent_id]}",
+                             check=False, capture=True)
+                if result.returncode != 0:
+                    done(action, result)
+                    continue
+                inventory.forget("crons", agent_id)
+            result = add_cron(agent_id, spec["cron_schedule"], spec["cron_msg"], slack_channel, oc_profile_flag)
+            if done(action, result):
+                inventory.record("crons", agent_id)
+    return lines, ok
+
+
+# Open dependencies of `tasks`, as in mc_core
+OPEN_BLOCKERS = """
+    FROM task_deps d JOIN tasks b ON b.id = d.depends_on
+    WHERE d.task_id = tasks.id AND b.status NOT IN ('done', 'cancelled')
+"""
+
+
+def seed_tasks(db_path: Path, mission: str, tasks: list[dict], seeded: dict, owners: dict[str, str]) -> list[str]:
+    """Create the manifest's new seed tasks and their dependencies in one transaction."""
+    created_by = os.environ.get("MC_AGENT") or "setup_mission"
+    # An assigned task is a claim, leased as in mc_core (MC_LEASE_TTL, 0 = no lease)
+    ttl = max(int(os.environ.get("MC_LEASE_TTL") or 7200), 0)
+    ids = {key: tid for key, (tid, _) in seeded.items()}
+    lines = []
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        mid = conn.execute("SELECT id FROM missions WHERE name = ?", (mission,)).fetchone()[0]
+        for task in tasks:
+            owner = owners.get(task.get("for"), "")
+            tid = conn.execute(
+                "INSERT INTO tasks(mission_id, subject, description, status, owner, created_by, priority, "
+                "task_type, scheduled_at, claimed_at, lease_expires_at, tags) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CASE WHEN ? != '' THEN datetime('now') END, "
+                "datetime(MAX(datetime('now'), COALESCE(?, '')), ?), json_array(?)) "
+                "RETURNING id",
+                (mid, task["subject"], task.get("description", ""), "claimed" if owner else "pending", owner,
+                 created_by, int(task.get("priority", 0)), task.get("type", "normal"), task.get("at"),
+                 owner, task.get("at"), f"+{ttl} seconds" if owner and ttl else None, f"manifest:{task['key']}"),
+            ).fetchone()[0]
+            deps = [ids[d] for d in task.get("depends_on", [])]
+            conn.executemany("INSERT INTO task_deps(task_id, depends_on) VALUES (?, ?)", [(tid, d) for d in deps])
+            if deps:
+                # Same rule as `mc block`: blocked while any dependency is still open
+                conn.execute(f"""
+                    UPDATE tasks SET status = 'blocked', lease_expires_at = NULL,
+                        blocked_by = (SELECT json_group_array(d.depends_on) {OPEN_BLOCKERS})
+                    WHERE id = ? AND EXISTS (SELECT 1 {OPEN_BLOCKERS})
+                """, (tid,))
+            conn.execute(
+                "INSERT INTO activity(mission_id, agent, action, target_type, target_id, detail) "
+                "VALUES (?, ?, 'task_created', 'task', ?, ?)",
+                (mid, created_by, tid, task["subject"]),
             )
+            ids[task["key"]] = tid
+            lines.append(f"  + task      {task['key']} → #{tid}" + (f" ({owner})" if owner else ""))
+        conn.commit()
+    finally:
+        conn.close()
+    return lines
+
+
+def forget_agents(db_path: Path, mission: str, agent_ids: list[str]) -> None:
+    """Drop removed agents from the MC fleet and from mission_agents."""
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        with conn:
+            mid = conn.execute("SELECT id FROM missions WHERE name = ?", (mission,)).fetchone()[0]
+            conn.executemany("DELETE FROM agents WHERE name = ?", [(a,) for a in agent_ids])
+            conn.executemany("DELETE FROM mission_agents WHERE mission_id = ? AND agent_id = ?",
+                             [(mid, a) for a in agent_ids])
+    finally:
+        conn.close()
+
+
+def apply_manifest(path: str, dry_run: bool, jobs: int, oc_profile_flag: str, profile_env: str) -> int:
+    """Diff the manifest against the MC DB and openclaw, print the plan and apply it (unless dry_run)."""
+    manifest = load_manifest(path)
+    project, mission, goal = manifest["project"], manifest["mission"], manifest["goal"]
+    channel = manifest["slack"]["channel"]
+    project_dir = CONFIG_DIR / "projects" / project
+    db_path = project_dir / "mission-control.db"
+
+    print(f"═══ OMOS Mission Apply ═══")
+    print(f"  Manifest: {path}")
+    print(f"  Project:  {project}")
+    print(f"  Mission:  {mission}")
+    print()
+
+    started = time.monotonic()
+    state = read_mission_state(db_path, mission)
+    if state["mission"] and state["mission"]["status"] in ("completed", "archived"):
+        print(f"ERROR: Mission '{mission}' is {state['mission']['status']}; "
+              f"create a new mission instead", file=sys.stderr)
+        return 1
+    specs = team_specs(
+        project, mission, goal, list(manifest["roles"]), manifest["roles"], None,
+        cron_schedule=manifest.get("cron", "*/10 * * * *"),
+        supervisor_schedule=manifest.get("supervisor_cron", "0 */6 * * *"),
+        slack_user_id=manifest["slack"]["user_id"],
+        policies=manifest.get("policies") or {},
+        profile_env=profile_env,
+    )
+    inventory = Inventory(oc_profile_flag, db_path)
+    actions = plan_manifest(manifest, specs, state, inventory, project_dir)
+
+    if not actions:
+        print(f"No changes — {project}/{mission} matches the manifest "
+              f"({len(specs)} agents, {len(manifest['tasks'])} seed tasks; {time.monotonic() - started:.1f}s)")
+        return 0
+    print(f"Plan ({len(actions)} changes):")
+    for a in actions:
+        print(f"  {a['op']} {a['kind']:<9} {a['target']}{a['detail']}")
+        if dry_run and a["kind"] == "AGENTS.md" and a["op"] == "~":
+            for line in file_diff(CONFIG_DIR / "agent_workspaces" / a["target"] / "AGENTS.md",
+                                  a["spec"]["agents_md"]):
+                print(line)
+    if dry_run:
+        print("\n[DRY RUN] No changes made.")
+        return 0
+
+    print("\nApplying...")
+    ok = True
+    kinds = {a["kind"] for a in actions}
+    escaped_goal = goal.replace("'", "'\\''")
+    for kind, cmd in (("project", f"{profile_env}mc -p {project} init"),
+                      ("mission", f"{profile_env}mc -p {project} mission create {mission} -d '{escaped_goal}'")):
+        if kind in kinds:
+            result = run(cmd, check=False, capture=True)
+            if result.returncode != 0:
+                print(f"  + {kind:<9} FAILED ({result.returncode}): {(result.stderr or result.stdout).strip()[:200]}")
+                return 1
+            print(f"  + {kind:<9} {project if kind == 'project' else mission}")
+    project_dir.mkdir(parents=True, exist_ok=True)
+    if "goal" in kinds:
+        conn = sqlite3.connect(db_path, timeout=5)
+        with conn:
+            conn.execute("UPDATE missions SET description = ?, updated_at = datetime('now') WHERE name = ?",
+                         (goal, mission))
+        conn.close()
+        print(f"  ~ goal      {mission}")
+    for a in actions:
+        if a["kind"] == "plan":
+            (project_dir / "plan.md").write_text(manifest["plan"].read_text())
+            print(f"  {a['op']} plan      {a['target']}")
+
+    # Per-agent actions run in parallel; each agent's own steps stay in order
+    by_agent = {}
+    for a in actions:
+        if a["kind"] in ("agent", "AGENTS.md", "role", "cron"):
+            by_agent.setdefault(a["target"], []).append(a)
+    removed = [agent_id for agent_id, acts in by_agent.items() if acts[0]["op"] == "-"]
+    with ThreadPoolExecutor(max(1, jobs)) as pool:
+        results = pool.map(
+            lambda item: apply_agent(item[0], item[1], project, channel, oc_profile_flag, profile_env, inventory),
+            by_agent.items(),
+        )
+        failed = set()
+        for agent_id, (lines, agent_ok) in zip(by_agent, results):
+            print("\n".join(lines))
+            if not agent_ok:
+                failed.add(agent_id)
+                ok = False
+
+    if [a for a in removed if a not in failed]:
+        forget_agents(db_path, mission, [a for a in removed if a not in failed])
+    forget_cron_ids(db_path, [agent_id for agent_id, acts in by_agent.items()
+                              if any(a["kind"] == "cron" or a["op"] == "-" for a in acts)])
+    # Record only crons now known to match their spec
+    record_provisioned(db_path, mission, [
+        sp for sp in specs if sp["agent_id"] not in failed and sp["agent_id"] in inventory.crons
+    ], channel)
+
+    new_tasks = [a["task"] for a in actions if a["kind"] == "task"]
+    if new_tasks:
+        owners = {role: f"{project}-{mission}-{role}" for role in (*manifest["roles"], *SUPERVISOR_ROLES)}
+        print("\n".join(seed_tasks(db_path, mission, new_tasks, state["tasks"], owners)))
 
-    print(f"  OK — {agent_id} ready")
+    print()
+    if not ok:
+        print(f"WARN: {len(failed)} agents incomplete — re-run the same manifest to retry")
+        return 1
+    print(f"OK — {len(actions)} changes applied in {time.monotonic() - started:.1f}s")
+    return 0
 
 
 def main():
     parser = argparse.ArgumentParser(
         description="OMOS Team Composition Tool — create MC project, mission, and agent team"
     )
-    parser.add_argument("project", help="Project name (used as MC project name)")
-    parser.add_argument("mission", help="Mission name")
-    parser.add_argument("goal", help="Mission goal description")
+    parser.add_argument("project", nargs="?", help="Project name (used as MC project name)")
+    parser.add_argument("mission", nargs="?", help="Mission name")
+    parser.add_argument("goal", nargs="?", help="Mission goal description")
     parser.add_argument(
-        "--roles", required=True,
+        "--manifest",
+        help="Mission manifest (JSON): apply only what differs from the current state"
+    )
+    parser.add_argument(
+        "--roles",
         help="Comma-separated list of roles (e.g., researcher,backend,frontend,reviewer)"
     )
     parser.add_argument(
@@ -423,11 +1195,11 @@ def main():
         help="Cron schedule for supervisor agents: monitor, brain, and escalator (default: every 6 hours)"
     )
     parser.add_argument(
-        "--slack-channel", required=True,
+        "--slack-channel",
         help="Slack channel ID for cron delivery (e.g., C0AD97HHZD3)"
     )
     parser.add_argument(
-        "--slack-user-id", required=True,
+        "--slack-user-id",
         help="Slack user ID for @mention in escalation (e.g., U01ABCDEF)"
     )
     parser.add_argument(
@@ -446,12 +1218,22 @@ def main():
         "--plan",
         help="Path to plan.md file to copy into the project directory"
     )
+    parser.add_argument(
+        "--jobs", type=int, default=8,
+        help="Agents provisioned in parallel (default: 8)"
+    )
     parser.add_argument(
         "--dry-run", action="store_true",
         help="Show what would be done without executing"
     )
 
     args = parser.parse_args()
+    if not args.manifest:
+        missing = [name for name in ("project", "mission", "goal") if not getattr(args, name)]
+        missing += [f"--{name.replace('_', '-')}" for name in ("roles", "slack_channel", "slack_user_id")
+                    if not getattr(args, name)]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
 
     # Resolve profile: CLI flag > env var
     profile = args.profile or os.environ.get("OPENCLAW_PROFILE", "")
@@ -467,6 +1249,9 @@ def main():
     TEMPLATE_DIR = CONFIG_DIR / "mc-templates"
     projects_dir = CONFIG_DIR / "projects"
 
+    if args.manifest:
+        sys.exit(apply_manifest(args.manifest, args.dry_run, args.jobs, oc_profile_flag, profile_env))
+
     project = args.project
     mission = args.mission
     goal = args.goal
@@ -534,147 +1319,63 @@ def main():
             plan_dest.write_text(plan_src.read_text())
         print(f"  OK")
 
-    # ─── Step 4: Register worker agents ───
-    print(f"[4/6] Registering worker agents...")
-    agents_created = []
-
-    for role in roles:
-        agent_id = f"{project}-{mission}-{role}"
-        ws_dir = CONFIG_DIR / "agent_workspaces" / agent_id
-
-        print(f"\n  --- {agent_id} ---")
+    # ─── Step 4 + 5: Render every agent, then provision them in parallel ───
+    specs = team_specs(
+        project, mission, goal, roles, role_config,
+        role_desc=args.role_desc if len(roles) == 1 else None,
+        cron_schedule=cron_schedule,
+        supervisor_schedule=supervisor_schedule,
+        slack_user_id=args.slack_user_id,
+        policies={"monitor": args.monitor_policy, "brain": args.brain_policy,
+                  "escalation": args.escalation_policy},
+        profile_env=profile_env,
+    )
+    workers = [sp for sp in specs if sp["role"] not in SUPERVISOR_ROLES]
+    brain_id = f"{project}-{mission}-brain"
 
-        agents_md = generate_agents_md(
-            agent_id=agent_id,
-            role=role,
-            project=project,
-            mission=mission,
-            goal=goal,
-            role_config=role_config,
-            role_desc=args.role_desc if len(roles) == 1 else None,
-            config_dir=str(CONFIG_DIR),
-        )
-        cron_msg = generate_cron_message(agent_id, project, mission, profile_env)
+    # One agents/cron listing for the whole run instead of two per agent
+    inventory = None if dry_run else Inventory(oc_profile_flag, project_dir / "mission-control.db")
 
-        register_agent(
-            agent_id=agent_id,
-            role=role,
+    def provision(spec: dict) -> tuple[list[str], dict[str, str]]:
+        lines = [f"\n  --- {spec['agent_id']} ---"]
+        outcome = register_agent(
+            agent_id=spec["agent_id"],
+            role=spec["role"],
             project=project,
-            ws_dir=ws_dir,
-            agents_md=agents_md,
-            cron_schedule=cron_schedule,
-            cron_msg=cron_msg,
+            ws_dir=CONFIG_DIR / "agent_workspaces" / spec["agent_id"],
+            agents_md=spec["agents_md"],
+            cron_schedule=spec["cron_schedule"],
+            cron_msg=spec["cron_msg"],
             slack_channel=args.slack_channel,
             oc_profile_flag=oc_profile_flag,
             profile_env=profile_env,
             dry_run=dry_run,
+            model=spec["model"],
+            inventory=inventory,
+            log=lines.append,
         )
-        agents_created.append(agent_id)
-
-    # ─── Step 5: Register supervisor agents (always: monitor, brain, escalator) ───
-    print(f"\n[5/6] Registering supervisor agents...")
-
-    # --- Monitor ---
-    monitor_id = f"{project}-{mission}-monitor"
-    ws_dir = CONFIG_DIR / "agent_workspaces" / monitor_id
-    print(f"\n  --- {monitor_id} ---")
-
-    monitor_template = load_monitor_template()
-    monitor_md = safe_render(
-        monitor_template,
-        agent_id=monitor_id,
-        project=project,
-        mission=mission,
-        goal=goal,
-        monitor_policy=args.monitor_policy or "",
-        slack_user_id=args.slack_user_id,
-        config_dir=str(CONFIG_DIR),
-    )
-    monitor_msg = generate_monitor_cron_message(monitor_id, project, mission, profile_env)
-
-    register_agent(
-        agent_id=monitor_id,
-        role="monitor",
-        project=project,
-        ws_dir=ws_dir,
-        agents_md=monitor_md,
-        cron_schedule=supervisor_schedule,
-        cron_msg=monitor_msg,
-        slack_channel=args.slack_channel,
-        oc_profile_flag=oc_profile_flag,
-        profile_env=profile_env,
-        dry_run=dry_run,
-        model=SUPERVISOR_MODEL,
-    )
-    agents_created.append(monitor_id)
-
-    # --- Brain ---
-    brain_id = f"{project}-{mission}-brain"
-    ws_dir = CONFIG_DIR / "agent_workspaces" / brain_id
-    print(f"\n  --- {brain_id} ---")
-
-    brain_template = load_brain_template()
-    brain_md = safe_render(
-        brain_template,
-        agent_id=brain_id,
-        project=project,
-        mission=mission,
-        goal=goal,
-        brain_policy=args.brain_policy or "",
-        slack_user_id=args.slack_user_id,
-        config_dir=str(CONFIG_DIR),
-    )
-    brain_msg = generate_brain_cron_message(brain_id, project, mission, profile_env)
-
-    register_agent(
-        agent_id=brain_id,
-        role="brain",
-        project=project,
-        ws_dir=ws_dir,
-        agents_md=brain_md,
-        cron_schedule=supervisor_schedule,
-        cron_msg=brain_msg,
-        slack_channel=args.slack_channel,
-        oc_profile_flag=oc_profile_flag,
-        profile_env=profile_env,
-        dry_run=dry_run,
-        model=SUPERVISOR_MODEL,
-    )
-    agents_created.append(brain_id)
-
-    # --- Escalator ---
-    escalator_id = f"{project}-{mission}-escalator"
-    ws_dir = CONFIG_DIR / "agent_workspaces" / escalator_id
-    print(f"\n  --- {escalator_id} ---")
-
-    escalator_template = load_escalator_template()
-    escalator_md = safe_render(
-        escalator_template,
-        agent_id=escalator_id,
-        project=project,
-        mission=mission,
-        goal=goal,
-        slack_user_id=args.slack_user_id,
-        escalation_policy=args.escalation_policy or "",
-        config_dir=str(CONFIG_DIR),
-    )
-    escalator_msg = generate_escalator_cron_message(escalator_id, project, mission, profile_env)
-
-    register_agent(
-        agent_id=escalator_id,
-        role="escalator",
-        project=project,
-        ws_dir=ws_dir,
-        agents_md=escalator_md,
-        cron_schedule=supervisor_schedule,
-        cron_msg=escalator_msg,
-        slack_channel=args.slack_channel,
-        oc_profile_flag=oc_profile_flag,
-        profile_env=profile_env,
-        dry_run=dry_run,
-        model=SUPERVISOR_MODEL,
-    )
-    agents_created.append(escalator_id)
+        return lines, outcome
+
+    started = time.monotonic()
+    outcomes = {}
+    with ThreadPoolExecutor(max(1, args.jobs)) as pool:
+        results = pool.map(provision, specs)
+        # Output is buffered per agent and printed in order as each finishes
+        for n, (spec, (lines, outcome)) in enumerate(zip(specs, results)):
+            if n == 0:
+                print(f"[4/6] Registering worker agents...")
+            elif n == len(workers):
+                print(f"\n[5/6] Registering supervisor agents...")
+            print("\n".join(lines))
+            outcomes[spec["agent_id"]] = outcome
+    agents_created = list(outcomes)
+    elapsed = time.monotonic() - started
+    if not dry_run:
+        record_provisioned(project_dir / "mission-control.db", mission, [
+            sp for sp in specs if outcomes[sp["agent_id"]]["cron"] == "created"
+        ], args.slack_channel)
+        forget_cron_ids(project_dir / "mission-control.db",
+                        [a for a, outcome in outcomes.items() if outcome["cron"] == "created"])
 
     # ─── Step 6: Summary ───
     mc_prefix = f"{profile_env}mc" if profile_env else "mc"
@@ -717,22 +1418,30 @@ def main():
     print(f"Cleanup (when mission is done):")
     print(f"  {mc_prefix} -p {project} -m {mission} mission complete")
 
-    # ─── Final Verification ───
+    # ─── Final Verification: reconcile against a fresh listing ───
     if not dry_run:
-        print(f"\n[Verify] Checking registration results...")
-        missing_agents = []
-        missing_crons = []
+        print(f"\n[Verify] Reconciling against openclaw and the MC fleet...")
+        inventory.refresh()
+        missing = 0
+        print(f"  {'agent':<40} {'openclaw':<10} {'cron':<10} fleet")
         for a in agents_created:
-            if not agent_exists(a, oc_profile_flag):
-                missing_agents.append(a)
-            if not cron_exists(a, oc_profile_flag):
-                missing_crons.append(a)
-        if missing_agents:
-            print(f"  WARN: agents not found after registration: {', '.join(missing_agents)}")
-        if missing_crons:
-            print(f"  WARN: cron jobs not found after registration: {', '.join(missing_crons)}")
-        if not missing_agents and not missing_crons:
-            print(f"  OK — all {len(agents_created)} agents and cron jobs verified")
+            found = {
+                "agent": a in inventory.agents,
+                "cron": a in inventory.crons,
+                "fleet": a in inventory.fleet,
+            }
+            cells = [
+                (outcomes[a][step] if found[step] or outcomes[a][step] in ("failed", "skipped")
+                 else "MISSING").ljust(10)
+                for step in ("agent", "cron", "fleet")
+            ]
+            missing += not all(found.values())
+            print(f"  {a:<40} {' '.join(cells).rstrip()}")
+        print(f"  {len(agents_created)} agents provisioned in {elapsed:.1f}s (--jobs {args.jobs})")
+        if missing:
+            print(f"  WARN: {missing} agents incomplete — re-run the same command to resume")
+            sys.exit(1)
+        print(f"  OK — all {len(agents_created)} agents and cron jobs verified")
 
 
 if __name__ == "__main__":